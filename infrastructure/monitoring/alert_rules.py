@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Alert Rule Engine
+Declarative threshold rules evaluated in bulk over the metric store
+
+A rule compares one metric column, aggregated over a window of recent
+frames and optionally taken relative to a trailing baseline, against one
+threshold per severity level. Every rule is evaluated for all domains at
+once with array comparisons. Per-domain state (breach streak, firing
+level) lives in arrays, so each tick only emits alerts that started
+firing, changed severity or resolved.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+
+import numpy as np
+
+from metric_store import FIELD_INDEX, ColumnarMetricStore
+
+logger = logging.getLogger(__name__)
+
+FIRING = "firing"
+RESOLVED = "resolved"
+
+_AGGREGATES = {
+    'last': lambda window: window[-1],
+    'mean': lambda window: np.nanmean(window, axis=0),
+    'min': lambda window: np.nanmin(window, axis=0),
+    'max': lambda window: np.nanmax(window, axis=0)
+}
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Threshold rule over one metric field
+
+    levels maps a severity to its threshold; the most extreme breached
+    threshold decides the severity. A firing alert only resolves once the
+    value clears the mildest threshold by the hysteresis fraction.
+    """
+    name: str
+    field: str
+    metric_type: Any
+    levels: Tuple[Tuple[Any, float], ...]
+    comparison: str = '<'
+    window: int = 1
+    aggregate: str = 'last'
+    baseline_window: int = 0  # > 0 compares value / trailing mean instead of the raw value
+    for_ticks: int = 1
+    hysteresis: float = 0.0
+    message: str = "{field} {comparison} {threshold:g}: {value:g}"
+
+    def __post_init__(self):
+        if self.comparison not in ('<', '>'):
+            raise ValueError(f"Unsupported comparison {self.comparison!r} in rule {self.name}")
+        if self.aggregate not in _AGGREGATES:
+            raise ValueError(f"Unsupported aggregate {self.aggregate!r} in rule {self.name}")
+        # Most severe (most extreme) threshold first
+        ordered = sorted(self.levels, key=lambda level: level[1], reverse=self.comparison == '>')
+        object.__setattr__(self, 'levels', tuple(ordered))
+
+    @property
+    def history_needed(self) -> int:
+        return max(self.window, self.baseline_window)
+
+@dataclass
+class AlertEvent:
+    """State change of one alert"""
+    alert_id: str
+    rule: str
+    domain: str
+    metric_type: Any
+    status: str
+    severity: Any
+    message: str
+    value: float
+    threshold: float
+    since: datetime
+    acknowledged: bool = False
+
+class _RuleState:
+    """Per-domain state arrays for one rule"""
+
+    def __init__(self, n_domains: int):
+        self.breach_ticks = np.zeros(n_domains, dtype=np.int64)
+        self.firing = np.zeros(n_domains, dtype=bool)
+        self.level = np.full(n_domains, -1, dtype=np.int64)
+
+    def grow(self, n_domains: int):
+        extra = n_domains - len(self.firing)
+        if extra > 0:
+            self.breach_ticks = np.concatenate([self.breach_ticks, np.zeros(extra, dtype=np.int64)])
+            self.firing = np.concatenate([self.firing, np.zeros(extra, dtype=bool)])
+            self.level = np.concatenate([self.level, np.full(extra, -1, dtype=np.int64)])
+
+class AlertEngine:
+    """Evaluates alert rules over a ColumnarMetricStore and tracks alert state"""
+
+    def __init__(self, rules: Sequence[AlertRule]):
+        self.rules = list(rules)
+        self.active: Dict[str, AlertEvent] = {}
+        self._state = {rule.name: _RuleState(0) for rule in self.rules}
+        self._history_needed = max((rule.history_needed for rule in self.rules), default=1)
+
+    def evaluate(self, store: ColumnarMetricStore, domains: Optional[Sequence[str]] = None,
+                 now: Optional[datetime] = None) -> List[AlertEvent]:
+        """Evaluate every rule; domains limits evaluation to a subset. Returns the changes."""
+        now = now or datetime.now()
+        if not len(store):
+            return []
+
+        history = store.tail(self._history_needed)
+        n_domains = len(store.domains)
+        mask = np.ones(n_domains, dtype=bool)
+        if domains is not None:
+            mask[:] = False
+            mask[[store.domain_index[d] for d in domains if d in store.domain_index]] = True
+
+        events = []
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for rule in self.rules:
+                events.extend(self._evaluate_rule(rule, history, store.domains, mask, now))
+        return events
+
+    def _evaluate_rule(self, rule: AlertRule, history: np.ndarray, domains: List[str],
+                       mask: np.ndarray, now: datetime) -> List[AlertEvent]:
+        state = self._state[rule.name]
+        state.grow(len(domains))
+
+        column = history[:, :, FIELD_INDEX[rule.field]]
+        value = _AGGREGATES[rule.aggregate](column[-rule.window:])
+        if rule.baseline_window:
+            value = value / np.nanmean(column[-rule.baseline_window:], axis=0)
+
+        thresholds = np.array([threshold for _, threshold in rule.levels])
+        sign = -1.0 if rule.comparison == '<' else 1.0
+        # (levels, domains) breach matrix; sign folds '<' into '>'
+        breached = sign * value[np.newaxis, :] > sign * thresholds[:, np.newaxis]
+        breaching = breached.any(axis=0)
+        level = np.where(breaching, breached.argmax(axis=0), -1)
+
+        # Firing alerts hold until the value clears the mildest threshold with margin
+        clear_threshold = thresholds[-1] * (1 - sign * rule.hysteresis)
+        held = sign * value > sign * clear_threshold
+
+        valid = mask & ~np.isnan(value)
+        state.breach_ticks = np.where(valid, np.where(breaching, state.breach_ticks + 1, 0), state.breach_ticks)
+
+        fire = valid & ~state.firing & (state.breach_ticks >= rule.for_ticks)
+        resolve = valid & state.firing & ~held
+        escalate = valid & state.firing & ~resolve & breaching & (level != state.level)
+
+        state.level = np.where(fire | escalate, level, np.where(resolve, -1, state.level))
+        state.firing = (state.firing | fire) & ~resolve
+
+        events = []
+        for i in np.flatnonzero(fire | escalate | resolve):
+            events.append(self._transition(rule, domains[i], float(value[i]), int(state.level[i]), bool(resolve[i]), now))
+        return events
+
+    def _transition(self, rule: AlertRule, domain: str, value: float, level: int,
+                    resolved: bool, now: datetime) -> AlertEvent:
+        alert_id = f"{rule.name}_{domain}"
+        previous = self.active.get(alert_id)
+
+        if resolved:
+            event = AlertEvent(
+                alert_id=alert_id,
+                rule=rule.name,
+                domain=domain,
+                metric_type=rule.metric_type,
+                status=RESOLVED,
+                severity=previous.severity if previous else None,
+                message=f"Resolved: {previous.message}" if previous else f"{rule.name} resolved",
+                value=value,
+                threshold=previous.threshold if previous else float('nan'),
+                since=now
+            )
+            self.active.pop(alert_id, None)
+            return event
+
+        severity, threshold = rule.levels[level]
+        event = AlertEvent(
+            alert_id=alert_id,
+            rule=rule.name,
+            domain=domain,
+            metric_type=rule.metric_type,
+            status=FIRING,
+            severity=severity,
+            message=rule.message.format(field=rule.field, comparison=rule.comparison, threshold=threshold, value=value),
+            value=value,
+            threshold=threshold,
+            since=previous.since if previous else now,
+            acknowledged=previous.acknowledged if previous else False
+        )
+        self.active[alert_id] = event
+        return event
+
+    def acknowledge(self, alert_id: str) -> bool:
+        """Mark a firing alert acknowledged until it resolves"""
+        event = self.active.get(alert_id)
+        if event is None:
+            return False
+        event.acknowledged = True
+        return True
+
+    def active_alerts(self) -> List[AlertEvent]:
+        return list(self.active.values())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Streaming Anomaly Detection
+EWMA control bands with seasonal baselines for every domain x metric
+
+Each series keeps an exponentially weighted level, a per-slot seasonal
+offset (e.g. hour of day) and an exponentially weighted variance of the
+residual. A point is anomalous when its residual leaves the z-score band
+in the metric's bad direction. State is a handful of (domain, metric)
+arrays, so an update is O(1) per series and vectorized across all of
+them, with no history rescans. Residuals are clipped before they feed
+back into the baseline so an incident does not become the new normal.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+
+import numpy as np
+
+from alert_rules import FIRING, RESOLVED, AlertEvent
+from metric_store import METRIC_FIELDS, MetricFrame
+
+logger = logging.getLogger(__name__)
+
+class EWMAAnomalyDetector:
+    """Online per-series anomaly detector emitting alert state changes"""
+
+    def __init__(self, fields: Sequence[str] = METRIC_FIELDS, alpha: float = 0.05, season_alpha: float = 0.1,
+                 season_period: int = 86400, season_slots: int = 24, warmup: int = 30,
+                 severities: Sequence[Tuple[Any, float]] = (('critical', 6.0), ('warning', 4.0)),
+                 resolve_z: float = 2.0, min_consecutive: int = 2, min_std_ratio: float = 0.01,
+                 directions: Optional[Dict[str, int]] = None, metric_types: Optional[Dict[str, Any]] = None):
+        self.fields = tuple(fields)
+        self.alpha = alpha
+        self.season_alpha = season_alpha
+        self.season_period = season_period
+        self.season_slots = season_slots
+        self.warmup = warmup
+        self.severities = sorted(severities, key=lambda level: level[1], reverse=True)
+        self.resolve_z = resolve_z
+        self.min_consecutive = min_consecutive
+        self.min_std_ratio = min_std_ratio
+        self.metric_types = metric_types or {}
+
+        # +1: only highs are anomalous, -1: only lows, 0: both
+        directions = directions or {}
+        self.direction = np.array([directions.get(field, 0) for field in self.fields], dtype=np.float64)
+
+        self.domains: List[str] = []
+        self.domain_index: Dict[str, int] = {}
+        self.active: Dict[str, AlertEvent] = {}
+
+        n_fields = len(self.fields)
+        self.level = np.zeros((0, n_fields))
+        self.var = np.zeros((0, n_fields))
+        self.count = np.zeros((0, n_fields), dtype=np.int64)
+        self.streak = np.zeros((0, n_fields), dtype=np.int64)
+        self.firing_level = np.zeros((0, n_fields), dtype=np.int64)
+        self.season = np.zeros((season_slots, 0, n_fields))
+
+    def _ensure_domains(self, domains: Sequence[str]) -> np.ndarray:
+        new = [d for d in domains if d not in self.domain_index]
+        if new:
+            for domain in new:
+                self.domain_index[domain] = len(self.domains)
+                self.domains.append(domain)
+            pad = ((0, len(new)), (0, 0))
+            self.level = np.pad(self.level, pad)
+            self.var = np.pad(self.var, pad)
+            self.count = np.pad(self.count, pad)
+            self.streak = np.pad(self.streak, pad)
+            self.firing_level = np.pad(self.firing_level, pad, constant_values=-1)
+            self.season = np.pad(self.season, ((0, 0),) + pad)
+        return np.array([self.domain_index[d] for d in domains], dtype=np.intp)
+
+    def update(self, frame: MetricFrame, now: Optional[datetime] = None) -> List[AlertEvent]:
+        """Fold one frame of observations in; returns anomaly alerts that fired or resolved"""
+        now = now or datetime.now()
+        if not len(frame):
+            return []
+
+        rows = self._ensure_domains(frame.domains)
+        x = frame.columns(self.fields)
+        slot = int(now.timestamp() % self.season_period // (self.season_period / self.season_slots))
+
+        level = self.level[rows]
+        offset = self.season[slot, rows]
+        var = self.var[rows]
+        count = self.count[rows]
+        observed = ~np.isnan(x)
+        first = observed & (count == 0)
+
+        expected = level + offset
+        residual = np.where(observed & ~first, x - expected, 0.0)
+        std = np.maximum(np.sqrt(var), self.min_std_ratio * np.abs(expected) + 1e-12)
+        z = residual / std
+
+        warm = observed & (count >= self.warmup)
+        signed = np.where(self.direction == 0, np.abs(z), z * self.direction)
+        threshold = self.severities[-1][1]
+        breaching = warm & (signed > threshold)
+        streak = np.where(observed, np.where(breaching, self.streak[rows] + 1, 0), self.streak[rows])
+
+        # Clip the residual fed back into the baseline while out of band
+        limit = threshold * std
+        clipped = np.where(warm, np.clip(residual, -limit, limit), residual)
+        new_level = np.where(first, x, level + self.alpha * clipped)
+        new_level = np.where(observed, new_level, level)
+        seasonal_error = np.where(observed & ~first, expected + clipped - new_level - offset, 0.0)
+
+        self.level[rows] = new_level
+        self.season[slot, rows] = offset + self.season_alpha * seasonal_error
+        # Variance is frozen while out of band so incidents don't widen the band
+        self.var[rows] = np.where(observed & ~first & ~breaching, (1 - self.alpha) * (var + self.alpha * clipped ** 2), var)
+        self.count[rows] = count + observed
+        self.streak[rows] = streak
+
+        return self._transitions(rows, frame.domains, x, expected, z, signed, streak, warm, now)
+
+    def _transitions(self, rows: np.ndarray, domains: Sequence[str], x: np.ndarray, expected: np.ndarray,
+                     z: np.ndarray, signed: np.ndarray, streak: np.ndarray, warm: np.ndarray,
+                     now: datetime) -> List[AlertEvent]:
+        thresholds = np.array([level for _, level in self.severities])
+        # Most severe band the residual is beyond; -1 inside every band
+        beyond = signed[np.newaxis] > thresholds[:, np.newaxis, np.newaxis]
+        level = np.where(beyond.any(axis=0), beyond.argmax(axis=0), -1)
+
+        firing_level = self.firing_level[rows]
+        fire = (streak >= self.min_consecutive) & (level >= 0) & (level != firing_level)
+        resolve = (firing_level >= 0) & warm & (signed < self.resolve_z)
+        self.firing_level[rows] = np.where(fire, level, np.where(resolve, -1, firing_level))
+
+        events = []
+        for i, j in zip(*np.nonzero(fire | resolve)):
+            field = self.fields[j]
+            alert_id = f"anomaly_{field}_{domains[i]}"
+            previous = self.active.get(alert_id)
+
+            if resolve[i, j]:
+                self.active.pop(alert_id, None)
+                events.append(AlertEvent(
+                    alert_id=alert_id,
+                    rule='anomaly',
+                    domain=domains[i],
+                    metric_type=self.metric_types.get(field),
+                    status=RESOLVED,
+                    severity=previous.severity if previous else None,
+                    message=f"Resolved: {previous.message}" if previous else f"{field} back within its band",
+                    value=float(x[i, j]),
+                    threshold=float(expected[i, j]),
+                    since=now
+                ))
+                continue
+
+            event = AlertEvent(
+                alert_id=alert_id,
+                rule='anomaly',
+                domain=domains[i],
+                metric_type=self.metric_types.get(field),
+                status=FIRING,
+                severity=self.severities[level[i, j]][0],
+                message=f"Anomalous {field}: {x[i, j]:.4g} vs expected {expected[i, j]:.4g} (z={z[i, j]:+.1f})",
+                value=float(x[i, j]),
+                threshold=float(expected[i, j]),
+                since=previous.since if previous else now,
+                acknowledged=previous.acknowledged if previous else False
+            )
+            self.active[alert_id] = event
+            events.append(event)
+
+        return events
+
+    def acknowledge(self, alert_id: str) -> bool:
+        event = self.active.get(alert_id)
+        if event is None:
+            return False
+        event.acknowledged = True
+        return True
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Dashboard Chart Cache
+Versioned Plotly figure cache with LTTB downsampling
+
+Figures are built once per (chart, snapshot version, parameters) key and
+kept in a bounded LRU, so every session rendering the same chart version
+reuses one build. Long time series are reduced server-side with
+Largest-Triangle-Three-Buckets, which keeps the visual shape (peaks and
+dips) while capping the points sent to the browser.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+import plotly.graph_objects as go
+
+logger = logging.getLogger(__name__)
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the Largest-Triangle-Three-Buckets downsample of (x, y)"""
+    finite = np.flatnonzero(np.isfinite(y))
+    n = len(finite)
+    if threshold >= n or threshold < 3:
+        return finite
+
+    xs = np.asarray(x, dtype=np.float64)[finite]
+    ys = np.asarray(y, dtype=np.float64)[finite]
+
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    anchor = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = xs[end:edges[i + 2]].mean()
+            next_y = ys[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = xs[-1], ys[-1]
+
+        # Twice the triangle area formed with the anchor and the next bucket's mean
+        area = np.abs(
+            (xs[anchor] - next_x) * (ys[start:end] - ys[anchor])
+            - (xs[anchor] - xs[start:end]) * (next_y - ys[anchor])
+        )
+        anchor = start + int(area.argmax())
+        selected[i + 1] = anchor
+
+    return finite[selected]
+
+class FigureCache:
+    """Bounded LRU of built figures, shared across sessions"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, go.Figure]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def figure(self, key: Hashable, builder: Callable[[], go.Figure]) -> go.Figure:
+        """Cached figure for key (shared, do not mutate)"""
+        with self._lock:
+            figure = self._entries.get(key)
+            if figure is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return figure
+
+        # Build outside the lock; concurrent misses on one key just build twice
+        figure = builder()
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
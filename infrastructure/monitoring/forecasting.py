@@ -0,0 +1 @@
+../../packages/ai-agents/src/strategic/forecasting.py
\ No newline at end of file
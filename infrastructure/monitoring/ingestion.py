@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Metric Ingestion Service
+Concurrent background polling of per-domain metric sources
+
+Each (domain, source) pair runs its own asyncio polling loop with the
+source's interval, jitter and timeout, sharing one pooled HTTP session.
+Values are merged per domain and compared with the last values seen, and
+only domains whose metrics actually changed are handed to the consumer in
+coalesced batches, off the event loop.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Awaitable, Callable
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# fetch(domain, session) -> {metric field: value}
+SourceFetcher = Callable[[str, aiohttp.ClientSession], Awaitable[Dict[str, Any]]]
+
+@dataclass
+class MetricSource:
+    """A pollable source of metric fields for every domain"""
+    name: str
+    fetch: SourceFetcher
+    interval: float = 60.0
+    timeout: float = 10.0
+    jitter: float = 0.1  # +/- fraction of the interval
+    max_backoff: float = 8.0  # cap on the interval multiplier after failures
+
+@dataclass
+class SourceStats:
+    """Polling outcomes for one source"""
+    polls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    changes: int = 0
+    last_latency: float = 0.0
+
+def http_json_source(name: str, url_template: str, fields: List[str], **options) -> MetricSource:
+    """Source reading fields from a JSON endpoint; url_template may use {domain}"""
+    async def fetch(domain: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        async with session.get(url_template.format(domain=domain)) as response:
+            response.raise_for_status()
+            payload = await response.json()
+        return {key: payload[key] for key in fields if key in payload}
+
+    return MetricSource(name=name, fetch=fetch, **options)
+
+class IngestionService:
+    """Polls every domain's sources concurrently and publishes changed domains"""
+
+    def __init__(self, domains: List[str], sources: List[MetricSource],
+                 on_change: Callable[[Dict[str, Dict[str, Any]]], None],
+                 publish_interval: float = 1.0, max_concurrency: int = 32, pool_size: int = 32,
+                 initial_values: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.domains = list(domains)
+        self.sources = list(sources)
+        self.on_change = on_change
+        self.publish_interval = publish_interval
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.stats: Dict[str, SourceStats] = {source.name: SourceStats() for source in self.sources}
+
+        self._values: Dict[str, Dict[str, Any]] = {d: dict((initial_values or {}).get(d, {})) for d in self.domains}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Run the service on its own event loop thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="metric-ingestion", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def run(self):
+        """Poll until stopped"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [
+                asyncio.create_task(self._poll(domain, source, session, semaphore))
+                for domain in self.domains for source in self.sources
+            ]
+            tasks.append(asyncio.create_task(self._publish_loop()))
+            logger.info(f"Ingestion started: {len(self.domains)} domains x {len(self.sources)} sources")
+
+            await self._stop.wait()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Hand over anything collected since the last publish
+        await self._publish()
+
+    async def _poll(self, domain: str, source: MetricSource, session: aiohttp.ClientSession,
+                    semaphore: asyncio.Semaphore):
+        stats = self.stats[source.name]
+        failures = 0
+
+        # Random phase so sources don't all fire on the same tick
+        await asyncio.sleep(random.uniform(0, source.interval))
+
+        while True:
+            started = time.perf_counter()
+            try:
+                async with semaphore:
+                    values = await asyncio.wait_for(source.fetch(domain, session), source.timeout)
+                stats.polls += 1
+                stats.last_latency = time.perf_counter() - started
+                failures = 0
+                self._merge(domain, source, values)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                failures += 1
+                logger.warning(f"{source.name} timed out for {domain} after {source.timeout}s")
+            except Exception as e:
+                stats.failures += 1
+                failures += 1
+                logger.error(f"{source.name} poll failed for {domain}: {str(e)}")
+
+            backoff = min(2 ** failures, source.max_backoff) if failures else 1
+            delay = source.interval * backoff * random.uniform(1 - source.jitter, 1 + source.jitter)
+            await asyncio.sleep(delay)
+
+    def _merge(self, domain: str, source: MetricSource, values: Dict[str, Any]):
+        """Record values that differ from the last ones seen for the domain"""
+        current = self._values[domain]
+        changed = {key: value for key, value in values.items() if current.get(key) != value}
+        if changed:
+            current.update(changed)
+            self._pending.setdefault(domain, {}).update(changed)
+            self.stats[source.name].changes += 1
+
+    async def _publish_loop(self):
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            await self._publish()
+
+    async def _publish(self):
+        if not self._pending:
+            return
+        changes, self._pending = self._pending, {}
+        try:
+            # Consumers do blocking work (numpy, disk), keep it off the loop
+            await asyncio.get_running_loop().run_in_executor(None, self.on_change, changes)
+        except Exception as e:
+            logger.error(f"Failed to publish metric changes: {str(e)}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Live Dashboard Updates
+Push channel for metric deltas and alert transitions
+
+The ingestion side publishes small, versioned messages: per-domain metric
+deltas and alert state changes. Viewers subscribe and apply them to the
+cells they already hold, instead of recomputing or re-fetching the page.
+LocalUpdateBus fans out in-process; RedisUpdateBus relays the same
+messages over Redis pub/sub so viewers in other processes receive them.
+A subscriber that falls behind or sees a version gap is flagged for a
+full resync from the current snapshot.
+"""
+
+import json
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Dict, List, Any
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """Bounded per-viewer queue of pushed updates"""
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self.needs_resync = True  # new viewers start from a full snapshot
+        self._versions: Dict[str, int] = {}
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+
+    def _deliver(self, message: Dict[str, Any]):
+        with self._lock:
+            if len(self._queue) >= self.max_pending:
+                # Too far behind: drop the backlog and resync instead
+                self._queue.clear()
+                self.needs_resync = True
+                return
+            self._queue.append(message)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Pending updates in publish order, skipping ones already applied"""
+        with self._lock:
+            messages = list(self._queue)
+            self._queue.clear()
+
+        fresh = []
+        for message in messages:
+            source, version = message['source'], message['version']
+            last = self._versions.get(source)
+            if last is not None and version <= last:
+                continue
+            if last is not None and version > last + 1:
+                self.needs_resync = True
+            self._versions[source] = version
+            fresh.append(message)
+        return fresh
+
+    def resynced(self, source: str, version: int):
+        """Record that the viewer reloaded full state at a snapshot version"""
+        self.needs_resync = False
+        self._versions[source] = version
+
+class LocalUpdateBus:
+    """In-process fan-out to every live subscription"""
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        # Subscriptions die with their viewer session
+        self._subscribers: "weakref.WeakSet[Subscription]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _fan_out(self, message: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._deliver(message)
+
+    def publish(self, message: Dict[str, Any]):
+        self._fan_out(message)
+
+    def close(self):
+        pass
+
+class RedisUpdateBus(LocalUpdateBus):
+    """Relay updates through a Redis pub/sub channel"""
+
+    def __init__(self, redis_client, channel: str = 'dashboard:updates', max_pending: int = 1000):
+        super().__init__(max_pending)
+        self.redis_client = redis_client
+        self.channel = channel
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: self._on_message})
+        self._listener = self._pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+    def _on_message(self, raw: Dict[str, Any]):
+        try:
+            data = raw['data']
+            self._fan_out(json.loads(data.decode() if isinstance(data, bytes) else data))
+        except Exception as e:
+            logger.error(f"Dropping malformed dashboard update: {str(e)}")
+
+    def publish(self, message: Dict[str, Any]):
+        try:
+            self.redis_client.publish(self.channel, json.dumps(message, default=str))
+        except Exception as e:
+            # Keep local viewers live even when Redis is unavailable
+            logger.error(f"Failed to publish dashboard update: {str(e)}")
+            self._fan_out(message)
+
+    def close(self):
+        self._listener.stop()
+        self._pubsub.close()
+
+def update_message(source: str, version: int, changes: Dict[str, Dict[str, Any]],
+                   alert_events: List[Any]) -> Dict[str, Any]:
+    """One message per published snapshot version"""
+    return {
+        'source': source,
+        'version': version,
+        'metrics': changes,
+        'alerts': [
+            {
+                'alert_id': event.alert_id,
+                'domain': event.domain,
+                'status': event.status,
+                'severity': getattr(event.severity, 'value', event.severity),
+                'message': event.message,
+                'value': event.value,
+                'since': event.since.isoformat()
+            }
+            for event in alert_events
+        ]
+    }
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Columnar Metric Store
+Domain x metric matrices backing the performance dashboard
+
+MetricFrame holds the latest value of every numeric DomainMetrics field as
+one (domain, metric) float64 matrix, so dashboard aggregates are single
+vectorized reductions. ColumnarMetricStore keeps a bounded in-memory
+history of frames as a (time, domain, metric) array.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Numeric DomainMetrics fields, in column order
+METRIC_FIELDS: Tuple[str, ...] = (
+    'monthly_revenue',
+    'daily_visitors',
+    'conversion_rate',
+    'avg_session_duration',
+    'bounce_rate',
+    'page_speed_score',
+    'seo_score',
+    'mobile_performance',
+    'uptime_percentage'
+)
+
+FIELD_INDEX: Dict[str, int] = {name: i for i, name in enumerate(METRIC_FIELDS)}
+
+class MetricFrame:
+    """Latest metrics as a (domain, metric) matrix"""
+
+    def __init__(self, domains: Sequence[str], values: np.ndarray, updated_at: np.ndarray):
+        self.domains: List[str] = list(domains)
+        self.domain_index: Dict[str, int] = {domain: i for i, domain in enumerate(self.domains)}
+        self.values = np.asarray(values, dtype=np.float64)
+        self.updated_at = np.asarray(updated_at, dtype='datetime64[s]')
+        self.values.setflags(write=False)
+
+    @classmethod
+    def from_metrics(cls, domain_metrics: Dict[str, Any]) -> "MetricFrame":
+        """Build a frame from a {domain: DomainMetrics} mapping"""
+        domains = list(domain_metrics.keys())
+        values = np.array(
+            [[getattr(domain_metrics[d], field) for field in METRIC_FIELDS] for d in domains],
+            dtype=np.float64
+        ).reshape(len(domains), len(METRIC_FIELDS))
+        updated_at = np.array(
+            [np.datetime64(domain_metrics[d].last_updated, 's') for d in domains],
+            dtype='datetime64[s]'
+        )
+        return cls(domains, values, updated_at)
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def column(self, field: str) -> np.ndarray:
+        """All domains' values for one metric (read-only view)"""
+        return self.values[:, FIELD_INDEX[field]]
+
+    def columns(self, fields: Sequence[str]) -> np.ndarray:
+        return self.values[:, [FIELD_INDEX[f] for f in fields]]
+
+    def sum(self, field: str) -> float:
+        return float(self.column(field).sum()) if len(self) else 0.0
+
+    def mean(self, field: str) -> float:
+        return float(self.column(field).mean()) if len(self) else 0.0
+
+    def means(self, fields: Sequence[str]) -> Dict[str, float]:
+        """Means of several metrics in one reduction"""
+        if not len(self):
+            return {f: 0.0 for f in fields}
+        return dict(zip(fields, self.columns(fields).mean(axis=0).tolist()))
+
+    def by_domain(self, field: str) -> Dict[str, float]:
+        return dict(zip(self.domains, self.column(field).tolist()))
+
+    def row(self, domain: str) -> Dict[str, float]:
+        return dict(zip(METRIC_FIELDS, self.values[self.domain_index[domain]].tolist()))
+
+    def top_domains(self, fields: Sequence[str], k: int) -> List[str]:
+        """Domains with the highest summed score over the given metrics"""
+        score = self.columns(fields).sum(axis=1)
+        k = min(k, len(self))
+        if k == 0:
+            return []
+        best = np.argpartition(-score, k - 1)[:k]
+        return [self.domains[i] for i in best[np.argsort(-score[best], kind='stable')]]
+
+class ColumnarMetricStore:
+    """Bounded (time, domain, metric) history of metric frames"""
+
+    def __init__(self, capacity: int = 1440):
+        self.capacity = capacity
+        self.domains: List[str] = []
+        self.domain_index: Dict[str, int] = {}
+        self._values = np.full((capacity, 0, len(METRIC_FIELDS)), np.nan)
+        self._timestamps = np.zeros(capacity, dtype='datetime64[s]')
+        self._count = 0
+        self._head = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _ensure_domains(self, domains: Sequence[str]) -> np.ndarray:
+        """Row index of each domain, growing the domain axis for new ones"""
+        new = [d for d in domains if d not in self.domain_index]
+        if new:
+            for domain in new:
+                self.domain_index[domain] = len(self.domains)
+                self.domains.append(domain)
+            self._values = np.pad(
+                self._values, ((0, 0), (0, len(new)), (0, 0)), constant_values=np.nan
+            )
+        return np.array([self.domain_index[d] for d in domains], dtype=np.intp)
+
+    def append(self, frame: MetricFrame, timestamp: Optional[datetime] = None):
+        """Add a frame as the newest time slice"""
+        rows = self._ensure_domains(frame.domains)
+        slot = self._head
+        self._values[slot] = np.nan
+        self._values[slot, rows] = frame.values
+        self._timestamps[slot] = np.datetime64(timestamp or datetime.now(), 's')
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def history(self, since: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values[time, domain, metric]) in chronological order"""
+        order = (np.arange(self._count) + self._head - self._count) % self.capacity
+        timestamps = self._timestamps[order]
+        values = self._values[order]
+        if since is not None:
+            keep = timestamps >= np.datetime64(since, 's')
+            timestamps, values = timestamps[keep], values[keep]
+        return timestamps, values
+
+    def tail(self, n: int) -> np.ndarray:
+        """values[time, domain, metric] for the newest n frames, oldest first"""
+        n = min(n, self._count)
+        order = (np.arange(self._head - n, self._head)) % self.capacity
+        return self._values[order]
+
+    def series(self, field: str, since: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values[time, domain]) for one metric"""
+        timestamps, values = self.history(since)
+        return timestamps, values[:, :, FIELD_INDEX[field]]
@@ -8,11 +8,15 @@ with AI-enhanced insights, predictive analytics, and automated alerting.
 """
 
 import asyncio
+import functools
 import json
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+import uuid
+from typing import Dict, List, Optional, Any, IO, Tuple, Union
+from collections import Counter
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
@@ -28,6 +32,17 @@ import requests
 from dataclasses import dataclass
 from enum import Enum
 
+# Symlink to packages/ai-agents/src/strategic/forecasting.py: one shared forecaster
+from forecasting import ForecastModel, PortfolioForecaster
+from metric_store import METRIC_FIELDS, ColumnarMetricStore, MetricFrame
+from timeseries_store import TimeSeriesStore
+from ingestion import IngestionService, MetricSource, http_json_source
+from alert_rules import RESOLVED, AlertEngine, AlertRule
+from anomaly_detection import EWMAAnomalyDetector
+from chart_cache import FigureCache, lttb
+from report_export import export_history
+from live_updates import LocalUpdateBus, RedisUpdateBus, update_message
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -64,6 +79,22 @@ class DomainMetrics:
     uptime_percentage: float
     last_updated: datetime
 
+# Dashboard category of each numeric DomainMetrics field
+FIELD_METRIC_TYPES = {
+    'monthly_revenue': MetricType.REVENUE,
+    'daily_visitors': MetricType.TRAFFIC,
+    'conversion_rate': MetricType.CONVERSION,
+    'avg_session_duration': MetricType.ENGAGEMENT,
+    'bounce_rate': MetricType.ENGAGEMENT,
+    'page_speed_score': MetricType.PERFORMANCE,
+    'seo_score': MetricType.PERFORMANCE,
+    'mobile_performance': MetricType.PERFORMANCE,
+    'uptime_percentage': MetricType.TECHNICAL
+}
+
+# Charts built by ComprehensivePerformanceDashboard._build_<name>_chart
+DASHBOARD_CHARTS = ('revenue_by_domain', 'traffic_conversion', 'performance_radar', 'revenue_history')
+
 @dataclass
 class Alert:
     """Alert configuration"""
@@ -87,6 +118,45 @@ class PerformancePrediction:
     confidence_interval: float
     trend_direction: str
     time_horizon: int  # days
+    lower_bound: Optional[float] = None
+    upper_bound: Optional[float] = None
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Immutable view of dashboard state, swapped atomically on refresh"""
+    version: int
+    domain_metrics: Dict[str, DomainMetrics]
+    frame: MetricFrame
+    alerts: List[Alert]
+    predictions: List[PerformancePrediction]
+    created_at: datetime
+    # Bumped only when that part of the state is replaced
+    metrics_version: int = 0
+    alerts_version: int = 0
+    predictions_version: int = 0
+
+def snapshot_view(*parts: str):
+    """Memoize a view builder until one of the snapshot parts it reads changes
+
+    The snapshot is read once and passed to the builder, so the result always
+    matches the versions it is cached under. Cached results are shared between
+    sessions and must not be mutated.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            snapshot = self.snapshot
+            versions = tuple(getattr(snapshot, f"{part}_version") for part in parts)
+            key = (method.__name__,) + args
+            cached = self._view_cache.get(key)
+            if cached is not None and cached[0] == versions:
+                return cached[1]
+            
+            result = method(self, snapshot, *args)
+            self._view_cache[key] = (versions, result)
+            return result
+        return wrapper
+    return decorator
 
 class ComprehensivePerformanceDashboard:
     """Comprehensive Performance Monitoring Dashboard"""
@@ -106,10 +176,33 @@ class ComprehensivePerformanceDashboard:
             decode_responses=True
         )
         
-        # Dashboard state
-        self.alerts: List[Alert] = []
-        self.domain_metrics: Dict[str, DomainMetrics] = {}
-        self.predictions: List[PerformancePrediction] = []
+        # Dashboard state, published as a snapshot readers never see half-built
+        self.snapshot = DashboardSnapshot(
+            version=0,
+            domain_metrics={},
+            frame=MetricFrame.from_metrics({}),
+            alerts=[],
+            predictions=[],
+            created_at=datetime.now()
+        )
+        self._refresh_lock = threading.Lock()
+        self._view_cache: Dict[tuple, Tuple[tuple, Any]] = {}
+        self.figure_cache = FigureCache(max_entries=config.get('figure_cache_size', 128))
+        
+        # Columnar (time, domain, metric) history behind every aggregate
+        self.metric_store = ColumnarMetricStore(capacity=config.get('history_capacity', 1440))
+        
+        # Tiered on-disk history for long-range trends
+        self.history_store = TimeSeriesStore(config.get('history_dir', 'data/metric_history'))
+        self._ingestion: Optional[IngestionService] = None
+        self._last_forecast = 0.0
+        
+        # Push channel for metric deltas and alert transitions to live viewers
+        self.update_source = uuid.uuid4().hex
+        self.update_bus = self._create_update_bus()
+        
+        # Batched forecaster over every domain x metric series
+        self.forecaster: Optional[PortfolioForecaster] = None
         
         # Performance thresholds
         self.thresholds = {
@@ -131,26 +224,82 @@ class ComprehensivePerformanceDashboard:
             }
         }
         
+        # Declarative alert rules with tracked alert state
+        self.alert_engine = AlertEngine(self._build_alert_rules())
+        self._active_alerts: Dict[str, Alert] = {}
+        self._alert_list: List[Alert] = []
+        self._last_alert_events: list = []
+        
+        # Online anomaly bands per domain x metric, fed from the ingestion path
+        directions = {field: -1 for field in METRIC_FIELDS}
+        directions['bounce_rate'] = 1
+        self.anomaly_detector = EWMAAnomalyDetector(
+            alpha=config.get('anomaly_alpha', 0.05),
+            warmup=config.get('anomaly_warmup', 30),
+            severities=(
+                (AlertSeverity.CRITICAL, config.get('anomaly_critical_z', 6.0)),
+                (AlertSeverity.WARNING, config.get('anomaly_warning_z', 4.0))
+            ),
+            directions=directions,
+            metric_types=FIELD_METRIC_TYPES
+        )
+        
         # Initialize dashboard
         self._initialize_dashboard()
         
         logger.info("Performance Dashboard initialized successfully")
 
+    @property
+    def domain_metrics(self) -> Dict[str, DomainMetrics]:
+        return self.snapshot.domain_metrics
+    
+    @property
+    def frame(self) -> MetricFrame:
+        return self.snapshot.frame
+    
+    @property
+    def alerts(self) -> List[Alert]:
+        return self.snapshot.alerts
+    
+    @property
+    def predictions(self) -> List[PerformancePrediction]:
+        return self.snapshot.predictions
+
     def _initialize_dashboard(self):
         """Initialize dashboard with real-time data"""
-        # Load current metrics
-        self._load_domain_metrics()
-        
-        # Initialize alerts
-        self._check_alerts()
-        
-        # Generate predictions
-        self._generate_predictions()
+        # Load metrics, alerts and predictions
+        self.refresh()
         
         # Start background monitoring
-        self._start_monitoring()
+        if self.config.get('background_refresh', True):
+            self._start_monitoring()
 
-    def _load_domain_metrics(self):
+    def refresh(self) -> DashboardSnapshot:
+        """Rebuild dashboard state off to the side, then publish it in one swap"""
+        with self._refresh_lock:
+            domain_metrics = self._load_domain_metrics()
+            frame = MetricFrame.from_metrics(domain_metrics)
+            now = datetime.now()
+            self.metric_store.append(frame, now)
+            self.history_store.append_frame(frame, now)
+            
+            alerts = self._check_alerts(frame)
+            predictions = self._generate_predictions(domain_metrics)
+            self._last_forecast = time.monotonic()
+            
+            changes = {domain: frame.row(domain) for domain in frame.domains}
+            return self._publish_snapshot(domain_metrics, frame, alerts, predictions, changes, self._last_alert_events)
+
+    def _create_update_bus(self) -> LocalUpdateBus:
+        """Redis relay when configured, otherwise in-process fan-out"""
+        if self.config.get('live_updates') == 'redis':
+            try:
+                return RedisUpdateBus(self.redis_client, self.config.get('live_updates_channel', 'dashboard:updates'))
+            except Exception as e:
+                logger.error(f"Redis live updates unavailable, using local fan-out: {str(e)}")
+        return LocalUpdateBus()
+
+    def _load_domain_metrics(self) -> Dict[str, DomainMetrics]:
         """Load metrics for all domains"""
         domains = [
             'antonylambi.be',
@@ -166,8 +315,7 @@ class ComprehensivePerformanceDashboard:
             'affinitylove.eu'
         ]
         
-        for domain in domains:
-            self.domain_metrics[domain] = self._generate_mock_metrics(domain)
+        return {domain: self._generate_mock_metrics(domain) for domain in domains}
 
     def _generate_mock_metrics(self, domain: str) -> DomainMetrics:
         """Generate realistic mock metrics for domain"""
@@ -208,131 +356,272 @@ class ComprehensivePerformanceDashboard:
             last_updated=datetime.now()
         )
 
-    def _check_alerts(self):
-        """Check metrics against thresholds and generate alerts"""
-        self.alerts = []
-        
-        for domain, metrics in self.domain_metrics.items():
-            # Revenue alerts
-            if metrics.monthly_revenue < 1000:  # Very low revenue threshold
-                self.alerts.append(Alert(
-                    alert_id=f"revenue_{domain}",
-                    domain=domain,
-                    metric_type=MetricType.REVENUE,
-                    severity=AlertSeverity.CRITICAL,
-                    message=f"Monthly revenue below €1,000: €{metrics.monthly_revenue:.0f}",
-                    threshold_value=1000,
-                    current_value=metrics.monthly_revenue,
-                    created_at=datetime.now()
-                ))
-            
-            # Performance alerts
-            if metrics.page_speed_score < 70:
-                self.alerts.append(Alert(
-                    alert_id=f"speed_{domain}",
-                    domain=domain,
-                    metric_type=MetricType.PERFORMANCE,
-                    severity=AlertSeverity.WARNING,
-                    message=f"Page speed score below 70: {metrics.page_speed_score:.1f}",
-                    threshold_value=70,
-                    current_value=metrics.page_speed_score,
-                    created_at=datetime.now()
-                ))
+    def _build_alert_rules(self) -> List[AlertRule]:
+        """Alert rules from config['alert_rules'], defaulting to the threshold table"""
+        configured = self.config.get('alert_rules')
+        if configured:
+            return [
+                AlertRule(
+                    **{key: value for key, value in rule.items() if key not in ('metric_type', 'levels')},
+                    metric_type=MetricType(rule['metric_type']),
+                    levels=tuple((AlertSeverity(severity), threshold) for severity, threshold in rule['levels'].items())
+                )
+                for rule in configured
+            ]
+        
+        baseline_window = self.config.get('alert_baseline_window', 60)
+        
+        def levels(metric_type: MetricType) -> Tuple[Tuple[AlertSeverity, float], ...]:
+            return tuple((AlertSeverity(severity), threshold) for severity, threshold in self.thresholds[metric_type].items())
+        
+        return [
+            AlertRule(
+                name='revenue', field='monthly_revenue', metric_type=MetricType.REVENUE,
+                levels=((AlertSeverity.CRITICAL, 1000),),
+                message="Monthly revenue below €{threshold:,.0f}: €{value:.0f}"
+            ),
+            AlertRule(
+                name='revenue_target', field='monthly_revenue', metric_type=MetricType.REVENUE,
+                levels=levels(MetricType.REVENUE), window=3, aggregate='mean',
+                baseline_window=baseline_window, for_ticks=2, hysteresis=0.05,
+                message="Revenue at {value:.0%} of trailing baseline (threshold {threshold:.0%})"
+            ),
+            AlertRule(
+                name='traffic_target', field='daily_visitors', metric_type=MetricType.TRAFFIC,
+                levels=levels(MetricType.TRAFFIC), window=3, aggregate='mean',
+                baseline_window=baseline_window, for_ticks=2, hysteresis=0.05,
+                message="Traffic at {value:.0%} of trailing baseline (threshold {threshold:.0%})"
+            ),
+            AlertRule(
+                name='conversion', field='conversion_rate', metric_type=MetricType.CONVERSION,
+                levels=levels(MetricType.CONVERSION), window=3, aggregate='mean', hysteresis=0.1,
+                message="Conversion rate below {threshold:.1%}: {value:.1%}"
+            ),
+            AlertRule(
+                name='speed', field='page_speed_score', metric_type=MetricType.PERFORMANCE,
+                levels=levels(MetricType.PERFORMANCE), hysteresis=0.05,
+                message="Page speed score below {threshold:.0f}: {value:.1f}"
+            ),
+            AlertRule(
+                name='uptime', field='uptime_percentage', metric_type=MetricType.TECHNICAL,
+                levels=((AlertSeverity.CRITICAL, 99.0),), hysteresis=0.002,
+                message="Uptime below {threshold:.0f}%: {value:.1f}%"
+            )
+        ]
+
+    def _check_alerts(self, observed: MetricFrame, domains: Optional[List[str]] = None) -> List[Alert]:
+        """Evaluate alert rules and anomaly bands, updating only alerts that changed"""
+        events = self.alert_engine.evaluate(self.metric_store, domains)
+        events.extend(self.anomaly_detector.update(observed))
+        self._last_alert_events = events
+        
+        for event in events:
+            if event.status == RESOLVED:
+                self._active_alerts.pop(event.alert_id, None)
+            else:
+                self._active_alerts[event.alert_id] = Alert(
+                    alert_id=event.alert_id,
+                    domain=event.domain,
+                    metric_type=event.metric_type,
+                    severity=event.severity,
+                    message=event.message,
+                    threshold_value=event.threshold,
+                    current_value=event.value,
+                    created_at=event.since,
+                    acknowledged=event.acknowledged
+                )
+            logger.info(f"Alert {event.status}: {event.alert_id} - {event.message}")
+        
+        # Keep the same list while nothing changed so alert views stay cached
+        if events:
+            self._alert_list = list(self._active_alerts.values())
+        return self._alert_list
+
+    def acknowledge_alert(self, alert_id: str) -> bool:
+        """Acknowledge a firing alert and publish the change"""
+        with self._refresh_lock:
+            if not (self.alert_engine.acknowledge(alert_id) or self.anomaly_detector.acknowledge(alert_id)):
+                return False
+            self._active_alerts[alert_id] = replace(self._active_alerts[alert_id], acknowledged=True)
+            self._alert_list = list(self._active_alerts.values())
+            event = self.alert_engine.active.get(alert_id) or self.anomaly_detector.active.get(alert_id)
             
-            # Conversion rate alerts
-            if metrics.conversion_rate < 0.015:  # Below 1.5%
-                self.alerts.append(Alert(
-                    alert_id=f"conversion_{domain}",
-                    domain=domain,
-                    metric_type=MetricType.CONVERSION,
-                    severity=AlertSeverity.WARNING,
-                    message=f"Conversion rate below 1.5%: {metrics.conversion_rate:.1%}",
-                    threshold_value=0.015,
-                    current_value=metrics.conversion_rate,
-                    created_at=datetime.now()
-                ))
+            snapshot = self.snapshot
+            self._publish_snapshot(snapshot.domain_metrics, snapshot.frame, self._alert_list, snapshot.predictions,
+                                   {}, [replace(event, status='acknowledged')])
+            return True
+
+    def _generate_predictions(self, domain_metrics: Dict[str, DomainMetrics]) -> List[PerformancePrediction]:
+        """Forecast revenue and traffic per domain from the daily history tier"""
+        days_ahead = self.config.get('forecast_horizon_days', 30)
+        window = self.config.get('forecast_window', 90)
+        domains = list(domain_metrics.keys())
+        predicted_fields = [
+            (MetricType.REVENUE, 'monthly_revenue'),
+            (MetricType.TRAFFIC, 'daily_visitors')
+        ]
+        keys = [(domain, metric_type) for metric_type, _ in predicted_fields for domain in domains]
+        
+        # (Re)build the forecaster when the domain set changes
+        if self.forecaster is None or self.forecaster.keys != keys:
+            self.forecaster = PortfolioForecaster(
+                keys,
+                model=ForecastModel(self.config.get('forecast_model', ForecastModel.LINEAR.value)),
+                window=window,
+                confidence=self.config.get('forecast_confidence', 0.85)
+            )
+        
+        # One step per day: closed daily buckets, with today's current values as the last step
+        current = np.array([
+            float(getattr(domain_metrics[domain], field))
+            for _, field in predicted_fields for domain in domains
+        ])
+        daily = np.vstack([
+            self.history_store.aligned_history(domains, field, '1d', window - 1)
+            for _, field in predicted_fields
+        ])
+        history = np.column_stack([daily, current])
+        history = history[:, int(np.argmax(np.isfinite(history).any(axis=0))):]
+        
+        forecast = self.forecaster.fit(history).forecast(days_ahead)
+        predicted, lower, upper = forecast.at_horizon()
+        directions = forecast.trend_directions()
+        
+        return [
+            PerformancePrediction(
+                domain=domain,
+                metric_type=metric_type,
+                current_value=current[i],
+                predicted_value=float(predicted[i]),
+                confidence_interval=forecast.confidence,
+                trend_direction=directions[i],
+                time_horizon=days_ahead,
+                lower_bound=float(lower[i]),
+                upper_bound=float(upper[i])
+            )
+            for i, (domain, metric_type) in enumerate(keys)
+        ]
+
+    def _start_monitoring(self):
+        """Start background metric ingestion"""
+        if self._ingestion is not None:
+            return
+        
+        self._ingestion = IngestionService(
+            domains=list(self.domain_metrics),
+            sources=self._metric_sources(),
+            on_change=self._apply_changes,
+            publish_interval=self.config.get('publish_interval', 5.0),
+            max_concurrency=self.config.get('ingestion_concurrency', 32),
+            initial_values={domain: asdict(metrics) for domain, metrics in self.domain_metrics.items()}
+        )
+        self._ingestion.start()
+    
+    def stop_monitoring(self):
+        """Stop background metric ingestion"""
+        if self._ingestion is not None:
+            self._ingestion.stop()
+            self._ingestion = None
+
+    def _metric_sources(self) -> List[MetricSource]:
+        """Configured HTTP metric sources, or mock sources when none are configured"""
+        refresh_interval = self.config.get('refresh_interval', 60)
+        configured = self.config.get('metric_sources')
+        if configured:
+            return [
+                http_json_source(
+                    source['name'],
+                    source['url'],
+                    source['fields'],
+                    interval=source.get('interval', refresh_interval),
+                    timeout=source.get('timeout', 10.0)
+                )
+                for source in configured
+            ]
+        
+        def mock_source(name: str, fields: List[str], interval: float) -> MetricSource:
+            async def fetch(domain, session):
+                metrics = self._generate_mock_metrics(domain)
+                return {field: getattr(metrics, field) for field in fields}
+            return MetricSource(name=name, fetch=fetch, interval=interval)
+        
+        return [
+            mock_source('analytics', ['monthly_revenue', 'daily_visitors', 'conversion_rate',
+                                      'avg_session_duration', 'bounce_rate'], refresh_interval),
+            mock_source('lighthouse', ['page_speed_score', 'seo_score', 'mobile_performance'], refresh_interval * 5),
+            mock_source('uptime', ['uptime_percentage'], refresh_interval / 2)
+        ]
+
+    def _apply_changes(self, changes: Dict[str, Dict[str, Any]]) -> DashboardSnapshot:
+        """Publish a snapshot updating only the domains whose metrics changed"""
+        with self._refresh_lock:
+            previous = self.snapshot
+            now = datetime.now()
             
-            # Uptime alerts
-            if metrics.uptime_percentage < 99.0:
-                self.alerts.append(Alert(
-                    alert_id=f"uptime_{domain}",
-                    domain=domain,
-                    metric_type=MetricType.TECHNICAL,
-                    severity=AlertSeverity.CRITICAL,
-                    message=f"Uptime below 99%: {metrics.uptime_percentage:.1f}%",
-                    threshold_value=99.0,
-                    current_value=metrics.uptime_percentage,
-                    created_at=datetime.now()
-                ))
-
-    def _generate_predictions(self):
-        """Generate performance predictions"""
-        self.predictions = []
-        
-        # Time series forecasting for each domain
-        for domain, metrics in self.domain_metrics.items():
-            # Simple linear trend prediction
-            days_ahead = 30
+            changed = {
+                domain: replace(previous.domain_metrics[domain], **values, last_updated=now)
+                for domain, values in changes.items() if domain in previous.domain_metrics
+            }
+            domain_metrics = {**previous.domain_metrics, **changed}
+            frame = MetricFrame.from_metrics(domain_metrics)
+            self.metric_store.append(frame, now)
+            changed_frame = MetricFrame.from_metrics(changed)
+            self.history_store.append_frame(changed_frame, now)
             
-            # Revenue prediction
-            revenue_growth = np.random.uniform(-0.05, 0.15)  # -5% to +15%
-            predicted_revenue = metrics.monthly_revenue * (1 + revenue_growth)
+            # Only freshly polled fields are new observations for anomaly detection
+            polled = np.array([
+                [field in changes[domain] for field in METRIC_FIELDS] for domain in changed_frame.domains
+            ], dtype=bool).reshape(changed_frame.values.shape)
+            observed = MetricFrame(changed_frame.domains, np.where(polled, changed_frame.values, np.nan),
+                                   changed_frame.updated_at)
             
-            self.predictions.append(PerformancePrediction(
-                domain=domain,
-                metric_type=MetricType.REVENUE,
-                current_value=metrics.monthly_revenue,
-                predicted_value=predicted_revenue,
-                confidence_interval=0.85,
-                trend_direction="up" if revenue_growth > 0 else "down",
-                time_horizon=days_ahead
-            ))
+            # Alerts are re-evaluated for changed domains only
+            alerts = self._check_alerts(observed, list(changed))
             
-            # Traffic prediction
-            traffic_growth = np.random.uniform(-0.03, 0.12)
-            predicted_traffic = metrics.daily_visitors * (1 + traffic_growth)
+            # Forecasts are refit from daily history on a fixed cadence, all series at once
+            predictions = previous.predictions
+            if time.monotonic() - self._last_forecast >= self.config.get('forecast_interval', 60):
+                predictions = self._generate_predictions(domain_metrics)
+                self._last_forecast = time.monotonic()
             
-            self.predictions.append(PerformancePrediction(
-                domain=domain,
-                metric_type=MetricType.TRAFFIC,
-                current_value=metrics.daily_visitors,
-                predicted_value=predicted_traffic,
-                confidence_interval=0.80,
-                trend_direction="up" if traffic_growth > 0 else "down",
-                time_horizon=days_ahead
-            ))
+            deltas = {domain: changes[domain] for domain in changed}
+            return self._publish_snapshot(domain_metrics, frame, alerts, predictions, deltas, self._last_alert_events)
 
-    def _start_monitoring(self):
-        """Start background monitoring processes"""
-        # This would start actual monitoring in production
-        # For now, we'll simulate periodic updates
-        
-        def update_metrics():
-            while True:
-                time.sleep(60)  # Update every minute
-                self._load_domain_metrics()
-                self._check_alerts()
-                self._generate_predictions()
-                logger.info("Metrics updated")
-
-        # In production, this would run in a separate thread
-        # threading.Thread(target=update_metrics, daemon=True).start()
-
-    def create_revenue_dashboard(self) -> Dict[str, Any]:
+    def _publish_snapshot(self, domain_metrics: Dict[str, DomainMetrics], frame: MetricFrame,
+                          alerts: List[Alert], predictions: List[PerformancePrediction],
+                          changes: Dict[str, Dict[str, float]], alert_events: list) -> DashboardSnapshot:
+        """Swap in a new snapshot and push its delta; readers holding the old one are unaffected"""
+        previous = self.snapshot
+        self.snapshot = DashboardSnapshot(
+            version=previous.version + 1,
+            domain_metrics=domain_metrics,
+            frame=frame,
+            alerts=alerts,
+            predictions=predictions,
+            created_at=datetime.now(),
+            metrics_version=previous.metrics_version + (domain_metrics is not previous.domain_metrics),
+            alerts_version=previous.alerts_version + (alerts is not previous.alerts),
+            predictions_version=previous.predictions_version + (predictions is not previous.predictions)
+        )
+        # Every version is pushed, even an empty one, so viewers can detect gaps
+        self.update_bus.publish(update_message(self.update_source, self.snapshot.version, changes, alert_events))
+        return self.snapshot
+
+    @snapshot_view('metrics', 'predictions')
+    def create_revenue_dashboard(self, snapshot: DashboardSnapshot) -> Dict[str, Any]:
         """Create revenue analytics dashboard"""
         # Aggregate revenue data
-        total_revenue = sum(m.monthly_revenue for m in self.domain_metrics.values())
-        avg_revenue = total_revenue / len(self.domain_metrics)
+        total_revenue = snapshot.frame.sum('monthly_revenue')
+        avg_revenue = snapshot.frame.mean('monthly_revenue')
         
         # Revenue by domain
-        domain_revenue = {domain: metrics.monthly_revenue 
-                         for domain, metrics in self.domain_metrics.items()}
+        domain_revenue = snapshot.frame.by_domain('monthly_revenue')
         
         # Revenue growth trends
         revenue_trends = self._calculate_revenue_trends()
         
         # Revenue predictions
-        revenue_predictions = [p for p in self.predictions if p.metric_type == MetricType.REVENUE]
+        revenue_predictions = [p for p in snapshot.predictions if p.metric_type == MetricType.REVENUE]
         
         return {
             'total_monthly_revenue': total_revenue,
@@ -340,23 +629,35 @@ class ComprehensivePerformanceDashboard:
             'domain_revenue_breakdown': domain_revenue,
             'growth_trends': revenue_trends,
             'predictions': revenue_predictions,
-            'revenue_health_score': self._calculate_revenue_health()
+            'revenue_health_score': self._calculate_revenue_health(snapshot.frame)
         }
 
     def _calculate_revenue_trends(self) -> Dict[str, float]:
-        """Calculate revenue growth trends"""
-        # Mock trend calculation
+        """Calculate revenue growth trends from stored history"""
+        windows = (7, 30, 90)
+        growth = {
+            days: self.history_store.growth('monthly_revenue', timedelta(days=days))
+            for days in windows
+        }
+        
+        # Annualise the longest window that has history behind it
+        annual_projection = 0.0
+        for days in reversed(windows):
+            if growth[days] is not None:
+                annual_projection = (1 + growth[days]) ** (365 / days) - 1
+                break
+        
         return {
-            '7_day_growth': np.random.uniform(-0.05, 0.12),
-            '30_day_growth': np.random.uniform(-0.10, 0.25),
-            '90_day_growth': np.random.uniform(-0.15, 0.40),
-            'annual_projection': np.random.uniform(0.20, 0.60)
+            '7_day_growth': growth[7] or 0.0,
+            '30_day_growth': growth[30] or 0.0,
+            '90_day_growth': growth[90] or 0.0,
+            'annual_projection': annual_projection
         }
 
-    def _calculate_revenue_health(self) -> float:
+    def _calculate_revenue_health(self, frame: MetricFrame) -> float:
         """Calculate overall revenue health score"""
         # Score based on revenue distribution and growth
-        revenues = [m.monthly_revenue for m in self.domain_metrics.values()]
+        revenues = frame.column('monthly_revenue')
         
         # Higher score for more balanced distribution
         balance_score = 1 - (np.std(revenues) / np.mean(revenues))
@@ -366,10 +667,12 @@ class ComprehensivePerformanceDashboard:
         
         return min(100, (balance_score + growth_score) * 50)
 
-    def create_traffic_dashboard(self) -> Dict[str, Any]:
+    @snapshot_view('metrics')
+    def create_traffic_dashboard(self, snapshot: DashboardSnapshot) -> Dict[str, Any]:
         """Create traffic analytics dashboard"""
-        total_traffic = sum(m.daily_visitors for m in self.domain_metrics.values())
-        avg_traffic = total_traffic / len(self.domain_metrics)
+        frame = snapshot.frame
+        total_traffic = int(frame.sum('daily_visitors'))
+        avg_traffic = frame.mean('daily_visitors')
         
         # Traffic sources (mock data)
         traffic_sources = {
@@ -381,8 +684,9 @@ class ComprehensivePerformanceDashboard:
         }
         
         # Engagement metrics
-        avg_session_duration = np.mean([m.avg_session_duration for m in self.domain_metrics.values()])
-        avg_bounce_rate = np.mean([m.bounce_rate for m in self.domain_metrics.values()])
+        engagement = frame.means(('avg_session_duration', 'bounce_rate'))
+        avg_session_duration = engagement['avg_session_duration']
+        avg_bounce_rate = engagement['bounce_rate']
         
         return {
             'total_daily_visitors': total_traffic,
@@ -392,38 +696,38 @@ class ComprehensivePerformanceDashboard:
                 'avg_session_duration': avg_session_duration,
                 'avg_bounce_rate': avg_bounce_rate
             },
-            'traffic_quality_score': self._calculate_traffic_quality()
+            'traffic_quality_score': self._calculate_traffic_quality(frame)
         }
 
-    def _calculate_traffic_quality(self) -> float:
+    def _calculate_traffic_quality(self, frame: MetricFrame) -> float:
         """Calculate traffic quality score"""
         # Based on conversion rate, session duration, and bounce rate
-        conversion_rates = [m.conversion_rate for m in self.domain_metrics.values()]
-        session_durations = [m.avg_session_duration for m in self.domain_metrics.values()]
-        bounce_rates = [m.bounce_rate for m in self.domain_metrics.values()]
+        means = frame.means(('conversion_rate', 'avg_session_duration', 'bounce_rate'))
         
-        conv_score = min(100, np.mean(conversion_rates) * 1000)  # Scale conversion
-        session_score = min(100, np.mean(session_durations) / 3)  # Scale session duration
-        bounce_score = max(0, 100 - np.mean(bounce_rates) * 100)  # Inverse of bounce rate
+        conv_score = min(100, means['conversion_rate'] * 1000)  # Scale conversion
+        session_score = min(100, means['avg_session_duration'] / 3)  # Scale session duration
+        bounce_score = max(0, 100 - means['bounce_rate'] * 100)  # Inverse of bounce rate
         
         return (conv_score + session_score + bounce_score) / 3
 
-    def create_performance_dashboard(self) -> Dict[str, Any]:
+    @snapshot_view('metrics')
+    def create_performance_dashboard(self, snapshot: DashboardSnapshot) -> Dict[str, Any]:
         """Create performance analytics dashboard"""
-        # Core Web Vitals averages
-        avg_page_speed = np.mean([m.page_speed_score for m in self.domain_metrics.values()])
-        avg_seo_score = np.mean([m.seo_score for m in self.domain_metrics.values()])
-        avg_mobile_performance = np.mean([m.mobile_performance for m in self.domain_metrics.values()])
+        frame = snapshot.frame
         
-        # Performance breakdown by domain
-        performance_breakdown = {domain: {
-            'page_speed': metrics.page_speed_score,
-            'seo_score': metrics.seo_score,
-            'mobile_performance': metrics.mobile_performance
-        } for domain, metrics in self.domain_metrics.items()}
+        # Core Web Vitals and uptime averages in one reduction
+        core = frame.means(('page_speed_score', 'seo_score', 'mobile_performance', 'uptime_percentage'))
+        avg_page_speed = core['page_speed_score']
+        avg_seo_score = core['seo_score']
+        avg_mobile_performance = core['mobile_performance']
+        avg_uptime = core['uptime_percentage']
         
-        # Technical metrics
-        avg_uptime = np.mean([m.uptime_percentage for m in self.domain_metrics.values()])
+        # Performance breakdown by domain
+        breakdown = frame.columns(('page_speed_score', 'seo_score', 'mobile_performance')).tolist()
+        performance_breakdown = {
+            domain: dict(zip(('page_speed', 'seo_score', 'mobile_performance'), row))
+            for domain, row in zip(frame.domains, breakdown)
+        }
         
         return {
             'core_metrics': {
@@ -450,13 +754,26 @@ class ComprehensivePerformanceDashboard:
         else: return "D"
 
     def create_web3_dashboard(self) -> Dict[str, Any]:
-        """Create Web3 integration dashboard"""
+        """Create Web3 integration dashboard
+
+        Only the metrics-derived part is memoized; token performance is demo
+        data drawn on every call, so it must stay out of the view cache.
+        """
+        return {
+            **self._web3_overview(),
+            'token_performance': self._calculate_token_performance(),
+            'nft_marketplace_stats': self._calculate_nft_stats()
+        }
+
+    @snapshot_view('metrics')
+    def _web3_overview(self, snapshot: DashboardSnapshot) -> Dict[str, Any]:
+        """Web3 domain metrics and ecosystem totals for the current snapshot"""
         web3_domains = ['fixie.run', 'rhymechain.win']
         
         web3_metrics = {}
         for domain in web3_domains:
-            if domain in self.domain_metrics:
-                metrics = self.domain_metrics[domain]
+            if domain in snapshot.domain_metrics:
+                metrics = snapshot.domain_metrics[domain]
                 web3_metrics[domain] = {
                     'monthly_revenue': metrics.monthly_revenue,
                     'wallet_connections': int(metrics.daily_visitors * 0.15),  # 15% connect wallet
@@ -475,9 +792,7 @@ class ComprehensivePerformanceDashboard:
                 'total_web3_revenue': total_web3_revenue,
                 'total_wallet_connections': total_wallet_connections,
                 'web3_adoption_rate': 0.22  # 22% of total traffic uses Web3 features
-            },
-            'token_performance': self._calculate_token_performance(),
-            'nft_marketplace_stats': self._calculate_nft_stats()
+            }
         }
 
     def _calculate_token_performance(self) -> Dict[str, float]:
@@ -502,7 +817,8 @@ class ComprehensivePerformanceDashboard:
             'collection_count': 156
         }
 
-    def create_ai_agents_dashboard(self) -> Dict[str, Any]:
+    @snapshot_view('metrics')
+    def create_ai_agents_dashboard(self, snapshot: DashboardSnapshot) -> Dict[str, Any]:
         """Create AI agents performance dashboard"""
         # Mock AI agent metrics
         agent_performance = {
@@ -558,18 +874,22 @@ class ComprehensivePerformanceDashboard:
             }
         }
 
-    def generate_executive_summary(self) -> Dict[str, Any]:
+    @snapshot_view('metrics', 'alerts', 'predictions')
+    def generate_executive_summary(self, snapshot: DashboardSnapshot) -> Dict[str, Any]:
         """Generate executive summary dashboard"""
+        frame = snapshot.frame
+        
         # Key metrics overview
-        total_revenue = sum(m.monthly_revenue for m in self.domain_metrics.values())
-        total_traffic = sum(m.daily_visitors for m in self.domain_metrics.values())
-        avg_conversion = np.mean([m.conversion_rate for m in self.domain_metrics.values()])
+        total_revenue = frame.sum('monthly_revenue')
+        total_traffic = int(frame.sum('daily_visitors'))
+        avg_conversion = frame.mean('conversion_rate')
         
         # Performance health
+        health = frame.means(('page_speed_score', 'seo_score', 'uptime_percentage'))
         performance_health = {
-            'technical_health': np.mean([m.page_speed_score for m in self.domain_metrics.values()]),
-            'seo_health': np.mean([m.seo_score for m in self.domain_metrics.values()]),
-            'uptime_health': np.mean([m.uptime_percentage for m in self.domain_metrics.values()])
+            'technical_health': health['page_speed_score'],
+            'seo_health': health['seo_score'],
+            'uptime_health': health['uptime_percentage']
         }
         
         # Strategic insights
@@ -578,24 +898,31 @@ class ComprehensivePerformanceDashboard:
         # Action items
         action_items = self._generate_action_items()
         
+        # Single passes over alerts and predictions
+        severity_counts = Counter(alert.severity for alert in snapshot.alerts)
+        projected_growth = {MetricType.REVENUE: [], MetricType.TRAFFIC: []}
+        for prediction in snapshot.predictions:
+            if prediction.metric_type in projected_growth:
+                projected_growth[prediction.metric_type].append(prediction.predicted_value - prediction.current_value)
+        
         return {
             'key_metrics': {
                 'total_monthly_revenue': total_revenue,
                 'total_daily_visitors': total_traffic,
                 'average_conversion_rate': avg_conversion,
-                'total_domains': len(self.domain_metrics)
+                'total_domains': len(frame)
             },
             'performance_health': performance_health,
             'strategic_insights': insights,
             'action_items': action_items,
             'alerts_summary': {
-                'critical': len([a for a in self.alerts if a.severity == AlertSeverity.CRITICAL]),
-                'warning': len([a for a in self.alerts if a.severity == AlertSeverity.WARNING]),
-                'info': len([a for a in self.alerts if a.severity == AlertSeverity.INFO])
+                'critical': severity_counts[AlertSeverity.CRITICAL],
+                'warning': severity_counts[AlertSeverity.WARNING],
+                'info': severity_counts[AlertSeverity.INFO]
             },
             'predictions_summary': {
-                'revenue_growth_projected': np.mean([p.predicted_value - p.current_value for p in self.predictions if p.metric_type == MetricType.REVENUE]),
-                'traffic_growth_projected': np.mean([p.predicted_value - p.current_value for p in self.predictions if p.metric_type == MetricType.TRAFFIC]),
+                'revenue_growth_projected': np.mean(projected_growth[MetricType.REVENUE]),
+                'traffic_growth_projected': np.mean(projected_growth[MetricType.TRAFFIC]),
                 'confidence_level': 0.83
             }
         }
@@ -643,14 +970,20 @@ class ComprehensivePerformanceDashboard:
 
     def create_visualization_charts(self) -> Dict[str, go.Figure]:
         """Create visualization charts for the dashboard"""
-        charts = {}
-        
-        # Revenue by domain chart
-        domains = list(self.domain_metrics.keys())
-        revenues = [self.domain_metrics[domain].monthly_revenue for domain in domains]
-        
+        return {name: self.get_chart(name) for name in DASHBOARD_CHARTS}
+
+    def get_chart(self, name: str, *params) -> go.Figure:
+        """Cached figure for a chart at the current metrics version (shared, do not mutate)"""
+        snapshot = self.snapshot
+        builder = getattr(self, f"_build_{name}_chart")
+        return self.figure_cache.figure((name, snapshot.metrics_version) + params,
+                                        lambda: builder(snapshot, *params))
+
+    def _build_revenue_by_domain_chart(self, snapshot: DashboardSnapshot) -> go.Figure:
+        """Revenue by domain bar chart"""
+        frame = snapshot.frame
         fig_revenue = go.Figure(data=[
-            go.Bar(x=domains, y=revenues, marker_color='rgba(55, 128, 191, 0.7)')
+            go.Bar(x=frame.domains, y=frame.column('monthly_revenue'), marker_color='rgba(55, 128, 191, 0.7)')
         ])
         fig_revenue.update_layout(
             title="Monthly Revenue by Domain",
@@ -658,18 +991,19 @@ class ComprehensivePerformanceDashboard:
             yaxis_title="Revenue (€)",
             template="plotly_white"
         )
-        charts['revenue_by_domain'] = fig_revenue
-        
-        # Traffic vs Conversion scatter plot
-        traffic_data = [self.domain_metrics[domain].daily_visitors for domain in domains]
-        conversion_data = [self.domain_metrics[domain].conversion_rate * 100 for domain in domains]
+        return fig_revenue
+
+    def _build_traffic_conversion_chart(self, snapshot: DashboardSnapshot) -> go.Figure:
+        """Traffic vs Conversion scatter plot"""
+        frame = snapshot.frame
+        conversion_data = frame.column('conversion_rate') * 100
         
         fig_scatter = go.Figure(data=[
             go.Scatter(
-                x=traffic_data,
+                x=frame.column('daily_visitors'),
                 y=conversion_data,
                 mode='markers+text',
-                text=domains,
+                text=frame.domains,
                 textposition="top center",
                 marker=dict(size=10, color=conversion_data, colorscale='Viridis')
             )
@@ -680,31 +1014,19 @@ class ComprehensivePerformanceDashboard:
             yaxis_title="Conversion Rate (%)",
             template="plotly_white"
         )
-        charts['traffic_conversion'] = fig_scatter
-        
-        # Performance radar chart
+        return fig_scatter
+
+    def _build_performance_radar_chart(self, snapshot: DashboardSnapshot) -> go.Figure:
+        """Performance radar chart for the top 3 domains"""
+        frame = snapshot.frame
         performance_metrics = ['Page Speed', 'SEO Score', 'Mobile Performance', 'Uptime']
+        radar_fields = ('page_speed_score', 'seo_score', 'mobile_performance', 'uptime_percentage')
         
         fig_radar = go.Figure()
-        
-        # Add traces for top 3 performing domains
-        sorted_domains = sorted(domains, 
-                              key=lambda x: self.domain_metrics[x].page_speed_score + 
-                                           self.domain_metrics[x].seo_score + 
-                                           self.domain_metrics[x].mobile_performance, 
-                              reverse=True)[:3]
-        
-        for domain in sorted_domains:
-            metrics = self.domain_metrics[domain]
-            values = [
-                metrics.page_speed_score,
-                metrics.seo_score,
-                metrics.mobile_performance,
-                metrics.uptime_percentage
-            ]
-            
+        for domain in frame.top_domains(('page_speed_score', 'seo_score', 'mobile_performance'), 3):
+            row = frame.row(domain)
             fig_radar.add_trace(go.Scatterpolar(
-                r=values,
+                r=[row[field] for field in radar_fields],
                 theta=performance_metrics,
                 fill='toself',
                 name=domain
@@ -717,12 +1039,43 @@ class ComprehensivePerformanceDashboard:
             title="Performance Comparison - Top 3 Domains",
             template="plotly_white"
         )
-        charts['performance_radar'] = fig_radar
+        return fig_radar
+
+    def _build_revenue_history_chart(self, snapshot: DashboardSnapshot, days: int = 30,
+                                     max_points: int = 500) -> go.Figure:
+        """Revenue history per domain, LTTB-downsampled to max_points per trace"""
+        since = datetime.now() - timedelta(days=days)
+        
+        fig_history = go.Figure()
+        for domain in snapshot.frame.domains:
+            # Coarsest tier needed to stay near max_points, then LTTB to the exact budget
+            timestamps, values = self.history_store.query(domain, ['monthly_revenue'], since,
+                                                          max_points=max_points * 4)
+            if not len(timestamps):
+                continue
+            keep = lttb(timestamps.astype(np.int64), values[:, 0], max_points)
+            fig_history.add_trace(go.Scattergl(x=timestamps[keep], y=values[keep, 0], mode='lines', name=domain))
         
-        return charts
+        fig_history.update_layout(
+            title=f"Monthly Revenue - Last {days} Days",
+            xaxis_title="Date",
+            yaxis_title="Revenue (€)",
+            template="plotly_white"
+        )
+        return fig_history
+
+    def export_report(self, format: str = 'json', destination: Optional[Union[str, Path, IO]] = None,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      tier: Optional[str] = None) -> Union[str, int]:
+        """Export comprehensive report
 
-    def export_report(self, format: str = 'json') -> str:
-        """Export comprehensive report"""
+        'json' returns the current report as a single document. 'jsonl', 'csv',
+        'parquet' and 'arrow' stream the report plus metric history within
+        [start, end] to destination chunk by chunk and return the rows written.
+        """
+        if format != 'json' and destination is None:
+            raise ValueError(f"Exporting {format} requires a destination path or stream")
+        
         report_data = {
             'timestamp': datetime.now().isoformat(),
             'executive_summary': self.generate_executive_summary(),
@@ -738,14 +1091,24 @@ class ComprehensivePerformanceDashboard:
         
         if format == 'json':
             return json.dumps(report_data, indent=2, default=str)
-        elif format == 'csv':
-            # Convert to CSV format
-            df = pd.DataFrame([asdict(metrics) for metrics in self.domain_metrics.values()])
-            return df.to_csv(index=False)
         
-        return str(report_data)
+        return export_history(
+            self.history_store,
+            destination,
+            format=format,
+            start=start,
+            end=end,
+            tier=tier,
+            sections=report_data,
+            chunk_rows=self.config.get('export_chunk_rows', 65536)
+        )
 
 # Streamlit Dashboard Application
+@st.cache_resource
+def get_dashboard_engine(config: Dict[str, Any]) -> ComprehensivePerformanceDashboard:
+    """Process-wide dashboard shared by every session and rerun"""
+    return ComprehensivePerformanceDashboard(config)
+
 def create_streamlit_dashboard():
     """Create Streamlit dashboard application"""
     st.set_page_config(
@@ -760,10 +1123,12 @@ def create_streamlit_dashboard():
         'supabase_url': 'your-supabase-url',
         'supabase_key': 'your-supabase-key',
         'redis_host': 'localhost',
-        'redis_port': 6379
+        'redis_port': 6379,
+        'live_updates': 'local'
     }
     
-    dashboard = ComprehensivePerformanceDashboard(config)
+    # Built once per process; refreshes itself in the background
+    dashboard = get_dashboard_engine(config)
     
     # Header
     st.title("🚀 Portfolio Performance Dashboard")
@@ -774,7 +1139,7 @@ def create_streamlit_dashboard():
     selected_view = st.sidebar.selectbox(
         "Select View",
         ["Executive Summary", "Revenue Analytics", "Traffic Analytics", 
-         "Performance Metrics", "Web3 Integration", "AI Agents", "Alerts & Predictions"]
+         "Performance Metrics", "Web3 Integration", "AI Agents", "Alerts & Predictions", "Live Monitor"]
     )
     
     # Main content based on selection
@@ -792,6 +1157,9 @@ def create_streamlit_dashboard():
         show_ai_agents_dashboard(dashboard)
     elif selected_view == "Alerts & Predictions":
         show_alerts_predictions(dashboard)
+    elif selected_view == "Live Monitor":
+        st.header("📡 Live Monitor")
+        show_live_monitor(dashboard)
 
 def show_executive_summary(dashboard: ComprehensivePerformanceDashboard):
     """Show executive summary view"""
@@ -858,22 +1226,11 @@ def show_revenue_dashboard(dashboard: ComprehensivePerformanceDashboard):
     # Revenue breakdown chart
     st.subheader("Revenue Breakdown by Domain")
     
-    # Create revenue chart
-    fig = go.Figure(data=[
-        go.Bar(
-            x=list(revenue_data['domain_revenue_breakdown'].keys()),
-            y=list(revenue_data['domain_revenue_breakdown'].values()),
-            marker_color='rgba(55, 128, 191, 0.7)'
-        )
-    ])
-    fig.update_layout(
-        title="Monthly Revenue by Domain",
-        xaxis_title="Domain",
-        yaxis_title="Revenue (€)",
-        template="plotly_white"
-    )
+    st.plotly_chart(dashboard.get_chart('revenue_by_domain'), use_container_width=True)
     
-    st.plotly_chart(fig, use_container_width=True)
+    # Revenue history
+    st.subheader("Revenue History")
+    st.plotly_chart(dashboard.get_chart('revenue_history'), use_container_width=True)
 
 def show_traffic_dashboard(dashboard: ComprehensivePerformanceDashboard):
     """Show traffic analytics dashboard"""
@@ -1040,7 +1397,40 @@ def show_alerts_predictions(dashboard: ComprehensivePerformanceDashboard):
         trend_emoji = "📈" if pred.trend_direction == "up" else "📉"
         st.write(f"{trend_emoji} **{pred.domain}** ({pred.metric_type.value}): "
                 f"{pred.current_value:.0f} → {pred.predicted_value:.0f} "
-                f"(+{pred.predicted_value - pred.current_value:.0f})")
+                f"(+{pred.predicted_value - pred.current_value:.0f} in {pred.time_horizon} days)")
+
+LIVE_COLUMNS = ['monthly_revenue', 'daily_visitors', 'conversion_rate', 'page_speed_score', 'uptime_percentage']
+
+@st.fragment(run_every=2)
+def show_live_monitor(dashboard: ComprehensivePerformanceDashboard):
+    """Live metrics patched from pushed deltas; only this fragment reruns"""
+    state = st.session_state
+    if 'live_subscription' not in state:
+        state.live_subscription = dashboard.update_bus.subscribe()
+        state.live_transitions = []
+    subscription = state.live_subscription
+    messages = subscription.drain()
+    
+    if subscription.needs_resync:
+        # New viewer, gap or overflow: reload every cell from the current snapshot
+        snapshot = dashboard.snapshot
+        state.live_cells = {domain: snapshot.frame.row(domain) for domain in snapshot.frame.domains}
+        subscription.resynced(dashboard.update_source, snapshot.version)
+    else:
+        for message in messages:
+            for domain, values in message['metrics'].items():
+                state.live_cells.setdefault(domain, {}).update(values)
+            state.live_transitions = (message['alerts'][::-1] + state.live_transitions)[:20]
+    
+    cells = pd.DataFrame.from_dict(state.live_cells, orient='index')
+    st.dataframe(cells.reindex(columns=LIVE_COLUMNS), use_container_width=True)
+    
+    st.subheader("Recent Alert Transitions")
+    if state.live_transitions:
+        for alert in state.live_transitions:
+            st.write(f"**{alert['status']}** {alert['domain']}: {alert['message']} ({alert['since']})")
+    else:
+        st.caption("No alert transitions since this view opened")
 
 # Main execution
 def main():
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Streaming Report Export
+Chunked JSON Lines, CSV, Parquet and Arrow IPC exports of dashboard history
+
+Metric history is read from the time-series store one bounded chunk at a
+time and written straight to the destination (a path or an open file or
+response stream), so memory use depends on the chunk size, not on the
+length of the history or the number of domains. Report sections (summary
+views, alerts, predictions) are small and written ahead of the history.
+"""
+
+import csv
+import json
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Any, IO, Iterator, Sequence, Tuple, Union
+
+import numpy as np
+
+from timeseries_store import TimeSeriesStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # columnar exports are optional
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+Destination = Union[str, Path, IO]
+
+EXPORT_FORMATS = ('jsonl', 'csv', 'parquet', 'arrow')
+
+def iter_history(store: TimeSeriesStore, start: Any = None, end: Any = None, domains: Optional[Sequence[str]] = None,
+                 tier: Optional[str] = None, chunk_rows: int = 65536) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+    """(domain, timestamps, values[point, field]) chunks across domains"""
+    for domain in domains or store.domains:
+        for timestamps, values in store.iter_range(domain, start, end, tier=tier, chunk_rows=chunk_rows):
+            yield domain, timestamps, values
+
+def _json_safe(value: Any) -> Any:
+    """Replace NaN and infinities (not valid JSON) with None, recursively"""
+    if isinstance(value, float):
+        return value if np.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+def _plain_json(data: Any) -> Any:
+    """Report data as plain JSON values (dataclasses and datetimes as strings, NaN as None)"""
+    return _json_safe(json.loads(json.dumps(data, default=str)))
+
+def _json_rows(values: np.ndarray) -> list:
+    """Rows of a float chunk as lists, with non-finite values as None"""
+    missing = ~np.isfinite(values)
+    if not missing.any():
+        return values.tolist()
+    rows = values.astype(object)
+    rows[missing] = None
+    return rows.tolist()
+
+@contextmanager
+def _open(destination: Destination, mode: str):
+    """Open a path, or pass an already open stream through untouched"""
+    if isinstance(destination, (str, Path)):
+        with open(destination, mode, **({'newline': ''} if 'b' not in mode else {})) as f:
+            yield f
+    else:
+        yield destination
+
+def write_jsonl(destination: Destination, chunks: Iterator[Tuple[str, np.ndarray, np.ndarray]],
+                fields: Sequence[str], sections: Optional[Dict[str, Any]] = None) -> int:
+    """Report sections as one line each, then one line per metric point"""
+    rows = 0
+    with _open(destination, 'w') as out:
+        for name, data in (sections or {}).items():
+            section = {'type': 'section', 'name': name, 'data': _plain_json(data)}
+            out.write(json.dumps(section, allow_nan=False) + "\n")
+
+        for domain, timestamps, values in chunks:
+            stamps = np.datetime_as_string(timestamps, unit='s')
+            lines = [
+                json.dumps({'type': 'metric', 'domain': domain, 'timestamp': stamp, **dict(zip(fields, row))},
+                           allow_nan=False)
+                for stamp, row in zip(stamps.tolist(), _json_rows(values))
+            ]
+            out.write("\n".join(lines) + "\n")
+            rows += len(lines)
+    return rows
+
+def write_csv(destination: Destination, chunks: Iterator[Tuple[str, np.ndarray, np.ndarray]],
+              fields: Sequence[str]) -> int:
+    """One header row, then metric points written a chunk at a time"""
+    rows = 0
+    with _open(destination, 'w') as out:
+        writer = csv.writer(out)
+        writer.writerow(['domain', 'timestamp', *fields])
+        for domain, timestamps, values in chunks:
+            stamps = np.datetime_as_string(timestamps, unit='s').tolist()
+            writer.writerows([domain, stamp, *row] for stamp, row in zip(stamps, values.tolist()))
+            rows += len(stamps)
+    return rows
+
+def _arrow_schema(fields: Sequence[str], sections: Optional[Dict[str, Any]]) -> "pa.Schema":
+    if pa is None:
+        raise ImportError("pyarrow is required for parquet and arrow exports")
+    schema = pa.schema(
+        [('domain', pa.string()), ('timestamp', pa.timestamp('s'))]
+        + [(field, pa.float64()) for field in fields]
+    )
+    # Report sections ride along as schema metadata
+    if sections:
+        schema = schema.with_metadata({'report': json.dumps(_plain_json(sections), allow_nan=False)})
+    return schema
+
+def _arrow_batch(schema: "pa.Schema", domain: str, timestamps: np.ndarray, values: np.ndarray) -> "pa.RecordBatch":
+    n = len(timestamps)
+    columns = [
+        pa.array([domain] * n, type=pa.string()),
+        pa.array(timestamps, type=pa.timestamp('s'))
+    ] + [pa.array(values[:, i]) for i in range(values.shape[1])]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+def write_parquet(destination: Destination, chunks: Iterator[Tuple[str, np.ndarray, np.ndarray]],
+                  fields: Sequence[str], sections: Optional[Dict[str, Any]] = None, compression: str = 'zstd') -> int:
+    """Parquet file with one row group per chunk"""
+    schema = _arrow_schema(fields, sections)
+    rows = 0
+    with _open(destination, 'wb') as out:
+        writer = pq.ParquetWriter(out, schema, compression=compression)
+        try:
+            for domain, timestamps, values in chunks:
+                writer.write_batch(_arrow_batch(schema, domain, timestamps, values))
+                rows += len(timestamps)
+        finally:
+            writer.close()
+    return rows
+
+def write_arrow(destination: Destination, chunks: Iterator[Tuple[str, np.ndarray, np.ndarray]],
+                fields: Sequence[str], sections: Optional[Dict[str, Any]] = None, compression: str = 'zstd') -> int:
+    """Arrow IPC file with one compressed record batch per chunk"""
+    schema = _arrow_schema(fields, sections)
+    rows = 0
+    with _open(destination, 'wb') as out:
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        with pa.ipc.new_file(out, schema, options=options) as writer:
+            for domain, timestamps, values in chunks:
+                writer.write_batch(_arrow_batch(schema, domain, timestamps, values))
+                rows += len(timestamps)
+    return rows
+
+def export_history(store: TimeSeriesStore, destination: Destination, format: str = 'jsonl',
+                   start: Any = None, end: Any = None, domains: Optional[Sequence[str]] = None,
+                   tier: Optional[str] = None, sections: Optional[Dict[str, Any]] = None,
+                   chunk_rows: int = 65536) -> int:
+    """Stream history within [start, end] to destination; returns the rows written
+
+    Without start, each domain is read from the finest tier that still
+    covers all of its history.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {format!r}, expected one of {EXPORT_FORMATS}")
+    if destination is None:
+        raise ValueError("A destination path or stream is required; exports are never buffered in memory")
+
+    chunks = iter_history(store, start, end, domains, tier, chunk_rows)
+    started = datetime.now()
+    if format == 'jsonl':
+        rows = write_jsonl(destination, chunks, store.fields, sections)
+    elif format == 'csv':
+        rows = write_csv(destination, chunks, store.fields)
+    elif format == 'parquet':
+        rows = write_parquet(destination, chunks, store.fields, sections)
+    else:
+        rows = write_arrow(destination, chunks, store.fields, sections)
+
+    logger.info(f"Exported {rows} history rows as {format} in {(datetime.now() - started).total_seconds():.2f}s")
+    return rows
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from alert_rules import FIRING, RESOLVED, AlertEngine, AlertRule
+from metric_store import FIELD_INDEX, METRIC_FIELDS, ColumnarMetricStore, MetricFrame
+
+DOMAINS = ['seobiz.be', 'fixie.run', 'aiftw.be']
+START = datetime(2026, 3, 1)
+
+
+def frame(page_speed):
+    values = np.full((len(DOMAINS), len(METRIC_FIELDS)), 50.0)
+    values[:, FIELD_INDEX['page_speed_score']] = page_speed
+    return MetricFrame(DOMAINS, values, np.full(len(DOMAINS), np.datetime64(START, 's')))
+
+
+def speed_rule(**overrides):
+    options = dict(name='page_speed', field='page_speed_score', metric_type='performance',
+                   levels=(('warning', 80.0), ('critical', 60.0)))
+    return AlertRule(**{**options, **overrides})
+
+
+def run(engine, store, ticks):
+    events = []
+    for i, speeds in enumerate(ticks):
+        store.append(frame(speeds), START + timedelta(minutes=i))
+        events.append(engine.evaluate(store, now=START + timedelta(minutes=i)))
+    return events
+
+
+def test_levels_are_ordered_most_severe_first():
+    assert speed_rule().levels == (('critical', 60.0), ('warning', 80.0))
+    assert speed_rule(comparison='>').levels == (('warning', 80.0), ('critical', 60.0))
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        speed_rule(comparison='<=')
+    with pytest.raises(ValueError):
+        speed_rule(aggregate='median')
+
+
+def test_fires_escalates_and_resolves_only_on_transitions():
+    engine = AlertEngine([speed_rule()])
+    store = ColumnarMetricStore(capacity=16)
+    events = run(engine, store, [
+        [90, 90, 90],
+        [70, 90, 50],   # warning on seobiz, critical on aiftw
+        [70, 90, 50],   # unchanged: no events
+        [50, 90, 50],   # seobiz escalates
+        [95, 90, 50],   # seobiz resolves
+    ])
+
+    assert events[0] == [] and events[2] == []
+    fired = {e.domain: (e.status, e.severity) for e in events[1]}
+    assert fired == {'seobiz.be': (FIRING, 'warning'), 'aiftw.be': (FIRING, 'critical')}
+    assert [(e.domain, e.severity) for e in events[3]] == [('seobiz.be', 'critical')]
+    assert events[3][0].since == START + timedelta(minutes=1)
+    assert [(e.domain, e.status) for e in events[4]] == [('seobiz.be', RESOLVED)]
+    assert set(engine.active) == {'page_speed_aiftw.be'}
+
+
+def test_for_ticks_and_hysteresis():
+    engine = AlertEngine([speed_rule(for_ticks=2, hysteresis=0.1)])
+    store = ColumnarMetricStore(capacity=16)
+    events = run(engine, store, [
+        [70, 90, 90],   # first breach: pending
+        [70, 90, 90],   # second breach: fires
+        [82, 90, 90],   # above 80 but inside the 10% margin: held
+        [89, 90, 90],   # clears 88: resolves
+    ])
+
+    assert events[0] == []
+    assert [e.status for e in events[1]] == [FIRING]
+    assert events[2] == []
+    assert [e.status for e in events[3]] == [RESOLVED]
+
+
+def test_baseline_rules_compare_against_trailing_mean():
+    rule = AlertRule(name='traffic_drop', field='page_speed_score', metric_type='traffic',
+                     levels=(('warning', 0.5),), window=1, baseline_window=4)
+    engine = AlertEngine([rule])
+    store = ColumnarMetricStore(capacity=16)
+    events = run(engine, store, [[80, 80, 80]] * 3 + [[20, 80, 80]])
+    assert [e.domain for e in events[-1]] == ['seobiz.be']
+
+
+def test_domain_subset_and_acknowledge():
+    engine = AlertEngine([speed_rule()])
+    store = ColumnarMetricStore(capacity=16)
+    store.append(frame([50, 50, 50]), START)
+
+    events = engine.evaluate(store, domains=['fixie.run'], now=START)
+    assert [e.domain for e in events] == ['fixie.run']
+    assert engine.acknowledge('page_speed_fixie.run')
+    assert not engine.acknowledge('page_speed_seobiz.be')
+
+    store.append(frame([50, 70, 50]), START + timedelta(minutes=1))
+    events = engine.evaluate(store, domains=['fixie.run'], now=START + timedelta(minutes=1))
+    assert events[0].severity == 'warning' and events[0].acknowledged
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from alert_rules import FIRING, RESOLVED
+from anomaly_detection import EWMAAnomalyDetector
+from metric_store import FIELD_INDEX, METRIC_FIELDS, MetricFrame
+
+FIELDS = ('monthly_revenue', 'bounce_rate')
+START = datetime(2026, 3, 1)
+
+
+def frame(rows):
+    """Frame with the detected FIELDS taken from rows and every other metric constant"""
+    domains = list(rows)
+    values = np.full((len(domains), len(METRIC_FIELDS)), 1.0)
+    values[:, [FIELD_INDEX[field] for field in FIELDS]] = [rows[d] for d in domains]
+    return MetricFrame(domains, values, np.full(len(domains), np.datetime64(START, 's')))
+
+
+def warmed_detector(ticks=60, **options):
+    detector = EWMAAnomalyDetector(fields=FIELDS, warmup=20, season_slots=1,
+                                   directions={'monthly_revenue': -1, 'bounce_rate': 1}, **options)
+    rng = np.random.default_rng(11)
+    for i in range(ticks):
+        detector.update(frame({'seobiz.be': [1000 + rng.normal(0, 10), 0.4 + rng.normal(0, 0.01)]}),
+                        START + timedelta(minutes=i))
+    return detector
+
+
+def test_no_alerts_on_normal_noise():
+    detector = warmed_detector()
+    assert detector.active == {}
+
+
+def test_sustained_drop_fires_then_resolves():
+    detector = warmed_detector()
+    now = START + timedelta(hours=2)
+
+    # A single outlier is not enough (min_consecutive=2)
+    assert detector.update(frame({'seobiz.be': [500, 0.4]}), now) == []
+    events = detector.update(frame({'seobiz.be': [500, 0.4]}), now)
+    assert [(e.alert_id, e.status, e.severity) for e in events] == [
+        ('anomaly_monthly_revenue_seobiz.be', FIRING, 'critical')
+    ]
+
+    events = detector.update(frame({'seobiz.be': [1000, 0.4]}), now)
+    assert [(e.alert_id, e.status) for e in events] == [('anomaly_monthly_revenue_seobiz.be', RESOLVED)]
+    assert detector.active == {}
+
+
+def test_direction_ignores_good_side_spikes():
+    detector = warmed_detector()
+    now = START + timedelta(hours=2)
+    for _ in range(3):
+        # Revenue up and bounce rate down are both good news
+        assert detector.update(frame({'seobiz.be': [5000, 0.1]}), now) == []
+
+
+def test_incident_does_not_become_the_new_baseline():
+    detector = warmed_detector()
+    level_before = detector.level[0, 0]
+    now = START + timedelta(hours=2)
+    for _ in range(20):
+        detector.update(frame({'seobiz.be': [200, 0.4]}), now)
+
+    assert detector.level[0, 0] > 0.5 * level_before
+    assert 'anomaly_monthly_revenue_seobiz.be' in detector.active
+
+
+def test_missing_values_and_new_domains():
+    detector = warmed_detector()
+    now = START + timedelta(hours=2)
+    events = detector.update(frame({'seobiz.be': [np.nan, 0.4], 'fixie.run': [10, 0.9]}), now)
+
+    assert events == []
+    assert detector.domains == ['seobiz.be', 'fixie.run']
+    assert detector.count[1].tolist() == [1, 1]
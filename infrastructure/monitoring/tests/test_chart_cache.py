@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("plotly")
+
+from chart_cache import FigureCache, lttb
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 300)
+    y[4321] = 25.0
+
+    keep = lttb(x, y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == 9999
+    assert 4321 in keep
+    assert (np.diff(keep) > 0).all()
+
+
+def test_lttb_drops_missing_values_and_passes_short_series_through():
+    y = np.array([1.0, np.nan, 3.0, 4.0])
+    assert lttb(np.arange(4), y, 10).tolist() == [0, 2, 3]
+
+
+def test_figure_cache_builds_once_per_key_and_evicts_lru():
+    cache = FigureCache(max_entries=2)
+    builds = []
+
+    def builder(name):
+        def build():
+            builds.append(name)
+            return object()
+        return build
+
+    first = cache.figure(('a', 1), builder('a'))
+    assert cache.figure(('a', 1), builder('a')) is first
+    cache.figure(('b', 1), builder('b'))
+    cache.figure(('a', 1), builder('a'))
+    cache.figure(('c', 1), builder('c'))
+
+    # 'b' was least recently used when 'c' arrived
+    cache.figure(('b', 1), builder('b'))
+    assert builds == ['a', 'b', 'c', 'b']
+    assert (cache.hits, cache.misses) == (2, 4)
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import numpy as np
+
+import forecasting
+from forecasting import ForecastModel, PortfolioForecaster
+
+SOURCE = Path(__file__).resolve().parents[3] / 'packages' / 'ai-agents' / 'src' / 'strategic' / 'forecasting.py'
+
+
+def test_dashboard_imports_the_ai_agents_forecaster():
+    assert Path(forecasting.__file__).resolve() == SOURCE
+
+
+def test_daily_history_forecasts_in_days():
+    days = np.arange(60, dtype=np.float64)
+    history = np.vstack([100 + 2 * days, 500 - days])
+    forecaster = PortfolioForecaster(['revenue', 'traffic'], window=90).fit(history)
+
+    predicted, _, _ = forecaster.forecast(30).at_horizon()
+    np.testing.assert_allclose(predicted, [100 + 2 * 89, 500 - 89])
+    assert forecaster.forecast(30).trend_directions() == ['up', 'down']
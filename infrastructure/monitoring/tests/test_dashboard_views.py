@@ -0,0 +1,78 @@
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+# The dashboard module pulls in its UI and storage clients at import time
+for module in ("pandas", "plotly", "streamlit", "supabase", "redis", "requests", "aiohttp"):
+    pytest.importorskip(module)
+
+import performance_dashboard
+from metric_store import MetricFrame
+from performance_dashboard import (
+    ComprehensivePerformanceDashboard, DashboardSnapshot, DomainMetrics, snapshot_view
+)
+
+
+def domain_metrics(revenue):
+    return {
+        domain: DomainMetrics(
+            domain=domain, monthly_revenue=revenue, daily_visitors=1000, conversion_rate=0.03,
+            avg_session_duration=120.0, bounce_rate=0.4, page_speed_score=90.0, seo_score=85.0,
+            mobile_performance=80.0, uptime_percentage=99.9, last_updated=datetime(2026, 1, 1)
+        )
+        for domain in ('seobiz.be', 'fixie.run')
+    }
+
+
+def make_snapshot(version, revenue):
+    metrics = domain_metrics(revenue)
+    return DashboardSnapshot(version=version, domain_metrics=metrics, frame=MetricFrame.from_metrics(metrics),
+                             alerts=[], predictions=[], created_at=datetime(2026, 1, 1), metrics_version=version)
+
+
+class SwappingDashboard(ComprehensivePerformanceDashboard):
+    """Publishes a newer snapshot while a view is being built"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._view_cache = {}
+
+    @snapshot_view('metrics')
+    def revenue_total(self, snapshot):
+        self.snapshot = make_snapshot(snapshot.version + 1, 999.0)
+        return snapshot.frame.sum('monthly_revenue')
+
+
+def test_builder_sees_the_snapshot_its_cache_key_was_read_from():
+    dashboard = SwappingDashboard(make_snapshot(1, 10.0))
+    assert dashboard.revenue_total() == 20.0
+
+    # The cached entry belongs to version 1, so the newer snapshot rebuilds
+    assert dashboard.revenue_total() == 2 * 999.0
+
+
+def test_views_are_memoized_until_their_part_changes():
+    dashboard = SwappingDashboard(make_snapshot(1, 10.0))
+    first = dashboard.create_traffic_dashboard()
+    assert dashboard.create_traffic_dashboard() is first
+
+    dashboard.snapshot = replace(dashboard.snapshot, alerts_version=5)
+    assert dashboard.create_traffic_dashboard() is first
+
+    dashboard.snapshot = replace(dashboard.snapshot, metrics_version=7)
+    assert dashboard.create_traffic_dashboard() is not first
+
+
+def test_web3_demo_values_are_not_frozen_in_the_view_cache(monkeypatch):
+    dashboard = SwappingDashboard(make_snapshot(1, 10.0))
+    draws = iter([0.01, -0.02])
+    monkeypatch.setattr(performance_dashboard.np.random, "uniform", lambda low, high: next(draws))
+
+    first = dashboard.create_web3_dashboard()
+    second = dashboard.create_web3_dashboard()
+    assert [first['token_performance']['price_change_24h'],
+            second['token_performance']['price_change_24h']] == [0.01, -0.02]
+    # The metrics-derived part is still memoized
+    assert second['web3_metrics'] is first['web3_metrics']
+    assert first['ecosystem_overview']['total_web3_revenue'] == 10.0
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import ingestion
+from ingestion import IngestionService, MetricSource, http_json_source
+
+REAL_SLEEP = asyncio.sleep
+
+
+class FakeResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    async def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Stands in for aiohttp.ClientSession: get(url) -> payload from a dict"""
+
+    def __init__(self, payloads=None, **kwargs):
+        self.payloads = payloads or {}
+        self.urls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url):
+        self.urls.append(url)
+        return FakeResponse(*self.payloads.get(url, ({}, 404)))
+
+
+def static_source(name, values, **options):
+    async def fetch(domain, session):
+        return dict(values[domain])
+    return MetricSource(name=name, fetch=fetch, jitter=0.0, **options)
+
+
+def record_sleeps(monkeypatch, limit):
+    """Replace the poll loop's sleeps; cancel the loop after `limit` of them"""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+        if len(delays) > limit:
+            raise asyncio.CancelledError
+        await REAL_SLEEP(0)
+
+    monkeypatch.setattr(ingestion.asyncio, "sleep", sleep)
+    return delays
+
+
+def poll(service, source, domain="seobiz.be"):
+    async def run():
+        try:
+            await service._poll(domain, source, FakeSession(), asyncio.Semaphore(1))
+        except asyncio.CancelledError:
+            pass
+    asyncio.run(run())
+
+
+def test_changes_are_coalesced_per_domain_and_published_once():
+    published = []
+    traffic = static_source("traffic", {})
+    seo = static_source("seo", {})
+    service = IngestionService(["seobiz.be", "fixie.run"], [traffic, seo], published.append,
+                               initial_values={"seobiz.be": {"seo_score": 80}})
+
+    service._merge("seobiz.be", seo, {"seo_score": 80})  # unchanged: nothing pending
+    assert service._pending == {}
+
+    service._merge("seobiz.be", traffic, {"daily_visitors": 100})
+    service._merge("seobiz.be", seo, {"seo_score": 85})
+    service._merge("seobiz.be", traffic, {"daily_visitors": 120})
+    asyncio.run(service._publish())
+    asyncio.run(service._publish())
+
+    assert published == [{"seobiz.be": {"daily_visitors": 120, "seo_score": 85}}]
+    assert service.stats["traffic"].changes == 2 and service.stats["seo"].changes == 1
+
+
+def test_consumer_runs_off_the_event_loop_thread():
+    threads = []
+    service = IngestionService(["seobiz.be"], [], lambda changes: threads.append(threading.get_ident()))
+    service._pending = {"seobiz.be": {"seo_score": 1}}
+    asyncio.run(service._publish())
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_consumer_errors_are_logged(caplog):
+    def fail(changes):
+        raise ValueError("disk full")
+
+    service = IngestionService(["seobiz.be"], [], fail)
+    service._pending = {"seobiz.be": {"seo_score": 1}}
+    asyncio.run(service._publish())
+    assert "Failed to publish metric changes: disk full" in caplog.text
+
+
+def test_timeouts_back_off_exponentially_up_to_the_cap(monkeypatch):
+    async def hang(domain, session):
+        await asyncio.Event().wait()
+
+    source = MetricSource("slow", hang, interval=10.0, timeout=0.01, jitter=0.0, max_backoff=8.0)
+    service = IngestionService(["seobiz.be"], [source], lambda changes: None)
+    delays = record_sleeps(monkeypatch, limit=4)
+    poll(service, source)
+
+    # First sleep is the random start phase, then 2x, 4x, 8x, 8x the interval
+    assert 0 <= delays[0] <= 10.0
+    assert delays[1:] == [20.0, 40.0, 80.0, 80.0]
+    assert service.stats["slow"].timeouts == 4 and service.stats["slow"].polls == 0
+
+
+def test_success_resets_the_backoff(monkeypatch):
+    outcomes = iter([RuntimeError("502"), RuntimeError("502"), {"seo_score": 90}, RuntimeError("502")])
+
+    async def flaky(domain, session):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    source = MetricSource("flaky", flaky, interval=1.0, jitter=0.0)
+    service = IngestionService(["seobiz.be"], [source], lambda changes: None)
+    delays = record_sleeps(monkeypatch, limit=4)
+    poll(service, source)
+
+    assert delays[1:] == [2.0, 4.0, 1.0, 2.0]
+    assert service.stats["flaky"].failures == 3 and service.stats["flaky"].polls == 1
+    assert service._pending == {"seobiz.be": {"seo_score": 90}}
+
+
+def test_timeout_is_per_source(monkeypatch):
+    async def hang(domain, session):
+        await asyncio.Event().wait()
+
+    slow = MetricSource("slow", hang, interval=1.0, timeout=0.01, jitter=0.0)
+    fast = static_source("fast", {"seobiz.be": {"daily_visitors": 10}}, interval=1.0, timeout=0.01)
+    service = IngestionService(["seobiz.be"], [slow, fast], lambda changes: None)
+    record_sleeps(monkeypatch, limit=1)
+    poll(service, slow)
+    record_sleeps(monkeypatch, limit=1)
+    poll(service, fast)
+
+    assert service.stats["slow"].timeouts == 1
+    assert (service.stats["fast"].polls, service.stats["fast"].timeouts) == (1, 0)
+    assert service._pending == {"seobiz.be": {"daily_visitors": 10}}
+
+
+def test_http_json_source_formats_url_and_keeps_listed_fields():
+    session = FakeSession({"https://api.test/seobiz.be": ({"seo_score": 88, "ignored": 1}, 200)})
+    source = http_json_source("api", "https://api.test/{domain}", ["seo_score", "bounce_rate"])
+
+    assert asyncio.run(source.fetch("seobiz.be", session)) == {"seo_score": 88}
+    with pytest.raises(RuntimeError, match="HTTP 404"):
+        asyncio.run(source.fetch("fixie.run", session))
+    assert session.urls == ["https://api.test/seobiz.be", "https://api.test/fixie.run"]
+
+
+def test_service_polls_and_publishes_until_stopped(monkeypatch):
+    monkeypatch.setattr(ingestion.aiohttp, "ClientSession", FakeSession)
+    monkeypatch.setattr(ingestion.aiohttp, "TCPConnector", lambda **kwargs: None)
+    published = []
+    source = static_source("seo", {"seobiz.be": {"seo_score": 70}, "fixie.run": {"seo_score": 60}}, interval=0.01)
+    service = IngestionService(["seobiz.be", "fixie.run"], [source], published.append, publish_interval=0.01)
+
+    service.start()
+    deadline = time.monotonic() + 5
+    while sum(len(changes) for changes in published) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    service.stop()
+
+    merged = {}
+    for changes in published:
+        merged.update(changes)
+    # Unchanged values on later polls are not published again
+    assert sum(len(changes) for changes in published) == 2
+    assert merged == {"seobiz.be": {"seo_score": 70}, "fixie.run": {"seo_score": 60}}
+    assert service._thread is None
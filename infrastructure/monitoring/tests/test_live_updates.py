@@ -0,0 +1,179 @@
+import gc
+import json
+from datetime import datetime
+from enum import Enum
+from types import SimpleNamespace
+
+from live_updates import LocalUpdateBus, RedisUpdateBus, update_message
+
+
+def message(version, source="ingestion", **metrics):
+    return {'source': source, 'version': version, 'metrics': metrics, 'alerts': []}
+
+
+def synced(bus, version=0, source="ingestion"):
+    subscription = bus.subscribe()
+    subscription.resynced(source, version)
+    return subscription
+
+
+def test_new_subscription_starts_with_a_resync():
+    subscription = LocalUpdateBus().subscribe()
+    assert subscription.needs_resync
+    subscription.resynced("ingestion", 4)
+    assert not subscription.needs_resync
+
+
+def test_updates_are_delivered_in_order_to_every_subscriber():
+    bus = LocalUpdateBus()
+    first, second = synced(bus), synced(bus)
+    for version in (1, 2, 3):
+        bus.publish(message(version))
+
+    for subscription in (first, second):
+        assert [m['version'] for m in subscription.drain()] == [1, 2, 3]
+        assert subscription.drain() == []
+        assert not subscription.needs_resync
+
+
+def test_duplicate_and_stale_versions_are_dropped():
+    bus = LocalUpdateBus()
+    subscription = synced(bus, version=2)
+    for version in (1, 2, 3, 3, 2, 4):
+        bus.publish(message(version))
+
+    assert [m['version'] for m in subscription.drain()] == [3, 4]
+    assert not subscription.needs_resync
+
+
+def test_version_gap_flags_a_resync():
+    bus = LocalUpdateBus()
+    subscription = synced(bus, version=1)
+    bus.publish(message(2))
+    bus.publish(message(5))
+
+    assert [m['version'] for m in subscription.drain()] == [2, 5]
+    assert subscription.needs_resync
+
+    subscription.resynced("ingestion", 7)
+    bus.publish(message(7))
+    bus.publish(message(8))
+    assert [m['version'] for m in subscription.drain()] == [8]
+    assert not subscription.needs_resync
+
+
+def test_versions_are_tracked_per_source():
+    bus = LocalUpdateBus()
+    subscription = synced(bus)
+    subscription.resynced("alerts", 10)
+    bus.publish(message(1))
+    bus.publish(message(11, source="alerts"))
+    bus.publish(message(10, source="alerts"))
+
+    assert [(m['source'], m['version']) for m in subscription.drain()] == [("ingestion", 1), ("alerts", 11)]
+    assert not subscription.needs_resync
+
+
+def test_overflow_drops_the_backlog_and_flags_a_resync():
+    bus = LocalUpdateBus(max_pending=3)
+    slow, live = synced(bus), synced(bus)
+    for version in (1, 2, 3):
+        bus.publish(message(version))
+    assert [m['version'] for m in live.drain()] == [1, 2, 3]
+
+    bus.publish(message(4))
+    assert slow.needs_resync
+    assert slow.drain() == []
+
+    slow.resynced("ingestion", 4)
+    bus.publish(message(5))
+    assert [m['version'] for m in slow.drain()] == [5]
+    assert [m['version'] for m in live.drain()] == [4, 5]
+
+
+def test_closed_viewer_sessions_are_unsubscribed():
+    bus = LocalUpdateBus()
+    subscription = bus.subscribe()
+    assert len(bus._subscribers) == 1
+    del subscription
+    gc.collect()
+    assert len(bus._subscribers) == 0
+
+
+class FakePubSub:
+    def __init__(self):
+        self.handlers = {}
+        self.closed = False
+        self.listener = SimpleNamespace(stopped=False)
+        self.listener.stop = lambda: setattr(self.listener, "stopped", True)
+
+    def subscribe(self, **handlers):
+        self.handlers.update(handlers)
+
+    def run_in_thread(self, sleep_time, daemon):
+        return self.listener
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    """Delivers published messages straight back to the channel handler as bytes"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.pubsub_instance = FakePubSub()
+
+    def pubsub(self, ignore_subscribe_messages):
+        return self.pubsub_instance
+
+    def publish(self, channel, data):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.pubsub_instance.handlers[channel]({'data': data.encode()})
+
+
+def test_redis_bus_relays_messages_through_the_channel():
+    redis = FakeRedis()
+    bus = RedisUpdateBus(redis)
+    subscription = synced(bus)
+    bus.publish(message(1, seo_score=90))
+
+    assert subscription.drain() == [message(1, seo_score=90)]
+    bus.close()
+    assert redis.pubsub_instance.closed and redis.pubsub_instance.listener.stopped
+
+
+def test_redis_bus_falls_back_to_local_fan_out(caplog):
+    bus = RedisUpdateBus(FakeRedis(fail=True))
+    subscription = synced(bus)
+    bus.publish(message(1))
+
+    assert [m['version'] for m in subscription.drain()] == [1]
+    assert "Failed to publish dashboard update" in caplog.text
+
+
+def test_redis_bus_drops_malformed_messages(caplog):
+    redis = FakeRedis()
+    bus = RedisUpdateBus(redis)
+    subscription = synced(bus)
+    redis.pubsub_instance.handlers['dashboard:updates']({'data': b'{not json'})
+
+    assert subscription.drain() == []
+    assert "Dropping malformed dashboard update" in caplog.text
+
+
+class Severity(Enum):
+    CRITICAL = "critical"
+
+
+def test_update_message_serializes_alert_events():
+    event = SimpleNamespace(alert_id="a1", domain="seobiz.be", status="firing", severity=Severity.CRITICAL,
+                            message="Revenue dropped", value=12.5, since=datetime(2026, 1, 1, 12))
+    payload = update_message("ingestion", 3, {"seobiz.be": {"monthly_revenue": 100}}, [event])
+
+    assert json.loads(json.dumps(payload)) == {
+        'source': "ingestion", 'version': 3, 'metrics': {"seobiz.be": {"monthly_revenue": 100}},
+        'alerts': [{'alert_id': "a1", 'domain': "seobiz.be", 'status': "firing", 'severity': "critical",
+                    'message': "Revenue dropped", 'value': 12.5, 'since': "2026-01-01T12:00:00"}]
+    }
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from metric_store import FIELD_INDEX, METRIC_FIELDS, ColumnarMetricStore, MetricFrame
+
+START = datetime(2026, 1, 1)
+
+
+def metrics(**revenue_by_domain):
+    """{domain: DomainMetrics-like} with every field derived from the revenue"""
+    return {
+        domain.replace('_', '.'): SimpleNamespace(
+            last_updated=START, **{field: revenue * (i + 1) for i, field in enumerate(METRIC_FIELDS)}
+        )
+        for domain, revenue in revenue_by_domain.items()
+    }
+
+
+def frame(**revenue_by_domain):
+    return MetricFrame.from_metrics(metrics(**revenue_by_domain))
+
+
+def test_from_metrics_lays_out_domains_by_field():
+    current = frame(seobiz_be=10.0, fixie_run=20.0)
+
+    assert current.domains == ['seobiz.be', 'fixie.run']
+    assert current.values.shape == (2, len(METRIC_FIELDS))
+    assert current.column('seo_score').tolist() == [10.0 * 7, 20.0 * 7]
+    assert current.row('fixie.run')['bounce_rate'] == 20.0 * 5
+    assert current.updated_at.tolist() == [START, START]
+    with pytest.raises(ValueError):
+        current.values[0, 0] = 1.0
+
+
+def test_aggregates():
+    current = frame(seobiz_be=10.0, fixie_run=20.0, aiftw_be=30.0)
+
+    assert current.sum('monthly_revenue') == 60.0
+    assert current.mean('daily_visitors') == 40.0
+    assert current.means(['monthly_revenue', 'seo_score']) == {'monthly_revenue': 20.0, 'seo_score': 140.0}
+    assert current.by_domain('monthly_revenue') == {'seobiz.be': 10.0, 'fixie.run': 20.0, 'aiftw.be': 30.0}
+    assert current.columns(['seo_score', 'monthly_revenue']).tolist()[0] == [70.0, 10.0]
+
+
+def test_empty_frame_aggregates_to_zero():
+    empty = MetricFrame.from_metrics({})
+    assert len(empty) == 0
+    assert empty.sum('monthly_revenue') == 0.0 and empty.mean('seo_score') == 0.0
+    assert empty.means(['seo_score']) == {'seo_score': 0.0}
+    assert empty.top_domains(['seo_score'], 3) == []
+
+
+def test_top_domains_ranks_by_summed_score_with_stable_ties():
+    current = frame(a_be=1.0, b_be=3.0, c_be=2.0, d_be=3.0)
+    assert current.top_domains(['seo_score', 'page_speed_score'], 3) == ['b.be', 'd.be', 'c.be']
+    assert current.top_domains(['seo_score'], 10) == ['b.be', 'd.be', 'c.be', 'a.be']
+
+
+def test_store_keeps_the_newest_frames_in_order():
+    store = ColumnarMetricStore(capacity=3)
+    for step in range(5):
+        store.append(frame(seobiz_be=float(step)), START + timedelta(minutes=step))
+
+    timestamps, values = store.history()
+    assert len(store) == 3
+    assert timestamps.tolist() == [START + timedelta(minutes=m) for m in (2, 3, 4)]
+    assert values[:, 0, FIELD_INDEX['monthly_revenue']].tolist() == [2.0, 3.0, 4.0]
+    assert store.tail(2)[:, 0, 0].tolist() == [3.0, 4.0]
+    assert store.tail(10).shape[0] == 3
+
+
+def test_new_domains_are_nan_before_they_appear():
+    store = ColumnarMetricStore(capacity=4)
+    store.append(frame(seobiz_be=1.0), START)
+    store.append(frame(fixie_run=5.0, seobiz_be=2.0), START + timedelta(minutes=1))
+    store.append(frame(fixie_run=6.0), START + timedelta(minutes=2))
+
+    assert store.domains == ['seobiz.be', 'fixie.run']
+    _, revenue = store.series('monthly_revenue')
+    np.testing.assert_array_equal(revenue, [[1.0, np.nan], [2.0, 5.0], [np.nan, 6.0]])
+
+
+def test_history_since_filters_by_timestamp():
+    store = ColumnarMetricStore(capacity=10)
+    for step in range(4):
+        store.append(frame(seobiz_be=float(step)), START + timedelta(hours=step))
+
+    timestamps, values = store.series('monthly_revenue', since=START + timedelta(hours=2))
+    assert timestamps.tolist() == [START + timedelta(hours=2), START + timedelta(hours=3)]
+    assert values[:, 0].tolist() == [2.0, 3.0]
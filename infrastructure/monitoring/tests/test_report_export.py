@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+import math
+import time
+
+import numpy as np
+import pytest
+
+from metric_store import METRIC_FIELDS
+from report_export import export_history
+from timeseries_store import DAY, Tier, TimeSeriesStore
+
+NOW = int(time.time())
+
+
+def point(revenue):
+    return {field: (revenue if field == 'monthly_revenue' else 1.0) for field in METRIC_FIELDS}
+
+
+def reject_constant(name):
+    raise ValueError(f"invalid JSON constant {name}")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(tmp_path / 'history')
+    for i in range(10):
+        store.append('seobiz.be', NOW - 600 + 60 * i, point(100.0 + i))
+        store.append('fixie.run', NOW - 600 + 60 * i, point(50.0))
+    return store
+
+
+def test_default_csv_export_contains_every_raw_point(store):
+    # Without a start the 1d tier used to be picked, exporting only the header
+    out = io.StringIO()
+    assert export_history(store, out, 'csv') == 20
+
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0][:3] == ['domain', 'timestamp', METRIC_FIELDS[0]]
+    assert len(rows) == 21
+
+
+def test_jsonl_writes_null_for_missing_values(store):
+    store.append('aiftw.be', NOW, {**point(float('nan')), 'seo_score': float('inf')})
+    out = io.StringIO()
+    export_history(store, out, 'jsonl', domains=['aiftw.be'],
+                   sections={'predictions': [{'lower_bound': float('nan')}]})
+
+    lines = [json.loads(line, parse_constant=reject_constant) for line in out.getvalue().splitlines()]
+    assert lines[0] == {'type': 'section', 'name': 'predictions', 'data': [{'lower_bound': None}]}
+    assert lines[1]['monthly_revenue'] is None
+    assert lines[1]['seo_score'] is None
+
+
+def test_destination_is_required(store):
+    with pytest.raises(ValueError):
+        export_history(store, None, 'csv')
+
+
+def test_old_history_exports_from_the_finest_tier_covering_it(tmp_path):
+    store = TimeSeriesStore(tmp_path, tiers=(Tier('raw', 0, DAY), Tier('1h', 3600, 30 * DAY)))
+    start = NOW - NOW % 3600 - 3 * DAY
+    for hour in range(3 * 24):
+        store.append('seobiz.be', start + hour * 3600, point(float(hour)))
+
+    out = io.StringIO()
+    rows = export_history(store, out, 'csv')
+    # Raw points older than a day are out of the raw tier's retention, so the
+    # closed hourly buckets (all but the open one) are exported
+    assert rows == 3 * 24 - 1
+
+
+def test_parquet_export_round_trips(store, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'history.parquet'
+    assert export_history(store, path, 'parquet', domains=['seobiz.be'], sections={'note': float('nan')}) == 10
+
+    table = pq.read_table(path)
+    assert table.column('monthly_revenue').to_pylist() == [100.0 + i for i in range(10)]
+    assert json.loads(table.schema.metadata[b'report'], parse_constant=reject_constant) == {'note': None}
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from metric_store import METRIC_FIELDS
+from timeseries_store import DAY, Tier, TimeSeriesStore
+
+NOW = int(datetime(2026, 3, 10, 12, 0).timestamp())
+NOW -= NOW % DAY
+
+
+def point(revenue):
+    return {field: (revenue if field == 'monthly_revenue' else 1.0) for field in METRIC_FIELDS}
+
+
+def test_query_returns_raw_points_in_range(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    for minute in range(5):
+        store.append('seobiz.be', NOW + 60 * minute, point(100.0 + minute))
+
+    timestamps, values = store.query('seobiz.be', ['monthly_revenue'], NOW + 60, NOW + 180, tier='raw')
+    assert len(timestamps) == 3
+    assert values[:, 0].tolist() == [101.0, 102.0, 103.0]
+
+
+def test_rollups_are_count_weighted_means(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    for second in (0, 20, 40, 60):
+        store.append('fixie.run', NOW + second, point(float(second)))
+
+    _, values = store.query('fixie.run', ['monthly_revenue'], NOW, tier='1m')
+    assert values[:, 0].tolist() == [20.0]
+
+
+def test_open_buckets_are_rebuilt_on_restart(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    store.append('aiftw.be', NOW, point(10.0))
+    store.append('aiftw.be', NOW + 30, point(30.0))
+
+    reopened = TimeSeriesStore(tmp_path)
+    reopened.append('aiftw.be', NOW + 60, point(50.0))
+    _, values = reopened.query('aiftw.be', ['monthly_revenue'], NOW, tier='1m')
+    assert values[:, 0].tolist() == [20.0]
+
+
+def test_aligned_history_places_daily_buckets_on_a_grid(tmp_path):
+    store = TimeSeriesStore(tmp_path, tiers=(Tier('raw', 0, 10 * DAY), Tier('1d', DAY, 100 * DAY)))
+    for day in (0, 1, 3):
+        store.append('seobiz.be', NOW + day * DAY, point(float(day)))
+    store.append('seobiz.be', NOW + 4 * DAY + 10, point(9.0))
+
+    history = store.aligned_history(['seobiz.be', 'unknown.com'], 'monthly_revenue', '1d', 4,
+                                    now=NOW + 4 * DAY + 20)
+    assert history.shape == (2, 4)
+    np.testing.assert_array_equal(history[0], [0.0, 1.0, np.nan, 3.0])
+    assert np.isnan(history[1]).all()
+
+
+def test_aligned_history_reads_the_open_rollup(tmp_path):
+    store = TimeSeriesStore(tmp_path, tiers=(Tier('raw', 0, 10 * DAY), Tier('1d', DAY, 100 * DAY)))
+    store.append('seobiz.be', NOW, point(4.0))
+    store.append('seobiz.be', NOW + 100, point(6.0))
+
+    history = store.aligned_history(['seobiz.be'], 'monthly_revenue', '1d', 2, now=NOW + DAY + 5)
+    np.testing.assert_array_equal(history[0], [np.nan, 5.0])
+
+
+def test_aligned_history_rejects_raw_tier(tmp_path):
+    with pytest.raises(ValueError):
+        TimeSeriesStore(tmp_path).aligned_history(['seobiz.be'], 'monthly_revenue', 'raw', 3)
+
+
+def test_retention_drops_expired_rows(tmp_path):
+    store = TimeSeriesStore(tmp_path, tiers=(Tier('raw', 0, DAY),))
+    for hour in range(48):
+        store.append('seobiz.be', NOW + hour * 3600, point(float(hour)))
+
+    store.enforce_retention(NOW + 48 * 3600)
+    timestamps, _ = store.query('seobiz.be', [], 0, tier='raw')
+    assert len(timestamps) == 24
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Time-Series History Store
+Tiered on-disk history of per-domain dashboard metrics
+
+Every point lands in the raw tier and is rolled up into 1-minute, 1-hour
+and 1-day buckets (count-weighted means). Each (tier, domain) pair is a
+directory of append-only little-endian column files read back through
+memory maps, so range queries are a binary search over the timestamp
+column plus zero-copy slices. Open rollup buckets are rebuilt from the
+finer tier on startup, and retention is enforced by rewriting a column
+set once enough of its head has expired.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from metric_store import METRIC_FIELDS, MetricFrame
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+@dataclass(frozen=True)
+class Tier:
+    """Storage tier: bucket width (0 for raw points) and retention, in seconds"""
+    name: str
+    resolution: int
+    retention: int
+
+DEFAULT_TIERS: Tuple[Tier, ...] = (
+    Tier('raw', 0, 2 * DAY),
+    Tier('1m', 60, 14 * DAY),
+    Tier('1h', 3600, 180 * DAY),
+    Tier('1d', DAY, 5 * 365 * DAY)
+)
+
+def _epoch(when: Any) -> int:
+    """Seconds since the epoch for datetimes, datetime64 values or numbers"""
+    if isinstance(when, datetime):
+        return int(when.timestamp())
+    if isinstance(when, np.datetime64):
+        return int(when.astype('datetime64[s]').astype(np.int64))
+    return int(when)
+
+class _ColumnSet:
+    """Append-only column files for one domain in one tier"""
+
+    def __init__(self, path: Path, fields: Sequence[str]):
+        self.path = path
+        self.dtypes = {'timestamp': '<i8', 'count': '<i8', **{field: '<f8' for field in fields}}
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.length = self._repair()
+        self._maps: Dict[str, np.ndarray] = {}
+        self._mapped_length = -1
+
+    def _file(self, column: str) -> Path:
+        return self.path / f"{column}.bin"
+
+    def _repair(self) -> int:
+        """Trim columns to their common length, dropping any torn final write"""
+        lengths = {}
+        for column in self.dtypes:
+            file = self._file(column)
+            lengths[column] = file.stat().st_size // 8 if file.exists() else 0
+
+        length = min(lengths.values())
+        for column, size in lengths.items():
+            if size != length or not self._file(column).exists():
+                with open(self._file(column), 'ab') as f:
+                    f.truncate(length * 8)
+        return length
+
+    def append(self, timestamps: np.ndarray, counts: np.ndarray, values: np.ndarray):
+        """Append rows; values is (rows, fields) in field order"""
+        columns = {'timestamp': timestamps, 'count': counts}
+        for i, field in enumerate(list(self.dtypes)[2:]):
+            columns[field] = values[:, i]
+
+        for column, data in columns.items():
+            with open(self._file(column), 'ab') as f:
+                f.write(np.ascontiguousarray(data, dtype=self.dtypes[column]).tobytes())
+        self.length += len(timestamps)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory map of a column's committed rows"""
+        if self._mapped_length != self.length:
+            self._maps = {}
+            self._mapped_length = self.length
+
+        data = self._maps.get(name)
+        if data is None:
+            if self.length == 0:
+                data = np.empty(0, dtype=self.dtypes[name])
+            else:
+                data = np.memmap(self._file(name), dtype=self.dtypes[name], mode='r', shape=(self.length,))
+            self._maps[name] = data
+        return data
+
+    def last_timestamp(self) -> Optional[int]:
+        return int(self.column('timestamp')[-1]) if self.length else None
+
+    def compact(self, keep_from: int):
+        """Rewrite every column without its first keep_from rows"""
+        for column in self.dtypes:
+            tail = np.array(self.column(column)[keep_from:])
+            tmp = self._file(column).with_suffix('.tmp')
+            tail.tofile(tmp)
+            os.replace(tmp, self._file(column))
+        self.length -= keep_from
+        self._maps = {}
+        self._mapped_length = -1
+
+class _Bucket:
+    """Open rollup bucket accumulating count-weighted sums"""
+
+    __slots__ = ('start', 'count', 'sums')
+
+    def __init__(self, start: int, n_fields: int):
+        self.start = start
+        self.count = 0
+        self.sums = np.zeros(n_fields)
+
+class TimeSeriesStore:
+    """Embedded tiered time-series store for per-domain metric points"""
+
+    def __init__(self, root_dir: str, fields: Sequence[str] = METRIC_FIELDS,
+                 tiers: Sequence[Tier] = DEFAULT_TIERS, retention_check_interval: float = 3600.0):
+        self.root = Path(root_dir)
+        self.fields = tuple(fields)
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+        self.tiers = tuple(tiers)
+        self.tier_index = {tier.name: i for i, tier in enumerate(self.tiers)}
+        self.retention_check_interval = retention_check_interval
+
+        self._columns: List[Dict[str, _ColumnSet]] = [{} for _ in self.tiers]
+        self._buckets: List[Dict[str, _Bucket]] = [{} for _ in self.tiers]
+        self._lock = threading.RLock()
+        self._last_retention_check = 0.0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._check_layout()
+        self._recover()
+
+    def _check_layout(self):
+        meta_file = self.root / 'meta.json'
+        layout = {'fields': list(self.fields), 'tiers': [tier.name for tier in self.tiers]}
+        if meta_file.exists():
+            existing = json.loads(meta_file.read_text())
+            if existing.get('fields') != layout['fields']:
+                raise ValueError(f"History at {self.root} stores fields {existing.get('fields')}, expected {layout['fields']}")
+        else:
+            meta_file.write_text(json.dumps(layout, indent=2))
+
+    def _column_set(self, tier: int, domain: str) -> _ColumnSet:
+        columns = self._columns[tier].get(domain)
+        if columns is None:
+            path = self.root / self.tiers[tier].name / quote(domain, safe='.-_')
+            columns = self._columns[tier][domain] = _ColumnSet(path, self.fields)
+        return columns
+
+    @property
+    def domains(self) -> List[str]:
+        return list(self._columns[0])
+
+    def _recover(self):
+        """Reopen existing column sets and rebuild open buckets from finer tiers"""
+        raw_dir = self.root / self.tiers[0].name
+        domains = [unquote(p.name) for p in sorted(raw_dir.iterdir()) if p.is_dir()] if raw_dir.exists() else []
+
+        for domain in domains:
+            self._column_set(0, domain)
+            for tier in range(1, len(self.tiers)):
+                last = self._column_set(tier, domain).last_timestamp()
+                replay_from = last + self.tiers[tier].resolution if last is not None else None
+                source = self._column_set(tier - 1, domain)
+                timestamps = source.column('timestamp')
+                start = int(np.searchsorted(timestamps, replay_from)) if replay_from is not None else 0
+                counts = source.column('count')[start:]
+                values = np.column_stack([source.column(f)[start:] for f in self.fields])
+                for ts, count, row in zip(timestamps[start:].tolist(), counts.tolist(), values):
+                    self._roll(tier, domain, ts, count, row, cascade=False)
+
+        if domains:
+            logger.info(f"Loaded metric history for {len(domains)} domains from {self.root}")
+
+    def _roll(self, tier: int, domain: str, timestamp: int, count: int, values: np.ndarray, cascade: bool = True):
+        """Fold a point into the tier's open bucket, writing the bucket out once it closes"""
+        resolution = self.tiers[tier].resolution
+        start = timestamp - timestamp % resolution
+        bucket = self._buckets[tier].get(domain)
+
+        if bucket is not None and start != bucket.start:
+            if bucket.count:
+                mean = bucket.sums / bucket.count
+                self._column_set(tier, domain).append(
+                    np.array([bucket.start]), np.array([bucket.count]), mean[np.newaxis, :]
+                )
+                if cascade and tier + 1 < len(self.tiers):
+                    self._roll(tier + 1, domain, bucket.start, bucket.count, mean)
+            bucket = None
+
+        if bucket is None:
+            bucket = self._buckets[tier][domain] = _Bucket(start, len(self.fields))
+        bucket.count += count
+        bucket.sums += values * count
+
+    def append(self, domain: str, timestamp: Any, values: Dict[str, float]):
+        """Record one raw point for a domain"""
+        row = np.array([values[field] for field in self.fields], dtype=np.float64)
+        ts = _epoch(timestamp)
+        with self._lock:
+            self._column_set(0, domain).append(np.array([ts]), np.array([1]), row[np.newaxis, :])
+            if len(self.tiers) > 1:
+                self._roll(1, domain, ts, 1, row)
+        self._maybe_enforce_retention(ts)
+
+    def append_frame(self, frame: MetricFrame, timestamp: Optional[datetime] = None):
+        """Record the latest value of every domain in a metric frame"""
+        ts = _epoch(timestamp or datetime.now())
+        columns = [frame.column(field) for field in self.fields]
+        with self._lock:
+            for i, domain in enumerate(frame.domains):
+                row = np.array([column[i] for column in columns], dtype=np.float64)
+                self._column_set(0, domain).append(np.array([ts]), np.array([1]), row[np.newaxis, :])
+                if len(self.tiers) > 1:
+                    self._roll(1, domain, ts, 1, row)
+        self._maybe_enforce_retention(ts)
+
+    def _select_tier(self, start: int, end: int, domain: str, max_points: Optional[int]) -> int:
+        """Finest tier that still retains start and fits within max_points"""
+        now = int(time.time())
+        for tier, spec in enumerate(self.tiers):
+            if start < now - spec.retention and tier + 1 < len(self.tiers):
+                continue
+            if max_points is not None and tier + 1 < len(self.tiers):
+                timestamps = self._column_set(tier, domain).column('timestamp')
+                n = np.searchsorted(timestamps, end, 'right') - np.searchsorted(timestamps, start)
+                if n > max_points:
+                    continue
+            return tier
+        return len(self.tiers) - 1
+
+    def query(self, domain: str, fields: Sequence[str], start: Any, end: Any = None,
+              tier: Optional[str] = None, max_points: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values[point, field]) for a domain within [start, end]"""
+        start_s = _epoch(start)
+        end_s = _epoch(end) if end is not None else np.iinfo(np.int64).max
+
+        with self._lock:
+            if domain not in self._columns[0]:
+                return np.empty(0, dtype='datetime64[s]'), np.empty((0, len(fields)))
+
+            index = self.tier_index[tier] if tier is not None else self._select_tier(start_s, end_s, domain, max_points)
+            columns = self._column_set(index, domain)
+            timestamps = columns.column('timestamp')
+            lo = int(np.searchsorted(timestamps, start_s))
+            hi = int(np.searchsorted(timestamps, end_s, 'right'))
+            values = np.column_stack([columns.column(f)[lo:hi] for f in fields]) if fields else np.empty((hi - lo, 0))
+            return timestamps[lo:hi].astype('datetime64[s]'), values
+
+    def _earliest(self, domain: str) -> int:
+        """Oldest stored timestamp for a domain across all tiers"""
+        firsts = [
+            int(columns.column('timestamp')[0])
+            for columns in (self._column_set(tier, domain) for tier in range(len(self.tiers)))
+            if columns.length
+        ]
+        return min(firsts) if firsts else 0
+
+    def iter_range(self, domain: str, start: Any = None, end: Any = None, tier: Optional[str] = None,
+                   chunk_rows: int = 65536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Chunks of (timestamps, values[point, field]) within [start, end], read straight off the column maps
+
+        Without start the whole history is read, from the finest tier that
+        still covers its oldest point.
+        """
+        end_s = _epoch(end) if end is not None else np.iinfo(np.int64).max
+
+        with self._lock:
+            if domain not in self._columns[0]:
+                return
+            start_s = _epoch(start) if start is not None else self._earliest(domain)
+            index = self.tier_index[tier] if tier is not None else self._select_tier(start_s, end_s, domain, None)
+            columns = self._column_set(index, domain)
+            timestamps = columns.column('timestamp')
+            lo = int(np.searchsorted(timestamps, start_s))
+            hi = int(np.searchsorted(timestamps, end_s, 'right'))
+            maps = [columns.column(field) for field in self.fields]
+
+        for offset in range(lo, hi, chunk_rows):
+            stop = min(offset + chunk_rows, hi)
+            yield (timestamps[offset:stop].astype('datetime64[s]'),
+                   np.column_stack([column[offset:stop] for column in maps]))
+
+    def aligned_history(self, domains: Sequence[str], field: str, tier: str, periods: int,
+                        now: Any = None) -> np.ndarray:
+        """One field per domain on the tier's bucket grid, shaped (domain, periods)
+
+        Covers the `periods` buckets before the one containing now; a bucket
+        that has not been written out yet is read from its open rollup.
+        Missing buckets are NaN.
+        """
+        index = self.tier_index[tier]
+        resolution = self.tiers[index].resolution
+        if resolution <= 0:
+            raise ValueError(f"Tier {tier} has no fixed bucket width")
+
+        now_s = _epoch(now) if now is not None else int(time.time())
+        end = now_s - now_s % resolution
+        start = end - periods * resolution
+        column = self.field_index[field]
+        history = np.full((len(domains), periods), np.nan)
+
+        with self._lock:
+            for row, domain in enumerate(domains):
+                if domain not in self._columns[0]:
+                    continue
+                columns = self._column_set(index, domain)
+                timestamps = columns.column('timestamp')
+                lo = int(np.searchsorted(timestamps, start))
+                hi = int(np.searchsorted(timestamps, end))
+                history[row, (timestamps[lo:hi] - start) // resolution] = columns.column(field)[lo:hi]
+
+                bucket = self._buckets[index].get(domain)
+                if bucket is not None and bucket.count and start <= bucket.start < end:
+                    history[row, (bucket.start - start) // resolution] = bucket.sums[column] / bucket.count
+        return history
+
+    def value_at(self, domain: str, field: str, when: Any, tier: Optional[str] = None) -> Optional[float]:
+        """Latest value at or before when, from the finest tier retaining it"""
+        ts = _epoch(when)
+        with self._lock:
+            if domain not in self._columns[0]:
+                return None
+            index = self.tier_index[tier] if tier is not None else self._select_tier(ts, ts, domain, None)
+            columns = self._column_set(index, domain)
+            position = int(np.searchsorted(columns.column('timestamp'), ts, 'right')) - 1
+            if position < 0:
+                return None
+            return float(columns.column(field)[position])
+
+    def growth(self, field: str, window: timedelta, now: Optional[datetime] = None) -> Optional[float]:
+        """Relative change of a field's portfolio total over the window
+
+        Only domains with history at both ends of the window are counted;
+        returns None when no domain reaches back far enough.
+        """
+        now = now or datetime.now()
+        current_total = past_total = 0.0
+        with self._lock:
+            for domain in self.domains:
+                past = self.value_at(domain, field, now - window)
+                current = self.value_at(domain, field, now, tier=self.tiers[0].name)
+                if past is None or current is None:
+                    continue
+                past_total += past
+                current_total += current
+
+        if past_total <= 0:
+            return None
+        return current_total / past_total - 1
+
+    def _maybe_enforce_retention(self, now: int):
+        if time.monotonic() - self._last_retention_check >= self.retention_check_interval:
+            self._last_retention_check = time.monotonic()
+            self.enforce_retention(now)
+
+    def enforce_retention(self, now: Optional[Any] = None):
+        """Drop expired rows, rewriting a column set once a tenth of it has expired"""
+        now_s = _epoch(now) if now is not None else int(time.time())
+        with self._lock:
+            for tier, spec in enumerate(self.tiers):
+                cutoff = now_s - spec.retention
+                for domain, columns in self._columns[tier].items():
+                    expired = int(np.searchsorted(columns.column('timestamp'), cutoff))
+                    if expired and expired >= max(1, columns.length // 10):
+                        columns.compact(expired)
+                        logger.debug(f"Dropped {expired} expired {spec.name} points for {domain}")
@@ -29,10 +29,27 @@ from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
 from pathlib import Path
 
+from content_similarity import ContentSimilarityIndex
+from tracing import configure_tracing, get_tracer
+from metrics_exporter import (
+    REGISTRY, TASKS_TOTAL, TASKS_IN_PROGRESS, TASK_DURATION, LLM_LATENCY,
+    LATENCY_QUANTILES, WINDOW_RATES, TOKENS_TOTAL, COST_TOTAL, ERRORS_TOTAL
+)
+from latency_sketch import SlidingWindowStats, WindowSnapshot
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Blended USD price per 1K tokens (prompt + completion) used for spend tracking
+MODEL_COST_PER_1K_TOKENS = {
+    'gpt-4-turbo': 0.02,
+    'gpt-4': 0.045,
+    'gpt-4-vision': 0.02,
+    'claude-3-sonnet': 0.009,
+    'claude-3-haiku': 0.00075,
+}
+
 class AgentType(Enum):
     """Agent type enumeration"""
     CONTENT_GENERATOR = "content_generator"
@@ -72,6 +89,11 @@ class AgentMetrics:
     tasks_completed: int
     error_rate: float
     last_updated: datetime
+    tasks_failed: int = 0
+    p50_response_time: float = 0.0
+    p95_response_time: float = 0.0
+    p99_response_time: float = 0.0
+    throughput: float = 0.0  # tasks per second over the stats window
 
 @dataclass
 class ContentTask:
@@ -131,6 +153,14 @@ class AdvancedAgentOrchestrator:
             api_key=config['anthropic_api_key']
         )
         
+        # Span tracing (disabled unless an export path or OTLP endpoint is configured)
+        configure_tracing(
+            'advanced-agent-orchestrator',
+            export_path=config.get('trace_export_path'),
+            otlp_endpoint=config.get('otlp_endpoint'),
+            sample_rate=config.get('trace_sample_rate', 0.1)
+        )
+        
         # Initialize Supabase
         self.supabase_client = create_client(
             config['supabase_url'],
@@ -140,10 +170,15 @@ class AdvancedAgentOrchestrator:
         # Agent registry
         self.agents: Dict[str, Any] = {}
         self.agent_metrics: Dict[str, AgentMetrics] = {}
+        self.agent_window_stats: Dict[str, SlidingWindowStats] = {}
         
         # Performance tracking
         self.performance_history: List[Dict[str, Any]] = []
         
+        # TF-IDF index over generated content for synergy detection
+        self.content_index = ContentSimilarityIndex(config.get('content_index_dir', 'data/content_index/advanced'))
+        self._index_lock = asyncio.Lock()
+        
         # Initialize agents
         self._initialize_agents()
         
@@ -244,47 +279,76 @@ class AdvancedAgentOrchestrator:
                 error_rate=0.0,
                 last_updated=datetime.now()
             )
+            self.agent_window_stats[agent_type.value] = SlidingWindowStats(
+                window_seconds=self.config.get('metrics_window_seconds', 300)
+            )
 
     async def generate_content(self, task: ContentTask) -> Dict[str, Any]:
         """Generate content using specialized agents"""
         start_time = time.time()
-        
-        try:
-            # Select appropriate agent based on content type
-            agent_type = self._select_content_agent(task.content_type)
-            
-            # Generate content prompt
-            prompt = await self._enhance_prompt(task.prompt, task.keywords, task.domain)
-            
-            # Generate content using AI
-            response = await self._call_ai_agent(agent_type, prompt, task)
+        tracer = get_tracer()
+        
+        with tracer.start_span("generate_content", {
+            'task.id': task.task_id,
+            'task.domain': task.domain.value,
+            'task.content_type': task.content_type
+        }) as span:
+            # Select appropriate agent based on content type (before the try so the
+            # error path and the in-progress gauge always have an agent)
+            agent_type = await self._select_content_agent(task.content_type)
+            span.set_attribute('agent.type', str(agent_type))
+            TASKS_IN_PROGRESS.inc(agent=str(agent_type))
             
-            # Post-process content
-            processed_content = await self._post_process_content(response, task)
-            
-            # Quality assurance
-            quality_score = await self._assess_quality(processed_content, task)
-            
-            # Update metrics
-            await self._update_agent_metrics(
-                agent_type, 
-                time.time() - start_time, 
-                quality_score, 
-                True
-            )
-            
-            return {
-                'content': processed_content,
-                'quality_score': quality_score,
-                'seo_analysis': await self._generate_seo_analysis(processed_content, task),
-                'performance_metrics': self.agent_metrics[agent_type],
-                'timestamp': datetime.now().isoformat()
-            }
+            try:
+                # Generate content prompt
+                prompt = await self._enhance_prompt(task.prompt, task.keywords, task.domain)
+                
+                # Generate content using AI
+                response = await self._call_ai_agent(agent_type, prompt, task)
+                
+                # Post-process content
+                processed_content = await self._post_process_content(response, task)
+                
+                # Index content for cross-domain similarity
+                with tracer.start_span("index_content"):
+                    await self._index_content(task, processed_content['content'])
+                
+                # Quality assurance
+                with tracer.start_span("assess_quality"):
+                    quality_score = await self._assess_quality(processed_content, task)
+                
+                # Update metrics
+                await self._update_agent_metrics(
+                    agent_type, 
+                    time.time() - start_time, 
+                    quality_score, 
+                    True
+                )
+                
+                return {
+                    'content': processed_content,
+                    'quality_score': quality_score,
+                    'seo_analysis': await self._generate_seo_analysis(processed_content, task),
+                    'performance_metrics': self.agent_metrics[agent_type],
+                    'timestamp': datetime.now().isoformat()
+                }
+                
+            except Exception as e:
+                logger.error(f"Content generation failed: {str(e)}")
+                await self._update_agent_metrics(agent_type, time.time() - start_time, 0.0, False)
+                raise
             
+            finally:
+                TASKS_IN_PROGRESS.dec(agent=str(agent_type))
+
+    async def _index_content(self, task: ContentTask, content: str):
+        """Add generated content to the similarity index off the event loop"""
+        try:
+            # Vectorizing and autosaving the index block, and the index is not thread safe
+            async with self._index_lock:
+                await asyncio.to_thread(self.content_index.add_document, task.task_id, content, task.domain.value)
         except Exception as e:
-            logger.error(f"Content generation failed: {str(e)}")
-            await self._update_agent_metrics(agent_type, time.time() - start_time, 0.0, False)
-            raise
+            logger.error(f"Failed to index content for task {task.task_id}: {str(e)}")
 
     async def _select_content_agent(self, content_type: str) -> str:
         """Select appropriate agent for content type"""
@@ -358,51 +422,83 @@ class AdvancedAgentOrchestrator:
         """Call AI agent with task-specific parameters"""
         agent_config = self.agents[agent_type]['config']
         
-        if 'gpt' in agent_config['model']:
-            response = await self.openai_client.chat.completions.create(
-                model=agent_config['model'],
-                messages=[
-                    {"role": "system", "content": "You are a specialized content generation agent."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=agent_config['max_tokens'],
-                temperature=agent_config['temperature']
-            )
-            return response.choices[0].message.content
+        with get_tracer().start_span("llm_call", {
+            'llm.model': agent_config['model'],
+            'llm.max_tokens': agent_config['max_tokens'],
+            'llm.prompt_chars': len(prompt)
+        }) as span:
+            llm_start = time.perf_counter()
+            if 'gpt' in agent_config['model']:
+                response = await self.openai_client.chat.completions.create(
+                    model=agent_config['model'],
+                    messages=[
+                        {"role": "system", "content": "You are a specialized content generation agent."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=agent_config['max_tokens'],
+                    temperature=agent_config['temperature']
+                )
+                LLM_LATENCY.observe(time.perf_counter() - llm_start, model=agent_config['model'])
+                if response.usage:
+                    span.set_attribute('llm.tokens', response.usage.total_tokens)
+                    self._record_usage(agent_type, agent_config['model'], response.usage.total_tokens)
+                return response.choices[0].message.content
+                
+            elif 'claude' in agent_config['model']:
+                response = await self.anthropic_client.messages.create(
+                    model=agent_config['model'],
+                    max_tokens=agent_config['max_tokens'],
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ]
+                )
+                LLM_LATENCY.observe(time.perf_counter() - llm_start, model=agent_config['model'])
+                tokens = response.usage.input_tokens + response.usage.output_tokens
+                span.set_attribute('llm.tokens', tokens)
+                self._record_usage(agent_type, agent_config['model'], tokens)
+                return response.content[0].text
             
-        elif 'claude' in agent_config['model']:
-            response = await self.anthropic_client.messages.create(
-                model=agent_config['model'],
-                max_tokens=agent_config['max_tokens'],
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return response.content[0].text
+            else:
+                raise ValueError(f"Unsupported model: {agent_config['model']}")
+
+    def _record_usage(self, agent_type: str, model: str, tokens: int):
+        """Count tokens and estimated spend for an LLM call"""
+        cost = tokens * MODEL_COST_PER_1K_TOKENS.get(model, 0.0) / 1000
+        TOKENS_TOTAL.inc(tokens, agent=agent_type)
+        COST_TOTAL.inc(cost, agent=agent_type)
         
+        metrics = self.agent_metrics[agent_type]
+        if metrics.cost_per_request == 0:
+            metrics.cost_per_request = cost
         else:
-            raise ValueError(f"Unsupported model: {agent_config['model']}")
+            metrics.cost_per_request = 0.9 * metrics.cost_per_request + 0.1 * cost
 
     async def _post_process_content(self, raw_content: str, task: ContentTask) -> Dict[str, Any]:
         """Post-process generated content"""
-        # Calculate reading time
-        word_count = len(raw_content.split())
-        reading_time = max(1, word_count // 200)  # 200 words per minute
-        
-        # Extract key points
-        key_points = await self._extract_key_points(raw_content)
+        tracer = get_tracer()
         
-        # Generate summary
-        summary = await self._generate_summary(raw_content)
-        
-        return {
-            'content': raw_content,
-            'word_count': word_count,
-            'reading_time': f"{reading_time} min",
-            'key_points': key_points,
-            'summary': summary,
-            'structure': await self._analyze_structure(raw_content)
-        }
+        with tracer.start_span("post_process_content") as span:
+            # Calculate reading time
+            word_count = len(raw_content.split())
+            reading_time = max(1, word_count // 200)  # 200 words per minute
+            span.set_attribute('content.word_count', word_count)
+            
+            # Extract key points
+            with tracer.start_span("extract_key_points"):
+                key_points = await self._extract_key_points(raw_content)
+            
+            # Generate summary
+            with tracer.start_span("generate_summary"):
+                summary = await self._generate_summary(raw_content)
+            
+            return {
+                'content': raw_content,
+                'word_count': word_count,
+                'reading_time': f"{reading_time} min",
+                'key_points': key_points,
+                'summary': summary,
+                'structure': await self._analyze_structure(raw_content)
+            }
 
     async def _extract_key_points(self, content: str) -> List[str]:
         """Extract key points from content"""
@@ -483,6 +579,9 @@ class AdvancedAgentOrchestrator:
         """Update agent performance metrics"""
         metrics = self.agent_metrics[agent_type]
         
+        TASKS_TOTAL.inc(agent=agent_type, status="success" if success else "error")
+        TASK_DURATION.observe(response_time, agent=agent_type)
+        
         # Update response time (exponential moving average)
         if metrics.response_time == 0:
             metrics.response_time = response_time
@@ -495,18 +594,49 @@ class AdvancedAgentOrchestrator:
         else:
             metrics.quality_score = 0.9 * metrics.quality_score + 0.1 * quality_score
         
-        # Update task count
+        # Update task counts
         if success:
             metrics.tasks_completed += 1
+        else:
+            metrics.tasks_failed += 1
         
-        # Calculate success rate
-        total_attempts = metrics.tasks_completed + (1 if not success else 0)
-        metrics.success_rate = metrics.tasks_completed / total_attempts if total_attempts > 0 else 0
+        # Windowed latency quantiles, success/error rates and throughput
+        window = self.agent_window_stats[agent_type]
+        window.record(response_time, success)
+        snapshot = window.snapshot()
         
-        # Update error rate
-        metrics.error_rate = 1 - metrics.success_rate
+        metrics.p50_response_time = snapshot.p50
+        metrics.p95_response_time = snapshot.p95
+        metrics.p99_response_time = snapshot.p99
+        metrics.success_rate = snapshot.success_rate
+        metrics.error_rate = snapshot.error_rate
+        metrics.throughput = snapshot.throughput
+        self._export_window_snapshot(agent_type, snapshot)
         
         metrics.last_updated = datetime.now()
+    
+    def get_agent_window_stats(self, agent_type: str) -> WindowSnapshot:
+        """Current sliding-window statistics for an agent type"""
+        return self.agent_window_stats[agent_type].snapshot()
+
+    def _export_window_snapshot(self, agent_type: str, snapshot: WindowSnapshot):
+        """Publish windowed quantiles and rates as Prometheus gauges"""
+        for quantile, value in (('0.5', snapshot.p50), ('0.95', snapshot.p95), ('0.99', snapshot.p99)):
+            LATENCY_QUANTILES.set(value, agent=agent_type, quantile=quantile)
+        for kind, value in (('success', snapshot.success_rate), ('error', snapshot.error_rate),
+                            ('throughput', snapshot.throughput)):
+            WINDOW_RATES.set(value, agent=agent_type, kind=kind)
+
+    def _refresh_window_metrics(self):
+        """Recompute window gauges at scrape time so idle agents age out of the window"""
+        now = time.time()
+        for agent_type, window in self.agent_window_stats.items():
+            self._export_window_snapshot(agent_type, window.snapshot(now))
+
+    async def start_metrics_server(self):
+        """Expose Prometheus metrics on /metrics"""
+        REGISTRY.add_collector(self._refresh_window_metrics)
+        await REGISTRY.start_server(port=self.config.get('metrics_port', 9108))
 
     async def analyze_web3_opportunities(self) -> List[Web3Opportunity]:
         """Analyze Web3 integration opportunities across domains"""
@@ -610,7 +740,7 @@ class AdvancedAgentOrchestrator:
             {
                 'journey_name': 'SEO Learning to Services',
                 'start_domain': Domain.SEOBIZ_BE,
-                'end_domain': Domain.ANTOYLAMBI_BE,
+                'end_domain': Domain.ANTONYLAMBI_BE,
                 'conversion_probability': 0.25,
                 'revenue_potential': 2500,
                 'optimization_opportunities': [
@@ -625,9 +755,31 @@ class AdvancedAgentOrchestrator:
 
     async def _identify_content_synergies(self) -> List[Dict[str, Any]]:
         """Identify content cross-promotion opportunities"""
+        async with self._index_lock:
+            synergies = await asyncio.to_thread(self.content_index.domain_synergies)
+        
+        # Only portfolio domains can be promoted; other indexed labels are skipped
+        known = {domain.value for domain in Domain}
+        synergies = [s for s in synergies if s['source_domain'] in known and s['target_domain'] in known]
+        
+        if synergies:
+            return [
+                {
+                    'source_domain': Domain(s['source_domain']),
+                    'target_domain': Domain(s['target_domain']),
+                    'content_type': 'related_content',
+                    'promotion_method': 'internal_linking' if s['similarity'] >= 0.4 else 'email_newsletter',
+                    'expected_traffic_increase': f"{min(s['similarity'], 0.5):.0%}",
+                    'similarity': s['similarity'],
+                    'linked_documents': s['linked_documents']
+                }
+                for s in synergies
+            ]
+        
+        # Static opportunities until enough content has been indexed
         return [
             {
-                'source_domain': Domain.ANTOYLAMBI_BE,
+                'source_domain': Domain.ANTONYLAMBI_BE,
                 'target_domain': Domain.SEOBIZ_BE,
                 'content_type': 'case_study',
                 'promotion_method': 'internal_linking',
@@ -812,14 +964,17 @@ class AdvancedAgentOrchestrator:
 
     async def _store_optimization_results(self, results: Dict[str, Any]):
         """Store optimization results in database"""
-        try:
-            await self.supabase_client.table('optimization_cycles').insert({
-                'cycle_data': results,
-                'created_at': datetime.now().isoformat(),
-                'duration': results.get('cycle_duration', 0)
-            })
-        except Exception as e:
-            logger.error(f"Failed to store optimization results: {str(e)}")
+        with get_tracer().start_span("supabase.store_optimization_results", {'db.table': 'optimization_cycles'}) as span:
+            try:
+                await self.supabase_client.table('optimization_cycles').insert({
+                    'cycle_data': results,
+                    'created_at': datetime.now().isoformat(),
+                    'duration': results.get('cycle_duration', 0)
+                })
+            except Exception as e:
+                span.record_exception(e)
+                ERRORS_TOTAL.inc(component="supabase")
+                logger.error(f"Failed to store optimization results: {str(e)}")
 
 # Main execution
 async def main():
@@ -835,6 +990,9 @@ async def main():
     
     orchestrator = AdvancedAgentOrchestrator(config)
     
+    # Expose metrics for scraping
+    await orchestrator.start_metrics_server()
+    
     # Run optimization cycle
     results = await orchestrator.run_optimization_cycle()
     
@@ -31,6 +31,14 @@ import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 import pandas as pd
 
+from content_similarity import ContentSimilarityIndex
+from forecasting import ForecastModel, forecast_series
+from tracing import STATUS_ERROR, configure_tracing_from_env, get_tracer
+from metrics_exporter import (
+    REGISTRY, TASKS_TOTAL, TASKS_IN_PROGRESS, QUEUE_DEPTH, TASK_DURATION,
+    LLM_LATENCY, TOKENS_TOTAL, COST_TOTAL, CACHE_REQUESTS, ERRORS_TOTAL
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -146,10 +154,38 @@ class PortfolioAIAgent:
     async def execute_task(self, task: Task) -> AgentExecution:
         """Execute a task with performance tracking"""
         start_time = time.time()
+        tracer = get_tracer()
+
+        with tracer.start_span("execute_task", {
+            "agent.name": self.config.name,
+            "agent.model": self.config.model_name,
+            "task.id": task.id
+        }) as span:
+            TASKS_IN_PROGRESS.inc(agent=self.config.name)
+            try:
+                execution = await self._execute_with_rate_limit(task, start_time)
+            finally:
+                TASKS_IN_PROGRESS.dec(agent=self.config.name)
+            span.set_attribute("execution.success", execution.success)
+            span.set_attribute("execution.tokens", execution.tokens_used)
+            span.set_attribute("execution.cost_usd", execution.cost_usd)
+            if not execution.success:
+                span.set_status(STATUS_ERROR, execution.error_message or "")
+            return execution
+
+    async def _execute_with_rate_limit(self, task: Task, start_time: float) -> AgentExecution:
+        """Run the task under the rate limiter and build the execution record"""
+        tracer = get_tracer()
 
         try:
+            wait_start = time.time_ns()
             async with self.rate_limiter:
-                result = await self._process_task(task)
+                tracer.record_span("rate_limit_wait", wait_start)
+
+                llm_start = time.perf_counter()
+                with tracer.start_span("llm_call", {"agent.type": self.config.type.value}):
+                    result = await self._process_task(task)
+                LLM_LATENCY.observe(time.perf_counter() - llm_start, model=self.config.model_name)
 
                 execution_time = int((time.time() - start_time) * 1000)
                 tokens_used = self._estimate_tokens(task.data, result)
@@ -306,17 +342,20 @@ class PortfolioAIAgent:
         domain = task.data.get("domain", "")
         prediction_horizon = task.data.get("horizon", 30)  # days
 
-        # Simple predictive modeling (would use more sophisticated ML in production)
         if len(historical_data) >= 7:
             values = [d.get("value", 0) for d in historical_data[-30:]]  # Last 30 days
-            trend = np.polyfit(range(len(values)), values, 1)[0]
-
-            prediction = values[-1] * (1 + trend * prediction_horizon / len(values))
+            forecast = forecast_series(
+                values,
+                prediction_horizon,
+                model=ForecastModel(task.data.get("model", ForecastModel.LINEAR.value)),
+                season_length=task.data.get("season_length", 7)
+            )
 
             return {
-                "prediction": prediction,
-                "confidence": 0.75,
-                "trend": "increasing" if trend > 0 else "decreasing",
+                "prediction": forecast["prediction"],
+                "prediction_interval": [forecast["lower"], forecast["upper"]],
+                "confidence": forecast["confidence"],
+                "trend": "increasing" if forecast["slope"] > 0 else "decreasing",
                 "horizon_days": prediction_horizon,
                 "factors": ["seasonal_trend", "domain_performance", "market_conditions"]
             }
@@ -367,6 +406,10 @@ class AIAgentOrchestrator:
         self.task_queue: asyncio.Queue = asyncio.Queue()
         self.execution_history: List[AgentExecution] = []
         self.performance_monitor = PerformanceMonitor()
+        self._enqueued_at: Dict[str, int] = {}
+
+        # Span tracing (disabled unless TRACE_EXPORT_PATH or an OTLP endpoint is set)
+        configure_tracing_from_env("portfolio-ai-agents")
 
         # Initialize database connection
         self.supabase = supabase.create_client(
@@ -377,6 +420,15 @@ class AIAgentOrchestrator:
         # Initialize Redis for caching
         self.redis = redis.Redis(host='localhost', port=6379, db=0)
 
+        # TF-IDF index over generated content for cross-domain relations
+        # Own directory: the advanced orchestrator keeps a separate index
+        self.content_index = ContentSimilarityIndex(os.getenv("CONTENT_INDEX_DIR", "data/content_index/framework"))
+        self._index_lock = asyncio.Lock()
+
+    async def start_metrics_server(self, port: Optional[int] = None):
+        """Expose Prometheus metrics on /metrics"""
+        await REGISTRY.start_server(port=port or int(os.getenv("METRICS_PORT", "9108")))
+
     def register_agent(self, agent: PortfolioAIAgent):
         """Register a new AI agent"""
         self.agents[agent.config.name] = agent
@@ -384,7 +436,9 @@ class AIAgentOrchestrator:
 
     async def submit_task(self, task: Task) -> str:
         """Submit a task for execution"""
+        self._enqueued_at[task.id] = time.time_ns()
         await self.task_queue.put(task)
+        QUEUE_DEPTH.set(self.task_queue.qsize(), orchestrator="ai_agent_framework")
 
         # Store task in database
         await self._store_task(task)
@@ -396,29 +450,48 @@ class AIAgentOrchestrator:
         while True:
             try:
                 task = await self.task_queue.get()
+                QUEUE_DEPTH.set(self.task_queue.qsize(), orchestrator="ai_agent_framework")
+                tracer = get_tracer()
+
+                with tracer.start_span("process_task", {
+                    "task.id": task.id,
+                    "task.type": task.type,
+                    "task.domain": task.domain,
+                    "task.priority": task.priority
+                }) as span:
+                    enqueued_at = self._enqueued_at.pop(task.id, None)
+                    if enqueued_at:
+                        tracer.record_span("queue_wait", enqueued_at, attributes={"queue.depth": self.task_queue.qsize()})
+
+                    # Find best agent for task
+                    with tracer.start_span("select_agent", {"agents.registered": len(self.agents)}):
+                        agent = await self._select_agent_for_task(task)
 
-                # Find best agent for task
-                agent = await self._select_agent_for_task(task)
+                    if agent:
+                        span.set_attribute("agent.name", agent.config.name)
 
-                if agent:
-                    # Execute task
-                    execution = await agent.execute_task(task)
+                        # Execute task
+                        execution = await agent.execute_task(task)
 
-                    # Store execution result
-                    await self._store_execution(execution)
+                        # Store execution result
+                        await self._store_execution(execution)
 
-                    # Update performance metrics
-                    await self.performance_monitor.update_metrics(execution)
+                        # Update performance metrics
+                        with tracer.start_span("update_metrics"):
+                            await self.performance_monitor.update_metrics(execution)
 
-                    # Handle task completion
-                    await self._handle_task_completion(task, execution)
+                        # Handle task completion
+                        with tracer.start_span("handle_task_completion"):
+                            await self._handle_task_completion(task, execution)
 
-                else:
-                    logger.warning(f"No suitable agent found for task: {task.id}")
+                    else:
+                        span.set_attribute("agent.name", "none")
+                        logger.warning(f"No suitable agent found for task: {task.id}")
 
                 self.task_queue.task_done()
 
             except Exception as e:
+                ERRORS_TOTAL.inc(component="task_processing")
                 logger.error(f"Task processing error: {str(e)}")
                 await asyncio.sleep(1)
 
@@ -443,43 +516,52 @@ class AIAgentOrchestrator:
 
     async def _store_task(self, task: Task):
         """Store task in database"""
-        try:
-            await self.supabase.table('ai_agents.agent_executions').insert({
-                'task_id': task.id,
-                'task_type': task.type,
-                'domain': task.domain,
-                'priority': task.priority,
-                'data': json.dumps(task.data),
-                'status': task.status,
-                'created_at': task.created_at.isoformat()
-            }).execute()
-        except Exception as e:
-            logger.error(f"Failed to store task: {str(e)}")
+        with get_tracer().start_span("supabase.store_task", {"db.table": "ai_agents.agent_executions"}) as span:
+            try:
+                await self.supabase.table('ai_agents.agent_executions').insert({
+                    'task_id': task.id,
+                    'task_type': task.type,
+                    'domain': task.domain,
+                    'priority': task.priority,
+                    'data': json.dumps(task.data),
+                    'status': task.status,
+                    'created_at': task.created_at.isoformat()
+                }).execute()
+            except Exception as e:
+                span.record_exception(e)
+                ERRORS_TOTAL.inc(component="supabase")
+                logger.error(f"Failed to store task: {str(e)}")
 
     async def _store_execution(self, execution: AgentExecution):
         """Store execution result in database"""
-        try:
-            await self.supabase.table('ai_agents.agent_executions').insert({
-                'agent_name': execution.agent_name,
-                'task_id': execution.task_id,
-                'input_data': json.dumps(execution.input_data),
-                'output_data': json.dumps(execution.output_data),
-                'execution_time_ms': execution.execution_time_ms,
-                'success': execution.success,
-                'error_message': execution.error_message,
-                'tokens_used': execution.tokens_used,
-                'cost_usd': execution.cost_usd,
-                'performance_score': execution.performance_score,
-                'created_at': datetime.now().isoformat()
-            }).execute()
-
-            self.execution_history.append(execution)
-        except Exception as e:
-            logger.error(f"Failed to store execution: {str(e)}")
+        with get_tracer().start_span("supabase.store_execution", {"db.table": "ai_agents.agent_executions"}) as span:
+            try:
+                await self.supabase.table('ai_agents.agent_executions').insert({
+                    'agent_name': execution.agent_name,
+                    'task_id': execution.task_id,
+                    'input_data': json.dumps(execution.input_data),
+                    'output_data': json.dumps(execution.output_data),
+                    'execution_time_ms': execution.execution_time_ms,
+                    'success': execution.success,
+                    'error_message': execution.error_message,
+                    'tokens_used': execution.tokens_used,
+                    'cost_usd': execution.cost_usd,
+                    'performance_score': execution.performance_score,
+                    'created_at': datetime.now().isoformat()
+                }).execute()
+
+                self.execution_history.append(execution)
+            except Exception as e:
+                span.record_exception(e)
+                ERRORS_TOTAL.inc(component="supabase")
+                logger.error(f"Failed to store execution: {str(e)}")
 
     async def _handle_task_completion(self, task: Task, execution: AgentExecution):
         """Handle task completion and trigger follow-up actions"""
         if execution.success:
+            # Index generated content for similarity lookups
+            await self._index_generated_content(task, execution)
+
             # Trigger domain-specific rewards via smart contract
             if task.domain and execution.output_data.get('seo_score_improvement', 0) > 0:
                 await self._trigger_domain_rewards(task, execution)
@@ -490,6 +572,18 @@ class AIAgentOrchestrator:
             # Trigger cross-domain optimizations if applicable
             await self._check_cross_domain_opportunities(task, execution)
 
+    async def _index_generated_content(self, task: Task, execution: AgentExecution):
+        """Add generated or optimized content to the similarity index"""
+        content = (execution.output_data.get('generated_content')
+                   or execution.output_data.get('optimized_content'))
+        if task.domain and isinstance(content, str) and content:
+            try:
+                # Vectorizing and autosaving run off the event loop
+                async with self._index_lock:
+                    await asyncio.to_thread(self.content_index.add_document, task.id, content, task.domain)
+            except Exception as e:
+                logger.error(f"Failed to index content for task {task.id}: {str(e)}")
+
     async def _trigger_domain_rewards(self, task: Task, execution: AgentExecution):
         """Trigger smart contract rewards for AI optimizations"""
         try:
@@ -505,50 +599,64 @@ class AIAgentOrchestrator:
 
     async def _update_domain_analytics(self, task: Task, execution: AgentExecution):
         """Update domain analytics based on execution results"""
-        try:
-            # Cache results in Redis for real-time analytics
-            cache_key = f"domain_analytics:{task.domain}"
-            current_data = json.loads(self.redis.get(cache_key) or "{}")
+        with get_tracer().start_span("redis.update_domain_analytics", {"task.domain": task.domain}) as span:
+            try:
+                # Cache results in Redis for real-time analytics
+                cache_key = f"domain_analytics:{task.domain}"
+                cached = self.redis.get(cache_key)
+                CACHE_REQUESTS.inc(cache="domain_analytics", result="hit" if cached else "miss")
+                current_data = json.loads(cached or "{}")
 
-            # Update metrics
-            current_data['last_ai_execution'] = datetime.now().isoformat()
-            current_data['ai_optimizations'] = current_data.get('ai_optimizations', 0) + 1
-            current_data['performance_score'] = execution.performance_score
+                # Update metrics
+                current_data['last_ai_execution'] = datetime.now().isoformat()
+                current_data['ai_optimizations'] = current_data.get('ai_optimizations', 0) + 1
+                current_data['performance_score'] = execution.performance_score
 
-            self.redis.setex(cache_key, 3600, json.dumps(current_data))  # 1 hour cache
+                self.redis.setex(cache_key, 3600, json.dumps(current_data))  # 1 hour cache
 
-        except Exception as e:
-            logger.error(f"Failed to update domain analytics: {str(e)}")
+            except Exception as e:
+                span.record_exception(e)
+                ERRORS_TOTAL.inc(component="redis")
+                logger.error(f"Failed to update domain analytics: {str(e)}")
 
     async def _check_cross_domain_opportunities(self, task: Task, execution: AgentExecution):
         """Check for cross-domain optimization opportunities"""
-        try:
-            # Example: If SEO improved on one domain, check if similar content exists on other domains
-            if execution.output_data.get('seo_score_improvement', 0) > 20:
-                # Trigger content optimization tasks for related domains
-                related_domains = await self._find_related_domains(task.domain)
-
-                for domain in related_domains:
-                    optimization_task = Task(
-                        id=f"cross_domain_opt_{task.id}_{domain}",
-                        type="content_optimization",
-                        domain=domain,
-                        priority=5,
-                        data={
-                            "source_domain": task.domain,
-                            "optimization_type": "seo_transfer",
-                            "content_reference": execution.output_data
-                        },
-                        created_at=datetime.now()
-                    )
-
-                    await self.submit_task(optimization_task)
+        with get_tracer().start_span("cross_domain_fanout", {"task.domain": task.domain}) as span:
+            try:
+                # Example: If SEO improved on one domain, check if similar content exists on other domains
+                if execution.output_data.get('seo_score_improvement', 0) > 20:
+                    # Trigger content optimization tasks for related domains
+                    related_domains = await self._find_related_domains(task.domain)
+                    span.set_attribute("fanout.tasks", len(related_domains))
+
+                    for domain in related_domains:
+                        optimization_task = Task(
+                            id=f"cross_domain_opt_{task.id}_{domain}",
+                            type="content_optimization",
+                            domain=domain,
+                            priority=5,
+                            data={
+                                "source_domain": task.domain,
+                                "optimization_type": "seo_transfer",
+                                "content_reference": execution.output_data
+                            },
+                            created_at=datetime.now()
+                        )
+
+                        await self.submit_task(optimization_task)
 
-        except Exception as e:
-            logger.error(f"Failed to check cross-domain opportunities: {str(e)}")
+            except Exception as e:
+                span.record_exception(e)
+                logger.error(f"Failed to check cross-domain opportunities: {str(e)}")
 
     async def _find_related_domains(self, domain: str) -> List[str]:
         """Find domains related to the given domain"""
+        async with self._index_lock:
+            related = await asyncio.to_thread(self.content_index.related_domains, domain)
+        if related:
+            return related
+
+        # Static relations until enough content has been indexed
         domain_relations = {
             "adaptogenic-mushrooms.com": ["healthfulmushrooms.com", "brainhealthmushrooms.com"],
             "fixie.run": ["puffs-store.com"],
@@ -645,6 +753,12 @@ class PerformanceMonitor:
         metrics['total_cost'] += execution.cost_usd
         metrics['total_tokens'] += execution.tokens_used
 
+        # Mirror into the scrapeable registry
+        TASKS_TOTAL.inc(agent=agent_name, status="success" if execution.success else "error")
+        TASK_DURATION.observe(execution.execution_time_ms / 1000, agent=agent_name)
+        TOKENS_TOTAL.inc(execution.tokens_used, agent=agent_name)
+        COST_TOTAL.inc(execution.cost_usd, agent=agent_name)
+
         # Check for alerts
         await self._check_alerts(agent_name, metrics)
 
@@ -777,6 +891,9 @@ async def main():
 
     await orchestrator.submit_task(sample_task)
 
+    # Expose metrics for scraping
+    await orchestrator.start_metrics_server()
+
     # Start processing tasks
     await orchestrator.process_tasks()
 
@@ -0,0 +1,423 @@
+"""
+Content Similarity Index
+Incremental TF-IDF engine for cross-domain content synergy detection
+
+Keeps raw term frequencies in a sparse CSR matrix that grows as content is
+generated, applies IDF weighting lazily at query time and persists the matrix
+as .npy files that are memory-mapped on restart.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-]+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+""".split())
+
+class ContentSimilarityIndex:
+    """Incrementally updated sparse TF-IDF index with top-k cosine queries"""
+
+    def __init__(self, index_dir: Optional[str] = None, min_df: int = 2,
+                 max_df_ratio: float = 0.6, max_features: int = 100000,
+                 prune_every: int = 2000, autosave_every: int = 100,
+                 domain_refresh_ratio: float = 0.05, domain_refresh_seconds: float = 300.0):
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.min_df = min_df
+        self.max_df_ratio = max_df_ratio
+        self.max_features = max_features
+        self.prune_every = prune_every
+        self.autosave_every = autosave_every
+        # The all-pairs domain pass is recomputed once the corpus grew by this
+        # fraction, or after this many seconds, rather than on every add
+        self.domain_refresh_ratio = domain_refresh_ratio
+        self.domain_refresh_seconds = domain_refresh_seconds
+
+        # Vocabulary and corpus bookkeeping
+        self.vocabulary: Dict[str, int] = {}
+        self.doc_ids: List[str] = []
+        self.doc_domains: List[str] = []
+        self._doc_positions: Dict[str, int] = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+
+        # Committed term-frequency rows plus rows appended since the last merge
+        self._tf = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._weights: Optional[sparse.csr_matrix] = None
+        # Bumped whenever the corpus changes
+        self.version = 0
+        # (k, min_similarity, block_size) -> (documents, computed_at, result)
+        self._domain_cache: Dict[Tuple[int, float, int], Tuple[int, float, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+        self._unsaved = 0
+        self._since_prune = 0
+
+        if self.index_dir and (self.index_dir / "vocab.json").exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercase word tokens without stop words"""
+        return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+    def add_document(self, doc_id: str, text: str, domain: str = "unknown") -> int:
+        """Vectorize and append a document, returning its row position"""
+        if doc_id in self._doc_positions:
+            logger.debug(f"Document already indexed: {doc_id}")
+            return self._doc_positions[doc_id]
+
+        counts = Counter(self.tokenize(text))
+        columns = np.fromiter((self._term_column(term) for term in counts), dtype=np.int32, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        order = np.argsort(columns)
+        columns, values = columns[order], values[order]
+
+        self._df[columns] += 1
+        self._pending.append((columns, values))
+
+        position = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.doc_domains.append(domain)
+        self._doc_positions[doc_id] = position
+        self._invalidate()
+
+        self._since_prune += 1
+        if self._since_prune >= self.prune_every:
+            self.prune_vocabulary()
+
+        self._unsaved += 1
+        if self.index_dir and self._unsaved >= self.autosave_every:
+            self.save()
+
+        return position
+
+    def _invalidate(self):
+        """Drop derived matrices after the corpus changed"""
+        self._weights = None
+        self.version += 1
+
+    def _domain_cache_fresh(self, documents: int, computed_at: float) -> bool:
+        """Whether a cached domain pass is still close enough to the corpus"""
+        grown = len(self.doc_ids) - documents
+        return (grown <= self.domain_refresh_ratio * documents
+                and time.monotonic() - computed_at < self.domain_refresh_seconds)
+
+    def _term_column(self, term: str) -> int:
+        """Look up or allocate the column for a term"""
+        column = self.vocabulary.get(term)
+        if column is None:
+            column = len(self.vocabulary)
+            self.vocabulary[term] = column
+            if column >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.int64)])
+        return column
+
+    def _term_matrix(self) -> sparse.csr_matrix:
+        """Merge pending rows into the committed term-frequency matrix"""
+        n_terms = len(self.vocabulary)
+
+        if self._pending:
+            indptr = np.zeros(len(self._pending) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(cols) for cols, _ in self._pending])
+            block = sparse.csr_matrix(
+                (
+                    np.concatenate([vals for _, vals in self._pending]),
+                    np.concatenate([cols for cols, _ in self._pending]),
+                    indptr
+                ),
+                shape=(len(self._pending), n_terms)
+            )
+            committed = self._tf
+            committed.resize((committed.shape[0], n_terms))
+            self._tf = sparse.vstack([committed, block], format="csr")
+            self._pending = []
+        elif self._tf.shape[1] != n_terms:
+            self._tf.resize((self._tf.shape[0], n_terms))
+
+        return self._tf
+
+    def _weight_matrix(self) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF rows, cached until the corpus changes"""
+        if self._weights is None:
+            tf = self._term_matrix()
+            n_docs = max(tf.shape[0], 1)
+            df = self._df[:tf.shape[1]]
+            idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+
+            # Sublinear term frequency, same weighting as _vectorize_query
+            weights = sparse.csr_matrix(
+                (np.log1p(tf.data, dtype=np.float32), tf.indices, tf.indptr), shape=tf.shape
+            ).multiply(idf).tocsr()
+            norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            self._weights = sparse.diags(1.0 / norms).dot(weights).tocsr().astype(np.float32)
+
+        return self._weights
+
+    def _vectorize_query(self, text: str) -> sparse.csr_matrix:
+        """Project free text onto the current vocabulary"""
+        counts = Counter(t for t in self.tokenize(text) if t in self.vocabulary)
+        n_terms = len(self.vocabulary)
+        if not counts:
+            return sparse.csr_matrix((1, n_terms), dtype=np.float32)
+
+        columns = np.array([self.vocabulary[t] for t in counts], dtype=np.int32)
+        n_docs = max(len(self.doc_ids), 1)
+        idf = np.log((1 + n_docs) / (1 + self._df[columns])) + 1
+        values = np.log1p(np.fromiter(counts.values(), dtype=np.float32)) * idf
+        values /= np.linalg.norm(values) or 1.0
+
+        return sparse.csr_matrix(
+            (values.astype(np.float32), columns, np.array([0, len(columns)])),
+            shape=(1, n_terms)
+        )
+
+    def _top_k(self, scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """Select the k highest scores without a full sort"""
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [(self.doc_ids[i], float(scores[i])) for i in candidates if scores[i] > 0]
+
+    def most_similar(self, doc_id: str, k: int = 10, exclude_same_domain: bool = False) -> List[Tuple[str, float]]:
+        """Top-k cosine neighbours of an indexed document"""
+        position = self._doc_positions.get(doc_id)
+        if position is None:
+            return []
+
+        weights = self._weight_matrix()
+        scores = weights.dot(weights[position].T).toarray().ravel()
+
+        mask = np.ones(len(scores), dtype=bool)
+        mask[position] = False
+        if exclude_same_domain:
+            codes = self._domain_codes()[1]
+            mask &= codes != codes[position]
+
+        return self._top_k(scores, k, mask)
+
+    def query(self, text: str, k: int = 10, domain: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Top-k cosine matches for free text, optionally within one domain"""
+        if not self.doc_ids:
+            return []
+
+        scores = self._weight_matrix().dot(self._vectorize_query(text).T).toarray().ravel()
+        mask = None
+        if domain is not None:
+            mask = np.asarray(self.doc_domains) == domain
+
+        return self._top_k(scores, k, mask)
+
+    def _domain_codes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Unique domains and the integer code of each document's domain"""
+        return np.unique(np.asarray(self.doc_domains), return_inverse=True)
+
+    def domain_similarity(self, k: int = 10, min_similarity: float = 0.15,
+                          block_size: int = 1024) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Aggregate cross-domain top-k neighbour similarity into a domain x domain matrix
+
+        Returns (domains, mean_similarity, link_count); rows are source domains.
+        Results are cached until the corpus grows by domain_refresh_ratio or
+        domain_refresh_seconds elapse, since the pass is all-pairs.
+        """
+        key = (k, min_similarity, block_size)
+        cached = self._domain_cache.get(key)
+        if cached is not None and self._domain_cache_fresh(cached[0], cached[1]):
+            return cached[2]
+        documents, computed_at = len(self.doc_ids), time.monotonic()
+
+        domains, codes = self._domain_codes()
+        n_domains = len(domains)
+        totals = np.zeros((n_domains, n_domains), dtype=np.float64)
+        counts = np.zeros((n_domains, n_domains), dtype=np.int64)
+        if len(self.doc_ids) < 2:
+            result = (domains, totals, counts)
+            self._domain_cache[key] = (documents, computed_at, result)
+            return result
+
+        weights = self._weight_matrix()
+        k = min(k, len(self.doc_ids) - 1)
+
+        for start in range(0, weights.shape[0], block_size):
+            stop = min(start + block_size, weights.shape[0])
+            scores = weights[start:stop].dot(weights.T).toarray()
+
+            # Only neighbours on other domains count as synergies
+            block_codes = codes[start:stop]
+            scores[block_codes[:, None] == codes[None, :]] = -np.inf
+
+            neighbours = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best = np.take_along_axis(scores, neighbours, axis=1)
+            keep = np.isfinite(best) & (best >= min_similarity)
+
+            sources = np.broadcast_to(block_codes[:, None], neighbours.shape)[keep]
+            targets = codes[neighbours[keep]]
+            np.add.at(totals, (sources, targets), best[keep])
+            np.add.at(counts, (sources, targets), 1)
+
+        mean = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+        result = (domains, mean, counts)
+        self._domain_cache[key] = (documents, computed_at, result)
+        return result
+
+    def domain_synergies(self, k: int = 10, min_similarity: float = 0.15, limit: int = 20) -> List[Dict[str, Any]]:
+        """Ranked cross-domain pairs by shared content similarity"""
+        domains, mean, counts = self.domain_similarity(k=k, min_similarity=min_similarity)
+        if counts.sum() == 0:
+            return []
+
+        score = mean * np.log1p(counts)
+        sources, targets = np.nonzero(counts)
+        order = np.argsort(-score[sources, targets])[:limit]
+
+        return [
+            {
+                'source_domain': str(domains[sources[i]]),
+                'target_domain': str(domains[targets[i]]),
+                'similarity': float(mean[sources[i], targets[i]]),
+                'linked_documents': int(counts[sources[i], targets[i]]),
+                'score': float(score[sources[i], targets[i]])
+            }
+            for i in order
+        ]
+
+    def related_domains(self, domain: str, k: int = 10, min_similarity: float = 0.15, limit: int = 3) -> List[str]:
+        """Domains whose content most resembles the given domain's content"""
+        domains, mean, counts = self.domain_similarity(k=k, min_similarity=min_similarity)
+        matches = np.flatnonzero(domains == domain)
+        if len(matches) == 0:
+            return []
+
+        row = matches[0]
+        score = mean[row] * np.log1p(counts[row])
+        order = [i for i in np.argsort(-score) if counts[row, i] > 0]
+        return [str(domains[i]) for i in order[:limit]]
+
+    def prune_vocabulary(self):
+        """Drop rare and overly common terms, remapping the remaining columns"""
+        self._since_prune = 0
+        tf = self._term_matrix()
+        n_docs = tf.shape[0]
+        if n_docs == 0:
+            return
+
+        df = self._df[:tf.shape[1]]
+        keep = (df >= self.min_df) & (df <= max(self.max_df_ratio * n_docs, self.min_df))
+        if keep.sum() > self.max_features:
+            ranked = np.argsort(-np.where(keep, df, -1), kind="stable")[:self.max_features]
+            keep = np.zeros_like(keep)
+            keep[ranked] = True
+
+        if keep.all():
+            return
+
+        kept_columns = np.flatnonzero(keep)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        self.vocabulary = {terms[c]: i for i, c in enumerate(kept_columns)}
+        self._tf = tf[:, kept_columns].tocsr()
+        new_df = np.zeros(max(1024, 2 * len(kept_columns)), dtype=np.int64)
+        new_df[:len(kept_columns)] = df[kept_columns]
+        self._df = new_df
+        self._invalidate()
+
+        logger.info(f"Pruned vocabulary to {len(kept_columns)} terms ({n_docs} documents)")
+
+    def save(self):
+        """Persist the index as memory-mappable .npy arrays
+
+        All files are written to a sibling temporary directory that is then
+        renamed into place, so a reader never sees arrays and docs.json from
+        different saves.
+        """
+        if not self.index_dir:
+            return
+
+        self.index_dir.parent.mkdir(parents=True, exist_ok=True)
+        tf = self._term_matrix()
+
+        arrays = {
+            'tf_data': tf.data,
+            'tf_indices': tf.indices,
+            'tf_indptr': tf.indptr,
+            'df': self._df[:len(self.vocabulary)]
+        }
+        staging = Path(tempfile.mkdtemp(prefix=f".{self.index_dir.name}.", dir=self.index_dir.parent))
+        try:
+            for name, array in arrays.items():
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+            with open(staging / "docs.json", 'w') as f:
+                json.dump({'doc_ids': self.doc_ids, 'domains': self.doc_domains}, f)
+            with open(staging / "vocab.json", 'w') as f:
+                json.dump(sorted(self.vocabulary, key=self.vocabulary.get), f)
+            self._swap_into_place(staging)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self._unsaved = 0
+
+    def _swap_into_place(self, staging: Path):
+        """Replace index_dir with a fully written staging directory"""
+        retired = self.index_dir.parent / f".{self.index_dir.name}.old.{os.getpid()}.{time.monotonic_ns()}"
+        try:
+            os.rename(self.index_dir, retired)
+        except FileNotFoundError:
+            retired = None
+        try:
+            os.rename(staging, self.index_dir)
+        except OSError as e:
+            # Another process swapped its own complete save in first
+            logger.warning(f"Content index save superseded by a concurrent save: {str(e)}")
+        if retired is not None:
+            # Memory-mapped arrays of the retired copy stay readable after removal
+            shutil.rmtree(retired, ignore_errors=True)
+
+    def load(self):
+        """Memory-map a previously saved index"""
+        with open(self.index_dir / "vocab.json") as f:
+            terms = json.load(f)
+        with open(self.index_dir / "docs.json") as f:
+            docs = json.load(f)
+
+        data = np.load(self.index_dir / "tf_data.npy", mmap_mode='r')
+        indices = np.load(self.index_dir / "tf_indices.npy", mmap_mode='r')
+        indptr = np.load(self.index_dir / "tf_indptr.npy", mmap_mode='r')
+        df = np.load(self.index_dir / "df.npy")
+
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.doc_ids = docs['doc_ids']
+        self.doc_domains = docs['domains']
+        self._doc_positions = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+        self._tf = sparse.csr_matrix((data, indices, indptr), shape=(len(self.doc_ids), len(terms)), copy=False)
+        self._df = np.zeros(max(1024, 2 * len(terms)), dtype=np.int64)
+        self._df[:len(terms)] = df
+        self._pending = []
+        self._domain_cache = {}
+        self._invalidate()
+
+        logger.info(f"Loaded content index: {len(self.doc_ids)} documents, {len(terms)} terms")
@@ -0,0 +1,321 @@
+"""
+Portfolio Forecasting Engine
+Batched time-series forecasting for every domain x metric series
+
+All series share one time axis and are fitted together as NumPy array
+operations. Models: least-squares linear trend, Holt (level + trend),
+additive Holt-Winters and seasonal naive. New observations update the
+fitted state in O(1) per series instead of refitting from scratch.
+"""
+
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from statistics import NormalDist
+from typing import Dict, List, Tuple, Any, Sequence, Hashable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class ForecastModel(Enum):
+    """Forecasting model enumeration"""
+    LINEAR = "linear"
+    HOLT = "holt"
+    HOLT_WINTERS = "holt_winters"
+    SEASONAL_NAIVE = "seasonal_naive"
+
+@dataclass
+class ForecastResult:
+    """Forecast paths for all series, shaped (series, horizon)"""
+    keys: List[Hashable]
+    point: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    slope: np.ndarray
+    confidence: float
+
+    @property
+    def horizon(self) -> int:
+        return self.point.shape[1]
+
+    def at_horizon(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Point forecast and interval bounds at the last step"""
+        return self.point[:, -1], self.lower[:, -1], self.upper[:, -1]
+
+    def trend_directions(self, tolerance: float = 1e-9) -> List[str]:
+        """'up', 'down' or 'flat' per series"""
+        return ["up" if s > tolerance else "down" if s < -tolerance else "flat" for s in self.slope]
+
+    def for_key(self, key: Hashable) -> Dict[str, Any]:
+        """Forecast summary for a single series"""
+        i = self.keys.index(key)
+        return {
+            'prediction': float(self.point[i, -1]),
+            'lower': float(self.lower[i, -1]),
+            'upper': float(self.upper[i, -1]),
+            'slope': float(self.slope[i]),
+            'trend': self.trend_directions()[i],
+            'confidence': self.confidence
+        }
+
+class PortfolioForecaster:
+    """Fits and incrementally updates forecasts for many aligned series"""
+
+    def __init__(self, keys: Sequence[Hashable], model: ForecastModel = ForecastModel.LINEAR,
+                 window: int = 90, season_length: int = 7, alpha: float = 0.3,
+                 beta: float = 0.1, gamma: float = 0.2, confidence: float = 0.9):
+        self.keys = list(keys)
+        self.model = ForecastModel(model)
+        self.window = window
+        self.season_length = season_length if self.model in (ForecastModel.HOLT_WINTERS, ForecastModel.SEASONAL_NAIVE) else 1
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma if self.model == ForecastModel.HOLT_WINTERS else 0.0
+        self.confidence = confidence
+        self._z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+        n_series = len(self.keys)
+
+        # Ring buffer of the last `window` observations (NaN = missing)
+        self._buffer = np.full((n_series, window), np.nan)
+        self._steps = 0
+
+        # Linear model sufficient statistics, x measured from self._origin
+        self._origin = 0
+        self._stats = np.zeros((6, n_series))
+
+        # Exponential smoothing state
+        self._level = np.zeros(n_series)
+        self._trend = np.zeros(n_series)
+        self._season = np.zeros((n_series, self.season_length))
+        self._sse = np.zeros(n_series)
+        self._n_errors = np.zeros(n_series)
+        self._initialized = False
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def index(self, key: Hashable) -> int:
+        return self.keys.index(key)
+
+    def fit(self, history: np.ndarray) -> "PortfolioForecaster":
+        """Fit all series from a (series, time) history array"""
+        history = np.asarray(history, dtype=np.float64)
+        if history.ndim != 2 or history.shape[0] != len(self.keys):
+            raise ValueError(f"History must be shaped ({len(self.keys)}, T), got {history.shape}")
+
+        n_steps = history.shape[1]
+        self._steps = n_steps
+        self._buffer[:] = np.nan
+        recent = history[:, -self.window:]
+        slots = np.arange(n_steps - recent.shape[1], n_steps) % self.window
+        self._buffer[:, slots] = recent
+
+        self._recompute_linear_stats()
+
+        if self.model in (ForecastModel.HOLT, ForecastModel.HOLT_WINTERS):
+            self._fit_smoothing(history)
+
+        return self
+
+    def _window_values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Buffered values in time order with their absolute steps"""
+        count = min(self._steps, self.window)
+        steps = np.arange(self._steps - count, self._steps)
+        return self._buffer[:, steps % self.window], steps
+
+    def _recompute_linear_stats(self):
+        """Recompute regression sums exactly from the buffer"""
+        values, steps = self._window_values()
+        self._origin = int(steps[0]) if len(steps) else self._steps
+        x = (steps - self._origin).astype(np.float64)
+
+        observed = ~np.isnan(values)
+        y = np.where(observed, values, 0.0)
+        self._stats = np.stack([
+            observed.sum(axis=1).astype(np.float64),
+            observed @ x,
+            observed @ (x * x),
+            y.sum(axis=1),
+            y @ x,
+            (y * y).sum(axis=1)
+        ])
+
+    def _fit_smoothing(self, history: np.ndarray):
+        """Initialize and run the Holt / Holt-Winters recursion over history"""
+        n_steps = history.shape[1]
+        m = self.season_length
+
+        if self.model == ForecastModel.HOLT_WINTERS and n_steps >= 2 * m:
+            first = np.nanmean(history[:, :m], axis=1)
+            second = np.nanmean(history[:, m:2 * m], axis=1)
+            self._level = np.nan_to_num(first)
+            self._trend = np.nan_to_num((second - first) / m)
+            self._season = np.nan_to_num(history[:, :m] - first[:, None])
+            start = m
+        else:
+            self._level = np.nan_to_num(history[:, 0]) if n_steps else np.zeros(len(self.keys))
+            self._trend = np.nan_to_num(history[:, 1] - history[:, 0]) if n_steps >= 2 else np.zeros(len(self.keys))
+            self._season = np.zeros((len(self.keys), m))
+            start = 1
+
+        self._sse[:] = 0.0
+        self._n_errors[:] = 0.0
+        for t in range(start, n_steps):
+            self._smoothing_step(history[:, t], t)
+        self._initialized = n_steps > 0
+
+    def _smoothing_step(self, values: np.ndarray, t: int):
+        """One vectorized Holt-Winters update across all series"""
+        s = t % self.season_length
+        expected = self._level + self._trend + self._season[:, s]
+        observed = ~np.isnan(values)
+        y = np.where(observed, values, expected)
+
+        error = y - expected
+        self._sse += np.where(observed, error * error, 0.0)
+        self._n_errors += observed
+
+        level = self.alpha * (y - self._season[:, s]) + (1 - self.alpha) * (self._level + self._trend)
+        self._trend = self.beta * (level - self._level) + (1 - self.beta) * self._trend
+        self._season[:, s] = self.gamma * (y - level) + (1 - self.gamma) * self._season[:, s]
+        self._level = level
+
+    def update(self, values: Sequence[float]):
+        """Append one observation per series (NaN for missing) and refit incrementally"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(self.keys),):
+            raise ValueError(f"Expected {len(self.keys)} values, got {values.shape}")
+
+        t = self._steps
+        slot = t % self.window
+
+        if self._steps >= self.window:
+            self._add_linear_point(self._buffer[:, slot], t - self.window, sign=-1.0)
+        self._buffer[:, slot] = values
+        self._add_linear_point(values, t, sign=1.0)
+
+        if self.model in (ForecastModel.HOLT, ForecastModel.HOLT_WINTERS):
+            if self._initialized:
+                self._smoothing_step(values, t)
+            else:
+                self._level = np.nan_to_num(values)
+                self._initialized = True
+
+        self._steps += 1
+
+        # Rebase x and drop accumulated rounding error once per window
+        if self._steps % self.window == 0:
+            self._recompute_linear_stats()
+
+    def _add_linear_point(self, values: np.ndarray, t: int, sign: float):
+        observed = ~np.isnan(values)
+        x = float(t - self._origin)
+        y = np.where(observed, values, 0.0)
+        self._stats += sign * np.stack([
+            observed.astype(np.float64),
+            observed * x,
+            observed * x * x,
+            y,
+            y * x,
+            y * y
+        ])
+
+    def forecast(self, horizon: int) -> ForecastResult:
+        """Forecast `horizon` steps ahead for every series"""
+        if horizon < 1:
+            raise ValueError("Horizon must be at least one step")
+
+        if self.model == ForecastModel.LINEAR:
+            point, half_width, slope = self._forecast_linear(horizon)
+        elif self.model == ForecastModel.SEASONAL_NAIVE:
+            point, half_width, slope = self._forecast_seasonal_naive(horizon)
+        else:
+            point, half_width, slope = self._forecast_smoothing(horizon)
+
+        return ForecastResult(
+            keys=self.keys,
+            point=point,
+            lower=point - half_width,
+            upper=point + half_width,
+            slope=slope,
+            confidence=self.confidence
+        )
+
+    def _forecast_linear(self, horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n, sx, sxx, sy, sxy, syy = self._stats
+        safe_n = np.maximum(n, 1)
+
+        x_mean = sx / safe_n
+        y_mean = sy / safe_n
+        sxx_c = sxx - sx * x_mean
+        sxy_c = sxy - sx * y_mean
+        syy_c = syy - sy * y_mean
+
+        fitted = (n >= 2) & (sxx_c > 1e-12)
+        slope = np.where(fitted, sxy_c / np.where(fitted, sxx_c, 1.0), 0.0)
+        intercept = y_mean - slope * x_mean
+
+        x_future = (self._steps - self._origin - 1) + np.arange(1, horizon + 1, dtype=np.float64)
+        point = intercept[:, None] + slope[:, None] * x_future[None, :]
+
+        # Prediction interval of an ordinary least-squares fit
+        dof = n - 2
+        residual_var = np.where(dof > 0, np.maximum(syy_c - slope * sxy_c, 0.0) / np.maximum(dof, 1), np.nan)
+        leverage = 1 + 1 / safe_n[:, None] + (x_future[None, :] - x_mean[:, None]) ** 2 / np.where(fitted, sxx_c, np.inf)[:, None]
+        half_width = self._z * np.sqrt(residual_var[:, None] * leverage)
+
+        point = np.where(n[:, None] > 0, point, np.nan)
+        return point, half_width, slope
+
+    def _forecast_smoothing(self, horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        m = self.season_length
+        steps = np.arange(1, horizon + 1)
+        season_index = (self._steps + steps - 1) % m
+
+        point = self._level[:, None] + steps[None, :] * self._trend[:, None] + self._season[:, season_index]
+
+        # Additive Holt-Winters forecast variance (Hyndman et al., class 1 models)
+        j = np.arange(1, horizon)
+        c = self.alpha * (1 + j * self.beta) + self.gamma * ((j % m) == 0)
+        multiplier = 1 + np.concatenate([[0.0], np.cumsum(c * c)])
+        sigma2 = np.where(self._n_errors > 0, self._sse / np.maximum(self._n_errors, 1), np.nan)
+        half_width = self._z * np.sqrt(sigma2[:, None] * multiplier[None, :])
+
+        if not self._initialized:
+            point = np.full_like(point, np.nan)
+        return point, half_width, self._trend.copy()
+
+    def _forecast_seasonal_naive(self, horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        m = self.season_length
+        values, _ = self._window_values()
+        n_steps = values.shape[1]
+        steps = np.arange(1, horizon + 1)
+
+        if n_steps < m:
+            last = values[:, -1:] if n_steps else np.full((len(self.keys), 1), np.nan)
+            point = np.repeat(last, horizon, axis=1)
+        else:
+            point = values[:, n_steps - m + (steps - 1) % m]
+
+        if n_steps > m:
+            diffs = values[:, m:] - values[:, :-m]
+            sigma2 = np.nanmean(diffs * diffs, axis=1) if np.isfinite(diffs).any() else np.full(len(self.keys), np.nan)
+            slope = np.nan_to_num(diffs[:, -1] / m)
+        else:
+            sigma2 = np.full(len(self.keys), np.nan)
+            slope = np.zeros(len(self.keys))
+
+        seasons_ahead = np.ceil(steps / m)
+        half_width = self._z * np.sqrt(sigma2[:, None] * seasons_ahead[None, :])
+        return point, half_width, slope
+
+def forecast_series(values: Sequence[float], horizon: int, model: ForecastModel = ForecastModel.LINEAR,
+                    confidence: float = 0.9, **kwargs) -> Dict[str, Any]:
+    """Forecast a single series; convenience wrapper around PortfolioForecaster"""
+    history = np.asarray(values, dtype=np.float64)[None, :]
+    forecaster = PortfolioForecaster(
+        ["series"], model=model, window=max(history.shape[1], 1), confidence=confidence, **kwargs
+    )
+    return forecaster.fit(history).forecast(horizon).for_key("series")
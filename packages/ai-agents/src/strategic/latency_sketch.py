@@ -0,0 +1,165 @@
+"""
+Sliding-Window Latency Statistics
+DDSketch quantiles and windowed success rates per agent type
+
+DDSketch keeps logarithmically spaced bins, so any quantile is reported
+within a fixed relative error and sketches merge by adding bin counts. A
+window is a ring of sub-window sketches; expired sub-windows are reset
+lazily, giving O(1) recording and O(bins) queries.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+class DDSketch:
+    """Mergeable quantile sketch with bounded relative error"""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048, min_value: float = 1e-6):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the lowest bins together so the sketch stays bounded"""
+        keys = sorted(self.bins)
+        overflow = len(keys) - self.max_bins + 1
+        folded = sum(self.bins.pop(k) for k in keys[:overflow])
+        target = keys[overflow]
+        self.bins[target] = self.bins.get(target, 0) + folded
+
+    def merge(self, other: "DDSketch"):
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """Values at each quantile in qs (ascending), NaN when empty"""
+        if self.count == 0:
+            return [math.nan] * len(qs)
+
+        ranks = [q * (self.count - 1) for q in qs]
+        results = []
+        cumulative = self.zero_count
+        keys = iter(sorted(self.bins))
+        index = None
+
+        for rank in ranks:
+            if rank < self.zero_count:
+                results.append(0.0)
+                continue
+            while cumulative <= rank:
+                index = next(keys)
+                cumulative += self.bins[index]
+            results.append(2 * self.gamma ** index / (self.gamma + 1))
+
+        return results
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+@dataclass
+class WindowSnapshot:
+    """Windowed latency and outcome statistics"""
+    count: int
+    successes: int
+    failures: int
+    p50: float
+    p95: float
+    p99: float
+    mean: float
+    success_rate: float
+    error_rate: float
+    throughput: float  # completed tasks per second
+
+class SlidingWindowStats:
+    """Latency quantiles, success/error rates and throughput over a sliding window"""
+
+    def __init__(self, window_seconds: float = 300.0, sub_windows: int = 10, relative_accuracy: float = 0.01):
+        self.window_seconds = window_seconds
+        self.sub_windows = sub_windows
+        self.sub_window_seconds = window_seconds / sub_windows
+        self.relative_accuracy = relative_accuracy
+
+        self._epochs: List[int] = [-1] * sub_windows
+        self._sketches = [DDSketch(relative_accuracy) for _ in range(sub_windows)]
+        self._successes = [0] * sub_windows
+        self._failures = [0] * sub_windows
+        self._first_seen: Optional[float] = None
+
+    def _slot(self, now: float) -> int:
+        epoch = int(now // self.sub_window_seconds)
+        slot = epoch % self.sub_windows
+        if self._epochs[slot] != epoch:
+            self._epochs[slot] = epoch
+            self._sketches[slot] = DDSketch(self.relative_accuracy)
+            self._successes[slot] = 0
+            self._failures[slot] = 0
+        return slot
+
+    def record(self, latency_seconds: float, success: bool, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        if self._first_seen is None:
+            self._first_seen = now
+
+        slot = self._slot(now)
+        self._sketches[slot].add(latency_seconds)
+        if success:
+            self._successes[slot] += 1
+        else:
+            self._failures[slot] += 1
+
+    def snapshot(self, now: Optional[float] = None) -> WindowSnapshot:
+        now = time.time() if now is None else now
+        current_epoch = int(now // self.sub_window_seconds)
+
+        merged = DDSketch(self.relative_accuracy)
+        successes = failures = 0
+        for slot, epoch in enumerate(self._epochs):
+            if current_epoch - self.sub_windows < epoch <= current_epoch:
+                merged.merge(self._sketches[slot])
+                successes += self._successes[slot]
+                failures += self._failures[slot]
+
+        total = successes + failures
+        p50, p95, p99 = merged.quantiles([0.50, 0.95, 0.99])
+        # Rate over the observed span, never shorter than one sub-window
+        elapsed = now - self._first_seen if self._first_seen is not None else 0.0
+        covered = max(min(self.window_seconds, elapsed), self.sub_window_seconds)
+
+        return WindowSnapshot(
+            count=total,
+            successes=successes,
+            failures=failures,
+            p50=p50,
+            p95=p95,
+            p99=p99,
+            mean=merged.sum / merged.count if merged.count else math.nan,
+            # No samples: rates are unknown, not 0% (which reads as total failure)
+            success_rate=successes / total if total else math.nan,
+            error_rate=failures / total if total else math.nan,
+            throughput=total / covered
+        )
@@ -0,0 +1,265 @@
+"""
+Prometheus Metrics Exporter
+Scrapeable counters, gauges and latency histograms for the agent orchestrators
+
+Metrics render in the Prometheus text exposition format (0.0.4) and are
+served by a minimal asyncio HTTP endpoint, so no extra web framework is
+needed. Each metric caps the number of distinct label sets it tracks;
+further label combinations are folded into a single overflow series.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_LABEL = "__other__"
+
+# Latency buckets (seconds) covering cache hits through slow LLM completions
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    """Base class handling label sets and cardinality limits"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), max_series: int = 200):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        if key not in self._series and len(self._series) >= self.max_series:
+            return tuple(OVERFLOW_LABEL for _ in self.labelnames)
+        return key
+
+    def _label_string(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = list(self._series.items())
+        for key, value in items:
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key: Tuple[str, ...], value) -> List[str]:
+        return [f"{self.name}{self._label_string(key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._series.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._series.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+class _HistogramSeries:
+    __slots__ = ('bucket_counts', 'sum', 'count')
+
+    def __init__(self, n_buckets: int):
+        self.bucket_counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+class Histogram(_Metric):
+    """Bucketed distribution with cumulative le buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, max_series: int = 200):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.bucket_counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def _render_series(self, key: Tuple[str, ...], series: _HistogramSeries) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, series.bucket_counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self._label_string(key, ('le', _format_value(bound)))} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_string(key)} {_format_value(series.sum)}")
+        lines.append(f"{self.name}_count{self._label_string(key)} {series.count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.metric_type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames, **kwargs)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames, **kwargs)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, **kwargs)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Register a callback that refreshes derived gauges right before each render"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """Text exposition of every registered metric"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {str(e)}")
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def _handle_scrape(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain headers; scrapes carry no body
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split('?')[0] in ("/metrics", "/"):
+                status, body = "200 OK", self.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics scrape failed: {str(e)}")
+        finally:
+            writer.close()
+
+    async def start_server(self, host: str = "0.0.0.0", port: int = 9108) -> asyncio.AbstractServer:
+        """Serve /metrics on the running event loop"""
+        if self._server is None:
+            self._server = await asyncio.start_server(self._handle_scrape, host, port)
+            logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return self._server
+
+    async def stop_server(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+REGISTRY = MetricsRegistry()
+
+# Metrics shared by both orchestrators
+TASKS_TOTAL = REGISTRY.counter(
+    'portfolio_agent_tasks_total', 'Agent tasks processed', ['agent', 'status'], max_series=100)
+TASKS_IN_PROGRESS = REGISTRY.gauge(
+    'portfolio_agent_tasks_in_progress', 'Agent tasks currently executing', ['agent'], max_series=50)
+QUEUE_DEPTH = REGISTRY.gauge(
+    'portfolio_agent_queue_depth', 'Tasks waiting in the orchestrator queue', ['orchestrator'], max_series=10)
+TASK_DURATION = REGISTRY.histogram(
+    'portfolio_agent_task_duration_seconds', 'End-to-end agent task latency', ['agent'], max_series=50)
+LLM_LATENCY = REGISTRY.histogram(
+    'portfolio_agent_llm_latency_seconds', 'LLM call latency per model', ['model'], max_series=50)
+LATENCY_QUANTILES = REGISTRY.gauge(
+    'portfolio_agent_latency_window_seconds', 'Sliding-window task latency quantiles', ['agent', 'quantile'], max_series=150)
+WINDOW_RATES = REGISTRY.gauge(
+    'portfolio_agent_window_rate', 'Sliding-window success rate, error rate and throughput (tasks/s)',
+    ['agent', 'kind'], max_series=150)
+TOKENS_TOTAL = REGISTRY.counter(
+    'portfolio_agent_tokens_total', 'Tokens consumed', ['agent'], max_series=50)
+COST_TOTAL = REGISTRY.counter(
+    'portfolio_agent_cost_usd_total', 'Estimated model spend in USD', ['agent'], max_series=50)
+CACHE_REQUESTS = REGISTRY.counter(
+    'portfolio_agent_cache_requests_total', 'Cache lookups by result', ['cache', 'result'], max_series=20)
+ERRORS_TOTAL = REGISTRY.counter(
+    'portfolio_agent_errors_total', 'Errors by component', ['component'], max_series=50)
@@ -0,0 +1,294 @@
+"""
+Agent Execution Tracing
+Lightweight OpenTelemetry-style spans for the agent orchestrators
+
+Spans nest through a ContextVar, so hierarchy follows asyncio tasks
+automatically. Sampling is decided once per trace at the root span;
+unsampled traces only pay for a context switch. Finished spans are batched
+on a background thread and exported as OTLP/JSON, either to a local JSONL
+file (collector stand-in) or to an OTLP/HTTP collector endpoint.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_span_id', 'sampled',
+                 'start_time_ns', 'end_time_ns', 'attributes', 'events',
+                 'status_code', 'status_message', '_tracer')
+
+    def __init__(self, tracer: Optional["Tracer"], name: str, trace_id: str, parent_span_id: Optional[str],
+                 sampled: bool, start_time_ns: Optional[int] = None, attributes: Optional[Dict[str, Any]] = None):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.start_time_ns = start_time_ns or time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.attributes = dict(attributes) if (sampled and attributes) else {}
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        if self.sampled:
+            self.events.append({'name': name, 'time_ns': time.time_ns(), 'attributes': attributes or {}})
+
+    def set_status(self, code: int, message: str = ""):
+        self.status_code = code
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException):
+        self.set_status(STATUS_ERROR, str(exc))
+        self.add_event("exception", {
+            'exception.type': type(exc).__name__,
+            'exception.message': str(exc)
+        })
+
+    def end(self, end_time_ns: Optional[int] = None):
+        if self.end_time_ns is not None:
+            return
+        self.end_time_ns = end_time_ns or time.time_ns()
+        if self.sampled and self._tracer is not None:
+            self._tracer.processor.on_end(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_ns or time.time_ns()
+        return (end - self.start_time_ns) / 1e6
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    """Span active in the current context, if any"""
+    return _current_span.get()
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+def to_otlp_json(spans: List[Span], service_name: str, scope_name: str) -> Dict[str, Any]:
+    """Encode spans as an OTLP/JSON ExportTraceServiceRequest"""
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': service_name})},
+            'scopeSpans': [{
+                'scope': {'name': scope_name},
+                'spans': [
+                    {
+                        'traceId': span.trace_id,
+                        'spanId': span.span_id,
+                        'parentSpanId': span.parent_span_id or '',
+                        'name': span.name,
+                        'kind': 1,  # SPAN_KIND_INTERNAL
+                        'startTimeUnixNano': str(span.start_time_ns),
+                        'endTimeUnixNano': str(span.end_time_ns),
+                        'attributes': _otlp_attributes(span.attributes),
+                        'events': [
+                            {
+                                'name': event['name'],
+                                'timeUnixNano': str(event['time_ns']),
+                                'attributes': _otlp_attributes(event['attributes'])
+                            }
+                            for event in span.events
+                        ],
+                        'status': {'code': span.status_code, 'message': span.status_message}
+                    }
+                    for span in spans
+                ]
+            }]
+        }]
+    }
+
+class FileSpanExporter:
+    """Append OTLP/JSON export requests to a local JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, payload: Dict[str, Any]):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(payload, default=str) + "\n")
+
+class OTLPHttpExporter:
+    """POST OTLP/JSON export requests to a collector's /v1/traces endpoint"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None):
+        self.endpoint = endpoint.rstrip('/') + '/v1/traces'
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+
+    def export(self, payload: Dict[str, Any]):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload, default=str).encode(),
+            headers=self.headers,
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+class BatchSpanProcessor:
+    """Queue finished spans and export them in batches off the hot path"""
+
+    def __init__(self, exporter, service_name: str, scope_name: str = "portfolio.agents",
+                 max_queue_size: int = 4096, max_batch_size: int = 512, flush_interval: float = 2.0):
+        self.exporter = exporter
+        self.service_name = service_name
+        self.scope_name = scope_name
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.dropped_spans = 0
+
+        self._queue: deque = deque()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._worker.start()
+        atexit.register(self.shutdown)
+
+    def on_end(self, span: Span):
+        if len(self._queue) >= self.max_queue_size:
+            self.dropped_spans += 1
+            return
+        self._queue.append(span)
+        if len(self._queue) >= self.max_batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.max_batch_size:
+                batch.append(self._queue.popleft())
+            try:
+                self.exporter.export(to_otlp_json(batch, self.service_name, self.scope_name))
+            except Exception as e:
+                logger.error(f"Failed to export {len(batch)} spans: {str(e)}")
+
+    def shutdown(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        self._worker.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+class Tracer:
+    """Creates spans and applies head-based trace sampling"""
+
+    def __init__(self, service_name: str, processor: Optional[BatchSpanProcessor] = None, sample_rate: float = 1.0):
+        self.service_name = service_name
+        self.processor = processor
+        self.sample_rate = sample_rate if processor is not None else 0.0
+
+    def _new_span(self, name: str, attributes: Optional[Dict[str, Any]], start_time_ns: Optional[int]) -> Span:
+        parent = _current_span.get()
+        if parent is None:
+            trace_id = f"{random.getrandbits(128):032x}"
+            sampled = random.random() < self.sample_rate
+            parent_span_id = None
+        else:
+            trace_id = parent.trace_id
+            sampled = parent.sampled
+            parent_span_id = parent.span_id
+
+        return Span(self, name, trace_id, parent_span_id, sampled, start_time_ns, attributes)
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   start_time_ns: Optional[int] = None) -> Iterator[Span]:
+        """Start a child of the current span (or a new root) for the duration of the block"""
+        span = self._new_span(name, attributes, start_time_ns)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def record_span(self, name: str, start_time_ns: int, end_time_ns: Optional[int] = None,
+                    attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Record an already-elapsed interval (e.g. queue wait) under the current span"""
+        span = self._new_span(name, attributes, start_time_ns)
+        span.end(end_time_ns)
+        return span
+
+_tracer = Tracer("portfolio-ai-agents")
+
+def configure_tracing(service_name: str, export_path: Optional[str] = None, otlp_endpoint: Optional[str] = None,
+                      sample_rate: float = 0.1, **processor_options) -> Tracer:
+    """Install the process-wide tracer; without an export target tracing stays disabled"""
+    global _tracer
+
+    if otlp_endpoint:
+        exporter = OTLPHttpExporter(otlp_endpoint)
+    elif export_path:
+        exporter = FileSpanExporter(export_path)
+    else:
+        _tracer = Tracer(service_name)
+        return _tracer
+
+    if _tracer.processor is not None:
+        _tracer.processor.shutdown()
+
+    processor = BatchSpanProcessor(exporter, service_name, **processor_options)
+    _tracer = Tracer(service_name, processor, sample_rate)
+    logger.info(f"Tracing enabled for {service_name} (sample rate {sample_rate:.0%})")
+    return _tracer
+
+def configure_tracing_from_env(service_name: str) -> Tracer:
+    """Configure tracing from TRACE_EXPORT_PATH / OTEL_EXPORTER_OTLP_ENDPOINT / TRACE_SAMPLE_RATE"""
+    return configure_tracing(
+        service_name,
+        export_path=os.getenv("TRACE_EXPORT_PATH"),
+        otlp_endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"),
+        sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    )
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer (a no-op tracer until tracing is configured)"""
+    return _tracer
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The strategic modules are scripts importing each other as siblings
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "strategic"))
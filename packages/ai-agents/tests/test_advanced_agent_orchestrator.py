@@ -0,0 +1,125 @@
+import asyncio
+import math
+from datetime import datetime
+
+import pytest
+
+# The orchestrator imports its API clients at module level
+for module in ("aiohttp", "openai", "anthropic", "supabase", "redis", "sklearn", "pandas"):
+    pytest.importorskip(module)
+
+import advanced_agent_orchestrator
+from advanced_agent_orchestrator import (
+    AdvancedAgentOrchestrator, AgentType, ContentTask, Domain, MODEL_COST_PER_1K_TOKENS
+)
+from metrics_exporter import REGISTRY, COST_TOTAL, LATENCY_QUANTILES, TASKS_IN_PROGRESS, TOKENS_TOTAL, WINDOW_RATES
+
+
+def make_orchestrator():
+    # Skip __init__: it connects to OpenAI, Anthropic, Supabase and Redis
+    orchestrator = object.__new__(AdvancedAgentOrchestrator)
+    orchestrator.config = {}
+    orchestrator.agents = {}
+    orchestrator.agent_metrics = {}
+    orchestrator.agent_window_stats = {}
+    orchestrator._initialize_agents()
+    return orchestrator
+
+
+def make_task(content_type="blog_post"):
+    return ContentTask(
+        task_id="task-1",
+        domain=Domain.FIXIE_RUN,
+        agent_type=AgentType.CONTENT_GENERATOR,
+        prompt="Write about fixed gear bikes",
+        keywords=["fixie"],
+        target_length=500,
+        content_type=content_type,
+        deadline=datetime.now(),
+        priority=1,
+        dependencies=[],
+        output_format="markdown",
+    )
+
+
+def test_agent_selection_failure_propagates_instead_of_unbound_local():
+    orchestrator = make_orchestrator()
+
+    async def fail(content_type):
+        raise RuntimeError("no agent")
+
+    orchestrator._select_content_agent = fail
+    with pytest.raises(RuntimeError, match="no agent"):
+        asyncio.run(orchestrator.generate_content(make_task()))
+
+
+def test_failed_generation_releases_in_progress_gauge():
+    orchestrator = make_orchestrator()
+    agent = AgentType.CONTENT_GENERATOR.value
+    before = TASKS_IN_PROGRESS.value(agent=agent)
+
+    async def fail(*args):
+        raise RuntimeError("llm down")
+
+    orchestrator._enhance_prompt = fail
+    with pytest.raises(RuntimeError, match="llm down"):
+        asyncio.run(orchestrator.generate_content(make_task()))
+
+    assert TASKS_IN_PROGRESS.value(agent=agent) == before
+    assert orchestrator.agent_metrics[agent].tasks_failed == 1
+
+
+def test_record_usage_counts_tokens_and_model_cost():
+    orchestrator = make_orchestrator()
+    agent = AgentType.SEO_OPTIMIZER.value
+    tokens_before = TOKENS_TOTAL.value(agent=agent)
+    cost_before = COST_TOTAL.value(agent=agent)
+
+    orchestrator._record_usage(agent, "claude-3-sonnet", 2000)
+
+    expected = 2 * MODEL_COST_PER_1K_TOKENS["claude-3-sonnet"]
+    assert TOKENS_TOTAL.value(agent=agent) - tokens_before == 2000
+    assert COST_TOTAL.value(agent=agent) - cost_before == pytest.approx(expected)
+    assert orchestrator.agent_metrics[agent].cost_per_request == pytest.approx(expected)
+
+
+def test_scrape_refreshes_window_gauges_for_idle_agents(monkeypatch):
+    orchestrator = make_orchestrator()
+    agent = AgentType.CONTENT_GENERATOR.value
+    window = orchestrator.agent_window_stats[agent]
+    window.record(2.0, success=True, now=1000.0)
+
+    monkeypatch.setattr(advanced_agent_orchestrator.time, "time", lambda: 1001.0)
+    orchestrator._refresh_window_metrics()
+    assert LATENCY_QUANTILES.value(agent=agent, quantile="0.99") == pytest.approx(2.0, rel=0.011)
+    assert WINDOW_RATES.value(agent=agent, kind="success") == 1.0
+
+    # No completions since: the next scrape drops the expired sample
+    monkeypatch.setattr(advanced_agent_orchestrator.time, "time", lambda: 1000.0 + 10 * window.window_seconds)
+    orchestrator._refresh_window_metrics()
+    assert math.isnan(LATENCY_QUANTILES.value(agent=agent, quantile="0.99"))
+    assert WINDOW_RATES.value(agent=agent, kind="throughput") == 0.0
+    assert math.isnan(WINDOW_RATES.value(agent=agent, kind="success"))
+    assert math.isnan(WINDOW_RATES.value(agent=agent, kind="error"))
+    assert 'portfolio_agent_window_rate{agent="content_generator",kind="error"} NaN' in REGISTRY.render()
+
+
+def test_content_synergies_skip_domains_outside_the_portfolio():
+    orchestrator = make_orchestrator()
+    orchestrator._index_lock = asyncio.Lock()
+
+    class Index:
+        def domain_synergies(self):
+            return [
+                {"source_domain": "fixie.run", "target_domain": "example.org", "similarity": 0.5, "linked_documents": 3},
+                {"source_domain": "fixie.run", "target_domain": "puffs-store.com", "similarity": 0.3, "linked_documents": 2},
+            ]
+
+    orchestrator.content_index = Index()
+    synergies = asyncio.run(orchestrator._identify_content_synergies())
+    assert [(s["source_domain"], s["target_domain"]) for s in synergies] == [(Domain.FIXIE_RUN, Domain.PUFFS_STORE)]
+
+
+def test_user_journeys_reference_portfolio_domains():
+    journeys = asyncio.run(make_orchestrator()._map_user_journeys())
+    assert journeys[1]["end_domain"] is Domain.ANTONYLAMBI_BE
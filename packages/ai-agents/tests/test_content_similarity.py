@@ -0,0 +1,130 @@
+import pytest
+
+import content_similarity
+from content_similarity import ContentSimilarityIndex
+
+MUSHROOMS = "adaptogenic mushrooms lions mane reishi cordyceps focus memory"
+FIXIE = "fixie bike track cycling fixed gear urban riding"
+
+
+def build_index(index_dir=None):
+    index = ContentSimilarityIndex(index_dir, min_df=1, max_df_ratio=1.0)
+    index.add_document("a1", MUSHROOMS + " brain health", "adaptogenic-mushrooms.com")
+    index.add_document("b1", MUSHROOMS + " brain supplements", "brainhealthmushrooms.com")
+    index.add_document("h1", MUSHROOMS + " immune support", "healthfulmushrooms.com")
+    index.add_document("f1", FIXIE + " city commute", "fixie.run")
+    return index
+
+
+def test_query_ranks_same_topic_first():
+    index = build_index()
+    results = index.query("reishi lions mane mushrooms", k=3)
+    assert {doc_id for doc_id, _ in results} == {"a1", "b1", "h1"}
+
+
+def test_related_domains_excludes_self_with_non_positive_threshold():
+    # Same-domain pairs used to be masked with 0.0, which survived a <= 0 threshold
+    index = build_index()
+    index.add_document("f2", FIXIE + " night ride", "fixie.run")
+    for threshold in (0.0, -1.0):
+        related = index.related_domains("fixie.run", min_similarity=threshold)
+        assert "fixie.run" not in related
+
+
+def test_domain_synergies_never_pair_a_domain_with_itself():
+    index = build_index()
+    index.add_document("f2", FIXIE + " night ride", "fixie.run")
+    for synergy in index.domain_synergies(min_similarity=0.0):
+        assert synergy["source_domain"] != synergy["target_domain"]
+
+
+def test_domain_similarity_is_cached_until_corpus_changes():
+    index = build_index()
+    first = index.domain_similarity()
+    assert index.domain_similarity() is first
+
+    version = index.version
+    index.add_document("m1", MUSHROOMS + " recipes", "brainhealthmushrooms.com")
+    assert index.version > version
+    assert index.domain_similarity() is not first
+
+
+def test_domain_similarity_is_reused_until_corpus_grows_past_ratio():
+    index = build_index()
+    index.domain_refresh_ratio = 0.5
+    first = index.domain_similarity()
+
+    # One add on four documents stays within the 50% staleness bound
+    index.add_document("m1", MUSHROOMS + " recipes", "brainhealthmushrooms.com")
+    assert index.domain_similarity() is first
+
+    index.add_document("m2", MUSHROOMS + " tea", "aiftw.be")
+    index.add_document("m3", MUSHROOMS + " coffee", "aiftw.be")
+    refreshed = index.domain_similarity()
+    assert refreshed is not first
+    assert "aiftw.be" in refreshed[0]
+
+
+def test_domain_similarity_refreshes_after_interval(monkeypatch):
+    index = build_index()
+    index.domain_refresh_ratio = 1.0
+    first = index.domain_similarity()
+    index.add_document("m1", MUSHROOMS + " recipes", "aiftw.be")
+
+    clock = content_similarity.time.monotonic() + index.domain_refresh_seconds + 1
+    monkeypatch.setattr(content_similarity.time, "monotonic", lambda: clock)
+    assert index.domain_similarity() is not first
+
+
+def test_duplicate_document_is_not_reindexed():
+    index = build_index()
+    version = index.version
+    assert index.add_document("a1", "anything else", "aiftw.be") == 0
+    assert len(index) == 4
+    assert index.version == version
+
+
+def test_save_and_reload_round_trip(tmp_path):
+    index = build_index(tmp_path)
+    index.save()
+    expected = index.query("fixed gear cycling", k=1)
+    assert expected[0][0] == "f1"
+
+    reloaded = ContentSimilarityIndex(tmp_path, min_df=1, max_df_ratio=1.0)
+    assert reloaded.doc_ids == index.doc_ids
+    assert reloaded.doc_domains == index.doc_domains
+    result = reloaded.query("fixed gear cycling", k=1)
+    assert result[0][0] == expected[0][0]
+    assert result[0][1] == pytest.approx(expected[0][1])
+
+
+def test_save_replaces_the_whole_directory_atomically(tmp_path):
+    index_dir = tmp_path / "index"
+    index = build_index(index_dir)
+    index.save()
+
+    # A reloaded (memory-mapped) index can save over the files it maps
+    reloaded = ContentSimilarityIndex(index_dir, min_df=1, max_df_ratio=1.0)
+    reloaded.add_document("f2", FIXIE + " night ride", "fixie.run")
+    reloaded.save()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index"]
+    assert ContentSimilarityIndex(index_dir).doc_ids == index.doc_ids + ["f2"]
+
+
+def test_failed_save_leaves_previous_index_intact(tmp_path, monkeypatch):
+    index_dir = tmp_path / "index"
+    index = build_index(index_dir)
+    index.save()
+    index.add_document("f2", FIXIE + " night ride", "fixie.run")
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(content_similarity.json, "dump", crash)
+    with pytest.raises(OSError):
+        index.save()
+    monkeypatch.undo()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index"]
+    assert ContentSimilarityIndex(index_dir).doc_ids == ["a1", "b1", "h1", "f1"]
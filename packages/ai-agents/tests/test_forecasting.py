@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from forecasting import ForecastModel, PortfolioForecaster, forecast_series
+
+
+def linear_history(n_steps=40):
+    t = np.arange(n_steps, dtype=np.float64)
+    return np.vstack([3.0 + 2.0 * t, 50.0 - 0.5 * t])
+
+
+def test_linear_model_extrapolates_exact_trend():
+    forecaster = PortfolioForecaster(['a', 'b'], window=60).fit(linear_history())
+    result = forecaster.forecast(5)
+
+    np.testing.assert_allclose(result.point[:, -1], [3.0 + 2.0 * 44, 50.0 - 0.5 * 44])
+    np.testing.assert_allclose(result.slope, [2.0, -0.5])
+    assert result.trend_directions() == ['up', 'down']
+
+
+def test_incremental_updates_match_a_full_refit():
+    history = linear_history(100) + np.random.default_rng(3).normal(0, 1.0, (2, 100))
+    incremental = PortfolioForecaster(['a', 'b'], window=30)
+    for column in history.T:
+        incremental.update(column)
+    refit = PortfolioForecaster(['a', 'b'], window=30).fit(history)
+
+    np.testing.assert_allclose(incremental.forecast(7).point, refit.forecast(7).point, rtol=1e-9)
+    np.testing.assert_allclose(incremental.forecast(7).upper, refit.forecast(7).upper, rtol=1e-9)
+
+
+def test_missing_observations_are_skipped():
+    history = linear_history()
+    history[0, ::3] = np.nan
+    result = PortfolioForecaster(['a', 'b'], window=60).fit(history).forecast(1)
+    assert result.point[0, 0] == pytest.approx(3.0 + 2.0 * 40)
+
+
+def test_interval_widens_with_horizon():
+    history = linear_history() + np.random.default_rng(0).normal(0, 2.0, (2, 40))
+    result = PortfolioForecaster(['a', 'b'], window=60).fit(history).forecast(20)
+    width = result.upper - result.lower
+    assert (np.diff(width, axis=1) > 0).all()
+
+
+def test_seasonal_naive_repeats_last_season():
+    season = np.array([1.0, 5.0, 2.0, 8.0, 3.0, 9.0, 4.0])
+    history = np.tile(season, 4)[None, :]
+    result = PortfolioForecaster(['s'], model=ForecastModel.SEASONAL_NAIVE, window=28).fit(history).forecast(7)
+    np.testing.assert_allclose(result.point[0], season)
+
+
+def test_holt_winters_tracks_seasonal_pattern():
+    t = np.arange(8 * 7)
+    history = (100 + t + 10 * np.sin(2 * np.pi * t / 7))[None, :]
+    result = PortfolioForecaster(['s'], model=ForecastModel.HOLT_WINTERS, window=56).fit(history).forecast(7)
+    expected = 100 + np.arange(56, 63) + 10 * np.sin(2 * np.pi * np.arange(56, 63) / 7)
+    np.testing.assert_allclose(result.point[0], expected, rtol=0.05)
+
+
+def test_forecast_series_wrapper():
+    summary = forecast_series([1.0, 2.0, 3.0, 4.0], horizon=2)
+    assert summary['prediction'] == pytest.approx(6.0)
+    assert summary['trend'] == 'up'
+
+
+def test_horizon_must_be_positive():
+    with pytest.raises(ValueError):
+        PortfolioForecaster(['a']).forecast(0)
@@ -0,0 +1,69 @@
+import math
+import random
+
+import pytest
+
+from latency_sketch import DDSketch, SlidingWindowStats
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-1.0, 1.2) for _ in range(20000)]
+    sketch = DDSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q, estimate in zip((0.5, 0.95, 0.99), sketch.quantiles([0.5, 0.95, 0.99])):
+        assert estimate == pytest.approx(exact_quantile(values, q), rel=0.011)
+
+
+def test_empty_sketch_reports_nan():
+    assert all(math.isnan(v) for v in DDSketch().quantiles([0.5, 0.99]))
+
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(1)
+    values = [rng.uniform(0.01, 5.0) for _ in range(5000)]
+    whole, left, right = DDSketch(), DDSketch(), DDSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    assert left.count == whole.count
+    assert left.quantiles([0.1, 0.5, 0.9]) == whole.quantiles([0.1, 0.5, 0.9])
+
+
+def test_collapse_keeps_bins_bounded_and_upper_quantiles_accurate():
+    sketch = DDSketch(relative_accuracy=0.01, max_bins=64)
+    values = [10 ** (i / 1000) for i in range(-3000, 3000)]
+    for value in values:
+        sketch.add(value)
+
+    assert len(sketch.bins) <= 64
+    assert sketch.quantile(0.99) == pytest.approx(exact_quantile(values, 0.99), rel=0.011)
+
+
+def test_window_rates_and_expiry():
+    window = SlidingWindowStats(window_seconds=60, sub_windows=6)
+    for i in range(30):
+        window.record(0.2, success=i % 3 != 0, now=1000 + i)
+
+    snapshot = window.snapshot(now=1030)
+    assert snapshot.count == 30
+    assert snapshot.failures == 10
+    assert snapshot.error_rate == pytest.approx(1 / 3)
+    assert snapshot.p50 == pytest.approx(0.2, rel=0.011)
+    assert snapshot.throughput == pytest.approx(1.0)
+
+    # Once every sub-window has rotated out nothing is left
+    idle = window.snapshot(now=1200)
+    assert idle.count == 0
+    assert math.isnan(idle.success_rate) and math.isnan(idle.error_rate)
+    assert idle.throughput == 0.0
+    assert math.isnan(idle.p99)
@@ -0,0 +1,53 @@
+from metrics_exporter import MetricsRegistry, OVERFLOW_LABEL
+
+
+def test_render_exposition_format():
+    registry = MetricsRegistry()
+    tasks = registry.counter("tasks_total", "Tasks", ["agent"])
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    tasks.inc(agent="seo")
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert "# TYPE tasks_total counter" in text
+    assert 'tasks_total{agent="seo"} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "latency_seconds_count 1" in text
+
+
+def test_label_sets_beyond_limit_fold_into_overflow():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Errors", ["component"], max_series=2)
+    for component in ("redis", "supabase", "openai", "anthropic"):
+        errors.inc(component=component)
+
+    assert errors.value(component=OVERFLOW_LABEL) == 2
+
+
+def test_collectors_refresh_gauges_on_every_render():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("window_seconds", "Windowed value", ["agent"])
+    ticks = iter([1.5, 0.25])
+
+    def collect():
+        gauge.set(next(ticks), agent="seo")
+
+    registry.add_collector(collect)
+    registry.add_collector(collect)
+    assert 'window_seconds{agent="seo"} 1.5' in registry.render()
+    assert 'window_seconds{agent="seo"} 0.25' in registry.render()
+
+    registry.remove_collector(collect)
+    assert 'window_seconds{agent="seo"} 0.25' in registry.render()
+
+
+def test_failing_collector_does_not_break_scrape():
+    registry = MetricsRegistry()
+    registry.counter("up_total", "Up").inc()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.add_collector(broken)
+    assert "up_total 1" in registry.render()
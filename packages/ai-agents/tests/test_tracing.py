@@ -0,0 +1,171 @@
+import asyncio
+import json
+
+import pytest
+
+import tracing
+from tracing import STATUS_ERROR, BatchSpanProcessor, Tracer, current_span
+
+
+class ListExporter:
+    def __init__(self, fail=False):
+        self.payloads = []
+        self.fail = fail
+
+    def export(self, payload):
+        if self.fail:
+            raise ConnectionError("collector down")
+        self.payloads.append(payload)
+
+    @property
+    def spans(self):
+        return [span for payload in self.payloads
+                for scope in payload['resourceSpans'][0]['scopeSpans'] for span in scope['spans']]
+
+
+@pytest.fixture
+def exporter():
+    return ListExporter()
+
+
+@pytest.fixture
+def make_tracer(exporter):
+    processors = []
+
+    def make(sample_rate=1.0, **options):
+        # Long interval: only explicit flushes export during a test
+        processor = BatchSpanProcessor(exporter, "test-service", flush_interval=60, **options)
+        processors.append(processor)
+        return Tracer("test-service", processor, sample_rate)
+
+    yield make
+    for processor in processors:
+        processor.shutdown()
+
+
+def test_children_nest_under_the_current_span(make_tracer, exporter):
+    tracer = make_tracer()
+    with tracer.start_span("root") as root:
+        with tracer.start_span("child") as child:
+            assert current_span() is child
+        assert current_span() is root
+        elapsed = tracer.record_span("queue_wait", root.start_time_ns)
+    assert current_span() is None
+    tracer.processor.flush()
+
+    spans = {span['name']: span for span in exporter.spans}
+    assert spans['child']['parentSpanId'] == spans['queue_wait']['parentSpanId'] == root.span_id
+    assert spans['root']['parentSpanId'] == ''
+    assert {span['traceId'] for span in spans.values()} == {root.trace_id}
+    assert elapsed.end_time_ns is not None
+
+
+def test_concurrent_tasks_keep_their_own_parent(make_tracer):
+    tracer = make_tracer()
+
+    async def work(name):
+        with tracer.start_span(name) as span:
+            await asyncio.sleep(0)
+            with tracer.start_span(f"{name}.step") as step:
+                await asyncio.sleep(0)
+                return span, step
+
+    async def main():
+        with tracer.start_span("root") as root:
+            results = await asyncio.gather(work("a"), work("b"))
+        return root, results
+
+    root, results = asyncio.run(main())
+    for span, step in results:
+        assert span.parent_span_id == root.span_id
+        assert step.parent_span_id == span.span_id
+
+
+def test_sampling_is_decided_once_per_trace(make_tracer, exporter, monkeypatch):
+    tracer = make_tracer(sample_rate=0.5)
+    monkeypatch.setattr(tracing.random, "random", lambda: 0.9)
+    with tracer.start_span("dropped") as dropped:
+        dropped.set_attribute("key", "value")
+        monkeypatch.setattr(tracing.random, "random", lambda: 0.1)
+        # Children follow the root's decision whatever the next draw is
+        with tracer.start_span("dropped.child") as child:
+            assert not child.sampled
+    assert dropped.attributes == {}
+
+    with tracer.start_span("kept"):
+        pass
+    tracer.processor.flush()
+    assert [span['name'] for span in exporter.spans] == ["kept"]
+
+
+def test_tracer_without_processor_records_nothing():
+    tracer = Tracer("noop")
+    with tracer.start_span("root") as span:
+        assert not span.sampled
+    assert tracer.sample_rate == 0.0
+
+
+def test_exception_marks_span_as_error_and_propagates(make_tracer, exporter):
+    tracer = make_tracer()
+    with pytest.raises(ValueError):
+        with tracer.start_span("failing"):
+            raise ValueError("boom")
+    tracer.processor.flush()
+
+    span, = exporter.spans
+    assert span['status'] == {'code': STATUS_ERROR, 'message': "boom"}
+    assert span['events'][0]['name'] == "exception"
+
+
+def test_flush_exports_in_batches(make_tracer, exporter):
+    tracer = make_tracer(max_batch_size=2)
+    for i in range(5):
+        with tracer.start_span(f"span-{i}", {"index": i}):
+            pass
+    tracer.processor.flush()
+
+    assert [len(payload['resourceSpans'][0]['scopeSpans'][0]['spans']) for payload in exporter.payloads] == [2, 2, 1]
+    assert exporter.spans[4]['attributes'] == [{'key': 'index', 'value': {'intValue': '4'}}]
+
+
+def test_full_queue_drops_spans(make_tracer, exporter):
+    tracer = make_tracer(max_queue_size=3, max_batch_size=100)
+    for i in range(5):
+        with tracer.start_span(f"span-{i}"):
+            pass
+    assert tracer.processor.dropped_spans == 2
+    tracer.processor.flush()
+    assert len(exporter.spans) == 3
+
+
+def test_shutdown_flushes_pending_spans(make_tracer, exporter):
+    tracer = make_tracer()
+    with tracer.start_span("last"):
+        pass
+    tracer.processor.shutdown()
+    assert [span['name'] for span in exporter.spans] == ["last"]
+    assert not tracer.processor._worker.is_alive()
+
+
+def test_export_failure_is_logged_not_raised(caplog):
+    processor = BatchSpanProcessor(ListExporter(fail=True), "test-service", flush_interval=60)
+    with Tracer("test-service", processor).start_span("lost"):
+        pass
+    processor.shutdown()
+    assert "Failed to export 1 spans" in caplog.text
+
+
+def test_configure_tracing_writes_otlp_jsonl(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", tracing._tracer)
+    path = tmp_path / "spans.jsonl"
+    tracer = tracing.configure_tracing("svc", export_path=str(path), sample_rate=1.0, flush_interval=60)
+    assert tracing.get_tracer() is tracer
+    with tracer.start_span("root"):
+        pass
+    tracer.processor.shutdown()
+
+    payload = json.loads(path.read_text())
+    resource = payload['resourceSpans'][0]['resource']['attributes']
+    assert resource == [{'key': 'service.name', 'value': {'stringValue': 'svc'}}]
+
+    assert tracing.configure_tracing("svc").processor is None
@@ -0,0 +1,205 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import PIL
+from PIL import Image, ImageDraw
+
+import rhymechain_generator as generator
+
+# ==========================================
+# 1. ASSETS SYNTHÉTIQUES
+# ==========================================
+
+def synthesize_assets(assets_path, source_size, seed=0):
+    """
+    Génère un PNG par fichier de LAYERS (fond opaque, layers du dessus
+    transparents), plus grands que l'image finale pour inclure le resize
+    """
+    rng = random.Random(seed)
+    for layer, options in generator.LAYERS.items():
+        os.makedirs(f"{assets_path}/{generator.LAYER_DIRS[layer]}", exist_ok=True)
+        for item in options:
+            if not item["file"]:
+                continue
+            opaque = layer == "Background"
+            img = Image.new("RGBA", source_size, tuple(rng.randrange(256) for _ in range(3)) + (255 if opaque else 0,))
+            draw = ImageDraw.Draw(img)
+            for _ in range(40):
+                x, y = rng.randrange(source_size[0]), rng.randrange(source_size[1])
+                radius = rng.randrange(20, source_size[0] // 6)
+                draw.ellipse([x, y, x + radius, y + radius], fill=tuple(rng.randrange(256) for _ in range(4)))
+            img.save(f"{assets_path}/{generator.LAYER_DIRS[layer]}/{item['file']}")
+
+# ==========================================
+# 2. COÛT PAR ÉTAPE
+# ==========================================
+
+def time_stage(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"mean_ms": round(sum(samples) / len(samples), 3), "min_ms": round(min(samples), 3), "repeat": repeat}
+
+def bench_stages(repeat):
+    size = tuple(generator.CONFIG["image_size"])
+    artist_file = generator.LAYERS["Artist"][0]["file"]
+    artist_path = f"{generator.CONFIG['assets_path']}/{generator.LAYER_DIRS['Artist']}/{artist_file}"
+    decoded = Image.open(artist_path).convert("RGBA")
+    artist = decoded.resize(size)
+
+    assets = generator.AssetCache().preload()
+    gen = generator.NFTGenerator(assets)
+    traits = generator.dna_traits((0, 0, 1, 0))
+    canvas = gen.compose("street_art", traits)
+
+    def cold_compose():
+        gen.stacks = generator.LayerStackCache(max_bytes=0)
+        gen.compose("street_art", traits)
+
+    warm = generator.NFTGenerator(assets)
+    warm.compose("street_art", traits)
+
+    def warm_compose():
+        # Seul le layer du dessus diffère du préfixe en cache
+        warm.compose("street_art", generator.dna_traits((0, 0, 1, 1)))
+
+    token_ids = iter(range(1, 10**9))
+
+    def build_token():
+        # build_nft : composition, encodage et écriture via le pool
+        # d'écriture, metadata ; cache de canvas vidé comme pour un DNA neuf
+        gen.stacks = generator.LayerStackCache(max_bytes=0)
+        gen.build_nft(next(token_ids), "street_art", dna=(0, 0, 1, 0))
+
+    def build_group():
+        # 8 tokens au même DNA : une composition, un encodage (avec dedupe_images)
+        gen.stacks = generator.LayerStackCache(max_bytes=0)
+        gen.build_group("street_art", (0, 0, 1, 0), [next(token_ids) for _ in range(8)]).result()
+
+    stages = {
+        "decode": time_stage(lambda: Image.open(artist_path).convert("RGBA"), repeat),
+        "resize": time_stage(lambda: decoded.resize(size), repeat),
+        "filter_street_art": time_stage(lambda: generator.apply_street_art_filter(artist), repeat),
+        "filter_minimalist": time_stage(lambda: generator.apply_minimalist_filter(artist), repeat),
+        "filter_duotone_numpy": time_stage(lambda: generator.duotone_filter()(artist), repeat),
+        "composite_cold": time_stage(cold_compose, repeat),
+        "composite_cached_prefix": time_stage(warm_compose, repeat),
+        "metadata_write": time_stage(lambda: gen.write_metadata(0, "street_art", traits, "0.png"), repeat),
+        "build_nft": time_stage(build_token, repeat),
+        "build_group_8_tokens": time_stage(build_group, repeat),
+    }
+
+    encoders = [("png", {"compress_level": 6}), ("png", {"compress_level": 1}), ("webp", {}), ("avif", {})]
+    for name, options in encoders:
+        pil_format, _, defaults = generator.ENCODERS[name]
+        options = {**defaults, **options}
+        buffer = io.BytesIO()
+        try:
+            canvas.save(buffer, pil_format, **options)
+        except (KeyError, OSError) as e:
+            print(f"⚠️ Encoder {name} unavailable: {e}", file=sys.stderr)
+            continue
+
+        def encode():
+            canvas.save(io.BytesIO(), pil_format, **options)
+
+        label = f"encode_{name}" + (f"_level{options['compress_level']}" if name == "png" else "")
+        stages[label] = {**time_stage(encode, repeat), "bytes": buffer.tell()}
+
+    return stages
+
+# ==========================================
+# 3. DÉBIT DE BUILD
+# ==========================================
+
+def bench_builds(sizes, worker_counts, output_root):
+    runs = []
+    for supply in sizes:
+        tokens = [(i, generator.CONFIG["styles"][i % len(generator.CONFIG["styles"])]) for i in range(1, supply + 1)]
+        for workers in worker_counts:
+            generator.CONFIG["output_dir"] = f"{output_root}/build_{supply}_{workers}"
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                records = generator.build_collection(tokens, workers=workers, resume=False)
+            elapsed = time.perf_counter() - started
+            built = sum(1 for record in records.values() if record["status"] == "done")
+            runs.append({
+                "supply": supply,
+                "workers": workers,
+                "unique_images": len({tuple(record["dna"]) + (record["style"],) for record in records.values()}),
+                "seconds": round(elapsed, 3),
+                "tokens_per_sec": round(built / elapsed, 2),
+                "failed": supply - built,
+            })
+            print(f"📦 {supply} tokens / {workers} workers: {runs[-1]['tokens_per_sec']} tokens/s", file=sys.stderr)
+    return runs
+
+def peak_rss_mb():
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2**20, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline de rendu RhymeChain (sortie JSON)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200], help="Tailles de collection")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Nombres de workers")
+    parser.add_argument("--repeat", type=int, default=10, help="Répétitions par étape")
+    parser.add_argument("--image-size", type=int, default=generator.CONFIG["image_size"][0])
+    parser.add_argument("--no-dedupe", action="store_true", help="Rendre chaque token, même à DNA identique")
+    parser.add_argument("--output", help="Fichier JSON de résultats (défaut : stdout)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="rhymechain_bench_")
+    try:
+        generator.CONFIG.update(
+            assets_path=f"{work_dir}/assets",
+            output_dir=f"{work_dir}/build",
+            image_size=(args.image_size, args.image_size),
+            # Doublons autorisés : toute taille de collection est possible, même
+            # au-delà des combinaisons uniques, et les builds mesurent alors la
+            # déduplication des images (voir unique_images dans les résultats)
+            unique_dna=False,
+            dedupe_images=None if args.no_dedupe else generator.CONFIG["dedupe_images"],
+        )
+        synthesize_assets(generator.CONFIG["assets_path"], (args.image_size * 4 // 3,) * 2)
+        os.makedirs(generator.CONFIG["output_dir"], exist_ok=True)
+
+        results = {
+            "environment": {
+                "python": platform.python_version(),
+                "pillow": PIL.__version__,
+                "cpu_count": os.cpu_count(),
+                "platform": platform.platform(),
+            },
+            "config": {key: generator.CONFIG[key] for key in ("image_size", "encoder", "unique_dna", "dedupe_images", "writer_threads", "chunk_size")},
+            "stages": bench_stages(args.repeat),
+            "builds": bench_builds(args.sizes, args.workers, work_dir),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = json.dumps(results, indent=2, default=list)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
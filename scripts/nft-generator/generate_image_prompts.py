@@ -1,49 +1,44 @@
+"""
+Prompts de génération d'images à partir des métadonnées des tokens.
+
+Format de sortie (remplace l'ancien generation_prompts.json) :
+- prompts.jsonl : {"prompt_id", "prompt", "traits"}, un prompt unique par ligne
+- generation_prompts.jsonl : {"token_id", "name", "prompt_id", "attributes"},
+  une ligne par token dans l'ordre des fichiers de métadonnées
+load_generation_prompts() relit les deux fichiers sous la forme de l'ancien
+generation_prompts.json ({"token_id", "name", "prompt", "attributes"}).
+"""
+
 import json
 import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from string import Formatter
 
 # Charger les métadonnées existantes
 metadata_dir = "/Users/devtehen/Desktop/Dev/portfolio-monorep0/scripts/nft-generator/test_metadata"
 output_dir = "/Users/devtehen/Desktop/Dev/portfolio-monorep0/scripts/nft-generator/generated_images"
 
-# Créer le dossier de sortie
-os.makedirs(output_dir, exist_ok=True)
-
-print("🎨 RhymeChain NFT Image Generator")
-print("=" * 60)
-print(f"\nReading metadata from: {metadata_dir}")
-print(f"Output directory: {output_dir}\n")
-
-# Lire toutes les métadonnées
-metadata_files = sorted([f for f in os.listdir(metadata_dir) if f.endswith('.json')])
-
-print(f"Found {len(metadata_files)} metadata files\n")
+READ_THREADS = 8 # Lectures de fichiers en parallèle
+READ_AHEAD = 256 # Fichiers lus en avance au maximum (mémoire bornée)
+PROGRESS_EVERY = 10000 # Une ligne de progression tous les N tokens
 
-# Pour chaque métadonnée, générer un prompt pour l'image
-generated_prompts = []
-
-for metadata_file in metadata_files:
-    with open(os.path.join(metadata_dir, metadata_file), 'r') as f:
-        metadata = json.load(f)
-    
-    # Extraire les attributs
-    attributes = {attr['trait_type']: attr['value'] for attr in metadata['attributes']}
-    
-    # Construire le prompt basé sur le system_prompt_zk_synth
-    prompt = f"""
-[ARTISTIC_DIRECTION]
+# Prompt basé sur le system_prompt_zk_synth ; les champs {Trait} viennent des attributs
+PROMPT_TEMPLATE = """[ARTISTIC_DIRECTION]
 Hyper-realistic digital photography mixed with gritty street art textures.
 High-contrast "Neon Noir" lighting with Cyan (#00F0FF) and Magenta (#FF00FF) key lights.
 85mm Portrait Lens, f/1.8 aperture, sharp focus on eyes and accessories.
 Chromatic aberration on edges, slight film grain, glitch artifacts on holographic elements.
 
 [SUBJECT_DNA]
-Archetype: {attributes.get('Archetype', 'Unknown')}
-Outfit: {attributes.get('Outfit', 'Tech-wear fashion')}
-Cybernetics: {attributes.get('Implant', 'Neural implants')} with glowing circuit lines
+Archetype: {Archetype}
+Outfit: {Outfit}
+Cybernetics: {Implant} with glowing circuit lines
 Pose: Aggressive rapping stance
 
 [ENVIRONMENT_MATRIX]
-Location: {attributes.get('Background', 'Cyber city')}
+Location: {Background}
 Atmosphere: Heavy rain, steam rising from vents, floating holographic crypto advertisements
 
 [QUALITY_GATES]
@@ -51,37 +46,135 @@ Resolution: 8K UHD
 Render Engine: Octane Render style
 Detail Level: Insane detail (visible fabric weaves, realistic skin pores, reflective metal)
 
-Generate a single portrait of a futuristic hip-hop artist with these exact characteristics.
-"""
-    
-    generated_prompts.append({
-        'token_id': metadata_file.replace('.json', ''),
-        'name': metadata['name'],
-        'prompt': prompt.strip(),
-        'attributes': attributes
-    })
-    
-    print(f"✅ Generated prompt for: {metadata['name']}")
-    print(f"   Archetype: {attributes.get('Archetype')}")
-    print(f"   Outfit: {attributes.get('Outfit')}")
-    print(f"   Background: {attributes.get('Background')}\n")
-
-# Sauvegarder les prompts
-prompts_file = os.path.join(output_dir, "generation_prompts.json")
-with open(prompts_file, 'w') as f:
-    json.dump(generated_prompts, f, indent=2)
-
-print("=" * 60)
-print(f"\n✅ Generation Complete!")
-print(f"\nPrompts saved to: {prompts_file}")
-print(f"\n📝 Summary:")
-print(f"   Total NFTs: {len(generated_prompts)}")
-print(f"   Unique Archetypes: {len(set(p['attributes'].get('Archetype') for p in generated_prompts))}")
-print(f"   Unique Backgrounds: {len(set(p['attributes'].get('Background') for p in generated_prompts))}")
-
-print(f"\n💡 Next Steps:")
-print(f"   1. Use these prompts with Stable Diffusion/DALL-E/Midjourney")
-print(f"   2. Generate images (1024x1024 recommended)")
-print(f"   3. Upload to IPFS via Pinata")
-print(f"   4. Update metadata with real IPFS hashes")
-print("\n" + "=" * 60)
+Generate a single portrait of a futuristic hip-hop artist with these exact characteristics."""
+
+# Valeur utilisée quand un token n'a pas le trait
+PROMPT_DEFAULTS = {
+    "Archetype": "Unknown",
+    "Outfit": "Tech-wear fashion",
+    "Implant": "Neural implants",
+    "Background": "Cyber city",
+}
+
+# Template découpé une seule fois en (texte, champ) ; le rendu n'est plus qu'un join
+PROMPT_PARTS = [(literal, field) for literal, field, _, _ in Formatter().parse(PROMPT_TEMPLATE)]
+PROMPT_FIELDS = tuple(field for _, field in PROMPT_PARTS if field)
+
+def render_prompt(values):
+    return "".join(literal + (str(values[field]) if field else "") for literal, field in PROMPT_PARTS)
+
+def read_metadata(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def iter_metadata(paths, threads=READ_THREADS, read_ahead=READ_AHEAD):
+    """Métadonnées dans l'ordre des fichiers, lues en parallèle avec une fenêtre bornée"""
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        window = deque()
+        for path in paths:
+            window.append((path, pool.submit(read_metadata, path)))
+            if len(window) >= read_ahead:
+                path, future = window.popleft()
+                yield path, future.result()
+        while window:
+            path, future = window.popleft()
+            yield path, future.result()
+
+def generate_prompts(metadata_dir, output_dir):
+    """
+    Écrit en flux deux fichiers JSONL :
+    - prompts.jsonl : chaque prompt unique, une seule fois (clé = tuple des traits du template)
+    - generation_prompts.jsonl : une ligne par token, qui référence son prompt_id
+    Seuls les prompts uniques restent en mémoire.
+    """
+    metadata_files = sorted(f for f in os.listdir(metadata_dir) if f.endswith('.json'))
+    print(f"Found {len(metadata_files)} metadata files\n")
+
+    prompt_ids = {}
+    archetypes, backgrounds = set(), set()
+    total = 0
+    started = time.perf_counter()
+
+    prompts_file = os.path.join(output_dir, "prompts.jsonl")
+    tokens_file = os.path.join(output_dir, "generation_prompts.jsonl")
+    with open(prompts_file, 'w') as prompts_out, open(tokens_file, 'w') as tokens_out:
+        paths = (os.path.join(metadata_dir, name) for name in metadata_files)
+        for path, metadata in iter_metadata(paths):
+            # Extraire les attributs
+            attributes = {attr['trait_type']: attr['value'] for attr in metadata['attributes']}
+            values = {field: attributes.get(field, PROMPT_DEFAULTS[field]) for field in PROMPT_FIELDS}
+            key = tuple(values[field] for field in PROMPT_FIELDS)
+
+            # Prompt identique pour un même tuple de traits : rendu et écrit une fois
+            prompt_id = prompt_ids.get(key)
+            if prompt_id is None:
+                prompt_id = prompt_ids[key] = len(prompt_ids)
+                prompts_out.write(json.dumps({'prompt_id': prompt_id, 'prompt': render_prompt(values), 'traits': values}) + "\n")
+
+            tokens_out.write(json.dumps({
+                'token_id': os.path.basename(path).replace('.json', ''),
+                'name': metadata['name'],
+                'prompt_id': prompt_id,
+                'attributes': attributes
+            }) + "\n")
+
+            archetypes.add(attributes.get('Archetype'))
+            backgrounds.add(attributes.get('Background'))
+            total += 1
+            if total % PROGRESS_EVERY == 0:
+                print(f"   {total} tokens ({total / (time.perf_counter() - started):.0f}/s)")
+
+    return {
+        'prompts_file': prompts_file,
+        'tokens_file': tokens_file,
+        'total': total,
+        'unique_prompts': len(prompt_ids),
+        'unique_archetypes': len(archetypes),
+        'unique_backgrounds': len(backgrounds),
+        'seconds': time.perf_counter() - started,
+    }
+
+def load_generation_prompts(output_dir):
+    """
+    Enregistrements au format de l'ancien generation_prompts.json, dans
+    l'ordre des tokens ; seuls les prompts uniques sont gardés en mémoire
+    """
+    with open(os.path.join(output_dir, "prompts.jsonl")) as f:
+        prompts = {entry['prompt_id']: entry['prompt'] for entry in map(json.loads, f)}
+    with open(os.path.join(output_dir, "generation_prompts.jsonl")) as f:
+        for line in f:
+            token = json.loads(line)
+            yield {
+                'token_id': token['token_id'],
+                'name': token['name'],
+                'prompt': prompts[token['prompt_id']],
+                'attributes': token['attributes']
+            }
+
+if __name__ == "__main__":
+    # Créer le dossier de sortie
+    os.makedirs(output_dir, exist_ok=True)
+
+    print("🎨 RhymeChain NFT Image Generator")
+    print("=" * 60)
+    print(f"\nReading metadata from: {metadata_dir}")
+    print(f"Output directory: {output_dir}\n")
+
+    summary = generate_prompts(metadata_dir, output_dir)
+
+    print("=" * 60)
+    print(f"\n✅ Generation Complete! ({summary['seconds']:.2f}s)")
+    print(f"\nPrompts saved to: {summary['prompts_file']}")
+    print(f"Tokens saved to: {summary['tokens_file']} (prompt_id -> prompts.jsonl, see load_generation_prompts)")
+    print(f"\n📝 Summary:")
+    print(f"   Total NFTs: {summary['total']}")
+    print(f"   Unique Prompts: {summary['unique_prompts']}")
+    print(f"   Unique Archetypes: {summary['unique_archetypes']}")
+    print(f"   Unique Backgrounds: {summary['unique_backgrounds']}")
+
+    print(f"\n💡 Next Steps:")
+    print(f"   1. Use these prompts with Stable Diffusion/DALL-E/Midjourney")
+    print(f"   2. Generate images (1024x1024 recommended)")
+    print(f"   3. Upload to IPFS via Pinata")
+    print(f"   4. Update metadata with real IPFS hashes")
+    print("\n" + "=" * 60)
@@ -1,7 +1,15 @@
 import os
+import hashlib
 import json
 import random
+import shutil
+import threading
 import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from types import CodeType
+import numpy as np
 from PIL import Image, ImageOps, ImageEnhance, ImageFilter
 
 # ==========================================
@@ -13,11 +21,26 @@ CONFIG = {
     "description": "The first authentic Hip-Hop card game on-chain.",
     "base_image_url": "ipfs://YOUR_CID_HERE/",
     "output_dir": "./build",
+    "assets_path": "./assets",
     "total_supply": 20, # Pour le test
     "image_size": (1080, 1080),
-    "styles": ["street_art", "minimalist"] # Supporte le switch
+    "styles": ["street_art", "minimalist"], # Supporte le switch
+    "seed": 1337, # Même seed => même collection, quel que soit le nombre de workers
+    "workers": None, # None = tous les coeurs
+    "chunk_size": 8, # Tokens par tâche envoyée à un worker
+    "unique_dna": True, # Jamais deux tokens identiques (même style + mêmes traits)
+    "exact_rarity": False, # True : chaque trait tombe exactement sur son poids
+    "dedupe_images": "hardlink", # Une image par DNA : "hardlink", "shared" (metadata -> image commune) ou None
+    "stack_cache_mb": 256, # Mémoire max des canvas intermédiaires, par worker
+    "encoder": {"format": "png", "compress_level": 6}, # + options PIL, voir ENCODERS
+    "thumbnail_size": None, # ex: (256, 256) => vignettes dans images/thumbs
+    "writer_threads": 4, # Threads d'encodage et d'écriture, par worker
+    "metadata_format": "json" # "json" (un fichier par token) ou "jsonl" (metadata/manifest.jsonl)
 }
 
+# Dossier d'assets de chaque layer
+LAYER_DIRS = {"Background": "bg", "Artist": "artist", "Accessory": "acc", "Frame": "frame"}
+
 # Définition des Layers et de leurs poids de rareté (Rarity Weights)
 LAYERS = {
     "Background": [
@@ -75,104 +98,747 @@ def apply_minimalist_filter(image):
     img = enhancer.enhance(0.8) # Légère désaturation chic
     return img
 
+def duotone_filter(contrast=1.8, black=(0, 0, 0), white=(0, 240, 255), sharpen=True):
+    """
+    Version NumPy paramétrable de la chaîne street art (N&B, contraste, duotone),
+    vectorisée sur toute l'image : pour des variantes paramétrées par token
+    (teinte, contraste) sans repasser par les étapes PIL une à une
+    """
+    black = np.asarray(black, dtype=np.float32)
+    white = np.asarray(white, dtype=np.float32)
+    
+    def apply(image):
+        rgb = np.asarray(image, dtype=np.float32)[..., :3]
+        # 1. Luminance ITU-R 601, comme ImageOps.grayscale
+        gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        # 2. Contraste autour de la luminance moyenne, comme ImageEnhance.Contrast
+        mean = np.float32(int(gray.mean() + 0.5))
+        gray = np.clip(mean + (gray - mean) * contrast, 0, 255)
+        # 3. Grain : l'UnsharpMask de PIL est déjà en C
+        if sharpen:
+            gray = Image.fromarray(np.rint(gray).astype(np.uint8), "L")
+            gray = np.asarray(gray.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3)), dtype=np.float32)
+        # 4. Duotone : interpolation linéaire noir -> blanc de la palette
+        duo = black + (gray[..., np.newaxis] / 255) * (white - black)
+        rgba = np.dstack([np.rint(duo), np.full(gray.shape, 255, dtype=np.float32)])
+        return Image.fromarray(rgba.astype(np.uint8), "RGBA")
+    
+    return apply
+
+# Filtres appliqués au layer Artist selon le style ; un style absent
+# (ex: "minimalist") garde l'artiste tel quel.
+# Nouveau style : STYLE_FILTERS["nom"] = fonction(Image RGBA) -> Image RGBA
+STYLE_FILTERS = {
+    "street_art": apply_street_art_filter,
+}
+
+# Layers qui reçoivent le filtre du style
+STYLED_LAYERS = ("Artist",)
+
+# ==========================================
+# 3. CACHE DES ASSETS
+# ==========================================
+
+class AssetCache:
+    """
+    Layers décodés et redimensionnés une seule fois, clé (layer, file, size, style).
+    share() copie le cache dans un bloc de mémoire partagée que les workers
+    ouvrent avec attach() : ni décodage ni resize par token, ni copie par worker.
+    """
+    
+    def __init__(self, size=None):
+        self.size = tuple(size or CONFIG["image_size"])
+        self.images = {}
+        self._shm = None
+    
+    def get(self, layer, file, style=None):
+        key = (layer, file, self.size, style)
+        img = self.images.get(key)
+        if img is None:
+            img = Image.open(f"{CONFIG['assets_path']}/{LAYER_DIRS[layer]}/{file}").convert("RGBA")
+            img = self.images[key] = img.resize(self.size)
+        return img
+    
+    def styled(self, layer, file, style):
+        """
+        Variante filtrée d'un layer, détourée par son alpha d'origine,
+        calculée une seule fois par (layer, file, style)
+        """
+        style_filter = STYLE_FILTERS.get(style) if layer in STYLED_LAYERS else None
+        if style_filter is None:
+            return self.get(layer, file)
+        
+        key = (layer, file, self.size, style)
+        img = self.images.get(key)
+        if img is None:
+            base = self.get(layer, file)
+            img = Image.new("RGBA", self.size)
+            img.paste(style_filter(base), (0, 0), mask=base.getchannel("A"))
+            self.images[key] = img
+        return img
+    
+    def preload(self, styles=None):
+        for layer, options in LAYERS.items():
+            for item in options:
+                if not item["file"]:
+                    continue
+                try:
+                    self.get(layer, item["file"])
+                    for style in styles or CONFIG["styles"]:
+                        self.styled(layer, item["file"], style)
+                except FileNotFoundError as e:
+                    # L'erreur ressortira sur les tokens concernés
+                    print(f"⚠️ Missing asset: {e}")
+        return self
+    
+    def share(self):
+        """Déplace les layers en mémoire partagée ; renvoie un handle picklable pour attach()"""
+        layout, offset = [], 0
+        for key, img in self.images.items():
+            layout.append((key, offset))
+            offset += img.size[0] * img.size[1] * 4
+        self._shm = SharedMemory(create=True, size=max(offset, 1))
+        for key, start in layout:
+            data = self.images[key].tobytes()
+            self._shm.buf[start:start + len(data)] = data
+        handle = (self._shm.name, layout)
+        self._map(layout)
+        return handle
+    
+    @classmethod
+    def attach(cls, handle):
+        name, layout = handle
+        cache = cls()
+        cache._shm = SharedMemory(name=name)
+        cache._map(layout)
+        return cache
+    
+    def _map(self, layout):
+        # Images en lecture seule directement sur le bloc partagé (zéro copie)
+        for key, start in layout:
+            size = key[2]
+            length = size[0] * size[1] * 4
+            self.images[key] = Image.frombuffer("RGBA", size, self._shm.buf[start:start + length], "raw", "RGBA", 0, 1)
+    
+    def close(self):
+        """Détache le bloc partagé sans le détruire (cache ouvert par attach())"""
+        self.images.clear()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+    
+    def release(self):
+        """Libère le bloc partagé (processus parent, une fois le pool terminé)"""
+        shm = self._shm
+        self.close()
+        if shm is not None:
+            shm.unlink()
+
+class LayerStackCache:
+    """
+    LRU des canvas intermédiaires (préfixes de layers déjà composés), borné
+    en mémoire : une nouvelle combinaison ne compose que les layers du dessus
+    qui diffèrent du plus long préfixe en cache
+    """
+    
+    def __init__(self, max_bytes=None):
+        self.max_bytes = CONFIG["stack_cache_mb"] * 2**20 if max_bytes is None else max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._stacks = OrderedDict()
+    
+    def __contains__(self, key):
+        return key in self._stacks
+    
+    def get(self, key):
+        canvas = self._stacks.get(key)
+        if canvas is not None:
+            self._stacks.move_to_end(key)
+        return canvas
+    
+    def put(self, key, canvas):
+        size = canvas.size[0] * canvas.size[1] * len(canvas.getbands())
+        if key in self._stacks or size > self.max_bytes:
+            return
+        self._stacks[key] = canvas
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._stacks.popitem(last=False)
+            self.bytes -= evicted.size[0] * evicted.size[1] * len(evicted.getbands())
+
+# ==========================================
+# 4. ENCODAGE ET ÉCRITURE
+# ==========================================
+
+# Format => (format PIL, extension, options par défaut)
+# PNG : compress_level 1 est bien plus rapide que 6 pour ~10-20% de poids en plus.
+# AVIF : Pillow n'a pas de mode lossless, qualité 100 en 4:4:4 s'en approche.
+ENCODERS = {
+    "png": ("PNG", "png", {"compress_level": 6, "optimize": False}),
+    "webp": ("WEBP", "webp", {"lossless": True, "quality": 80, "method": 4}),
+    "avif": ("AVIF", "avif", {"quality": 100, "subsampling": "4:4:4", "speed": 6}),
+}
+
+def image_extension():
+    return ENCODERS[CONFIG["encoder"].get("format", "png")][1]
+
+def save_image(canvas, file_name):
+    """Encode une image (et sa vignette) sous images/, avec les réglages de CONFIG["encoder"]"""
+    options = dict(CONFIG["encoder"])
+    pil_format, _, defaults = ENCODERS[options.pop("format", "png")]
+    options = {**defaults, **options}
+    canvas.save(f"{CONFIG['output_dir']}/images/{file_name}", pil_format, **options)
+    if CONFIG["thumbnail_size"]:
+        thumbnail = canvas.copy()
+        thumbnail.thumbnail(CONFIG["thumbnail_size"])
+        thumbnail.save(f"{CONFIG['output_dir']}/images/thumbs/{file_name}", pil_format, **options)
+
+def link_image(source_name, file_name):
+    # Un hardlink ne coûte aucun octet ; copie si le système de fichiers refuse
+    folders = ["images"] + (["images/thumbs"] if CONFIG["thumbnail_size"] else [])
+    for folder in folders:
+        source = f"{CONFIG['output_dir']}/{folder}/{source_name}"
+        destination = f"{CONFIG['output_dir']}/{folder}/{file_name}"
+        if os.path.lexists(destination):
+            os.remove(destination)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+def append_manifest(entries):
+    """Metadata en JSONL : une ligne par token, la dernière ligne d'un token fait foi"""
+    if entries:
+        with open(f"{CONFIG['output_dir']}/metadata/manifest.jsonl", "a") as f:
+            f.write("".join(json.dumps(metadata) + "\n" for metadata in entries))
+
+class OutputWriter:
+    """
+    Pool de threads pour l'encodage et l'écriture disque. L'encodeur PIL
+    relâche le GIL, donc le compositing suivant avance pendant ce temps.
+    Le nombre d'images en attente est borné pour tenir la mémoire.
+    """
+    
+    def __init__(self, threads=None):
+        threads = threads or CONFIG["writer_threads"]
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="nft-writer")
+        self._slots = threading.BoundedSemaphore(2 * threads)
+    
+    def submit(self, fn, *args):
+        self._slots.acquire()
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    def close(self):
+        """Attend les écritures en cours puis arrête les threads"""
+        self._pool.shutdown(wait=True)
+
+def setup_directories():
+    # exist_ok : plusieurs workers (ou une reprise) peuvent passer ici
+    os.makedirs(f"{CONFIG['output_dir']}/metadata", exist_ok=True)
+    for folder in ["images"] + (["images/thumbs"] if CONFIG["thumbnail_size"] else []):
+        os.makedirs(f"{CONFIG['output_dir']}/{folder}", exist_ok=True)
+        if CONFIG["dedupe_images"]:
+            os.makedirs(f"{CONFIG['output_dir']}/{folder}/dna", exist_ok=True)
+
 # ==========================================
-# 3. MOTEUR DE GÉNÉRATION
+# 5. MOTEUR DE GÉNÉRATION
 # ==========================================
 
 class NFTGenerator:
-    def __init__(self):
+    def __init__(self, assets=None):
+        self.assets = assets or AssetCache()
+        self.stacks = LayerStackCache()
+        self.writer = OutputWriter()
         self.setup_directories()
         
     def setup_directories(self):
-        if not os.path.exists(CONFIG["output_dir"]):
-            os.makedirs(CONFIG["output_dir"])
-            os.makedirs(f"{CONFIG['output_dir']}/images")
-            os.makedirs(f"{CONFIG['output_dir']}/metadata")
+        setup_directories()
+    
+    def close(self):
+        self.writer.close()
 
-    def select_layer(self, layer_name):
+    def select_layer(self, layer_name, rng=random):
         options = LAYERS[layer_name]
         weights = [item["weight"] for item in options]
-        selection = random.choices(options, weights=weights, k=1)[0]
+        selection = rng.choices(options, weights=weights, k=1)[0]
         return selection
 
-    def build_nft(self, token_id, style="street_art"):
-        print(f"🔨 Generating Token #{token_id} [{style}]...")
+    def compose(self, style, traits):
+        layers = list(LAYERS)
         
-        # 1. Sélection des Traits
-        bg_trait = self.select_layer("Background")
-        artist_trait = self.select_layer("Artist")
-        acc_trait = self.select_layer("Accessory")
-        frame_trait = self.select_layer("Frame")
+        # Clé de chaque préfixe : fichiers des layers du bas, plus le style
+        # dès qu'un layer stylé en fait partie
+        keys, styled = [], False
+        for depth, layer in enumerate(layers):
+            styled = styled or layer in STYLED_LAYERS
+            keys.append((style if styled else None, tuple(trait["file"] for trait in traits[:depth + 1])))
         
-        # 2. Composition d'Image
-        canvas = Image.new("RGBA", CONFIG["image_size"])
+        # Reprise depuis le plus long préfixe déjà composé
+        canvas, start = None, 0
+        for depth in range(len(layers) - 1, 0, -1):
+            cached = self.stacks.get(keys[depth - 1])
+            if cached is not None:
+                canvas, start = cached.copy(), depth
+                break
+        if canvas is None:
+            canvas = Image.new("RGBA", CONFIG["image_size"])
+            self.stacks.misses += 1
+        else:
+            self.stacks.hits += 1
         
-        assets_path = "./assets" 
+        # Layers restants, de bas en haut (le style s'applique aux STYLED_LAYERS)
+        for depth in range(start, len(layers)):
+            if traits[depth]["file"]:
+                canvas.alpha_composite(self.assets.styled(layers[depth], traits[depth]["file"], style))
+            if depth < len(layers) - 1 and keys[depth] not in self.stacks:
+                self.stacks.put(keys[depth], canvas.copy())
         
-        try:
-            # Layer 1: Background
-            if bg_trait['file']:
-                bg_img = Image.open(f"{assets_path}/bg/{bg_trait['file']}").convert("RGBA")
-                bg_img = bg_img.resize(CONFIG["image_size"])
-                canvas.alpha_composite(bg_img)
-            
-            # Layer 2: Artist (Appliquer le style ICI)
-            if artist_trait['file']:
-                artist_img = Image.open(f"{assets_path}/artist/{artist_trait['file']}").convert("RGBA")
-                artist_img = artist_img.resize(CONFIG["image_size"])
-                
-                if style == "street_art":
-                    processed_artist = apply_street_art_filter(artist_img)
-                    final_artist = Image.new("RGBA", CONFIG["image_size"])
-                    final_artist.paste(processed_artist, (0,0), mask=artist_img.split()[3])
-                    canvas.alpha_composite(final_artist)
-                else:
-                    canvas.alpha_composite(artist_img)
-
-            # Layer 3: Accessory
-            if acc_trait["file"]:
-                acc_img = Image.open(f"{assets_path}/acc/{acc_trait['file']}").convert("RGBA")
-                acc_img = acc_img.resize(CONFIG["image_size"])
-                canvas.alpha_composite(acc_img)
-
-            # Layer 4: Frame
-            if frame_trait['file']:
-                frame_img = Image.open(f"{assets_path}/frame/{frame_trait['file']}").convert("RGBA")
-                frame_img = frame_img.resize(CONFIG["image_size"])
-                canvas.alpha_composite(frame_img)
-            
-            # Sauvegarde Image
-            file_name = f"{token_id}.png"
-            canvas.save(f"{CONFIG['output_dir']}/images/{file_name}")
-            
-            # 3. Génération Metadata
-            metadata = {
-                "name": f"{CONFIG['collection_name']} #{token_id}",
-                "description": CONFIG["description"],
-                "image": f"{CONFIG['base_image_url']}{file_name}",
-                "attributes": [
-                    {"trait_type": "Background", "value": bg_trait["name"]},
-                    {"trait_type": "Artist", "value": artist_trait["name"]},
-                    {"trait_type": "Accessory", "value": acc_trait["name"]},
-                    {"trait_type": "Frame", "value": frame_trait["name"]},
-                    {"trait_type": "Rarity", "value": frame_trait["rarity_label"]},
-                    {"trait_type": "Style", "value": style}
-                ]
-            }
-            
+        return canvas
+
+    def write_metadata(self, token_id, style, traits, file_name):
+        bg_trait, artist_trait, acc_trait, frame_trait = traits
+        metadata = {
+            "name": f"{CONFIG['collection_name']} #{token_id}",
+            "description": CONFIG["description"],
+            "image": f"{CONFIG['base_image_url']}{file_name}",
+            "attributes": [
+                {"trait_type": "Background", "value": bg_trait["name"]},
+                {"trait_type": "Artist", "value": artist_trait["name"]},
+                {"trait_type": "Accessory", "value": acc_trait["name"]},
+                {"trait_type": "Frame", "value": frame_trait["name"]},
+                {"trait_type": "Rarity", "value": frame_trait["rarity_label"]},
+                {"trait_type": "Style", "value": style}
+            ]
+        }
+        
+        if CONFIG["metadata_format"] == "json":
             with open(f"{CONFIG['output_dir']}/metadata/{token_id}.json", "w") as f:
                 json.dump(metadata, f, indent=4)
-                
+        return metadata
+
+    def build_nft(self, token_id, style="street_art", rng=random, dna=None):
+        """
+        Un token isolé : traits imposés par le plan (dna) ou tirés au hasard,
+        puis même chemin que build_collection (build_group et pool d'écriture)
+        """
+        if dna is None:
+            dna = tuple(LAYERS[layer].index(self.select_layer(layer, rng)) for layer in LAYERS)
+        try:
+            written = self.build_group(style, tuple(dna), [token_id]).result()
         except Exception as e:
             print(f"❌ Error building #{token_id}: {e}")
+            return False
+        if CONFIG["metadata_format"] == "jsonl":
+            append_manifest([entry["metadata"] for entry in written])
+        return bool(written)
 
-if __name__ == "__main__":
-    gen = NFTGenerator()
-    
-    for i in range(1, 11):
-        gen.build_nft(i, style="street_art")
-        
-    for i in range(11, 21):
-        gen.build_nft(i, style="minimalist")
+    def build_group(self, style, dna, token_ids):
+        """
+        Compose l'image d'un DNA ; l'encodage et l'écriture partent dans le pool
+        d'écriture. Avec dedupe_images, l'image n'est encodée qu'une fois et
+        partagée entre tous les tokens qui ont ce DNA (hardlink, ou référence
+        directe dans la metadata). Renvoie un future -> [(token_id, metadata)]
+        """
+        key = dna_key(style, dna)
+        traits = dna_traits(dna)
+        canvas = self.compose(style, traits)
+        return self.writer.submit(self._write_group, canvas, style, traits, key, token_ids)
+
+    def _write_group(self, canvas, style, traits, key, token_ids):
+        images_dir = f"{CONFIG['output_dir']}/images"
+        mode = CONFIG["dedupe_images"]
+        if mode:
+            shared_name = f"dna/{key}.{image_extension()}"
+            save_image(canvas, shared_name)
+            output = file_digest(f"{images_dir}/{shared_name}")
         
+        written = []
+        for token_id in token_ids:
+            try:
+                if not mode:
+                    file_name = f"{token_id}.{image_extension()}"
+                    save_image(canvas, file_name)
+                    output = file_digest(f"{images_dir}/{file_name}")
+                elif mode == "hardlink":
+                    file_name = f"{token_id}.{image_extension()}"
+                    link_image(shared_name, file_name)
+                else:
+                    file_name = shared_name
+                metadata = self.write_metadata(token_id, style, traits, file_name)
+                written.append({"token_id": token_id, "file": file_name, "output": output, "metadata": metadata})
+            except Exception as e:
+                print(f"❌ Error building #{token_id}: {e}")
+        return written
+
+def dna_key(style, dna):
+    """Adresse de l'image d'un DNA : même style + mêmes traits => même fichier"""
+    return f"{style}_{'-'.join(map(str, dna))}"
+
+# ==========================================
+# 6. PLANIFICATION DE LA COLLECTION
+# ==========================================
+
+# Un DNA = l'index de l'option choisie dans chaque layer, dans l'ordre de LAYERS
+
+# Au-delà, les combinaisons ne sont plus énumérées pour le tirage sans remise
+MAX_ENUMERATED_COMBINATIONS = 1_000_000
+
+def dna_traits(dna):
+    return [LAYERS[layer][index] for layer, index in zip(LAYERS, dna)]
+
+def rarity_quota(weights, n):
+    """Nombre exact de tokens par option (plus forts restes), somme = n"""
+    exact = np.asarray(weights, dtype=np.float64) / np.sum(weights) * n
+    counts = np.floor(exact).astype(np.int64)
+    counts[np.argsort(counts - exact)[:n - counts.sum()]] += 1
+    return counts
+
+def _swap_out_duplicates(dna, token_styles, sizes, rng, max_attempts):
+    """
+    Rend chaque DNA unique en échangeant un trait avec un autre token :
+    les quotas par option ne bougent pas. Un échange est gardé s'il
+    n'augmente pas le nombre total de doublons ; les échanges à doublons
+    constants laissent la recherche sortir des impasses.
+    """
+    combinations = int(np.prod(sizes))
+    codes = (token_styles * combinations + np.ravel_multi_index(dna.T, sizes)).tolist()
+    counts = Counter(codes)
+    
+    def code(i):
+        return int(token_styles[i]) * combinations + int(np.ravel_multi_index(tuple(dna[i]), sizes))
+    
+    def excess(affected):
+        return sum(max(counts[c] - 1, 0) for c in set(affected))
+    
+    pending = deque(i for i, c in enumerate(codes) if counts[c] > 1)
+    budget = max_attempts * len(pending)
+    while pending:
+        i = pending.popleft()
+        while counts[codes[i]] > 1:
+            if budget == 0:
+                raise RuntimeError("Could not make DNA unique under exact rarity quotas, relax exact_rarity or supply")
+            budget -= 1
+            j, other = int(rng.integers(dna.shape[1])), int(rng.integers(len(dna)))
+            if dna[i, j] == dna[other, j]:
+                continue
+            dna[i, j], dna[other, j] = dna[other, j], dna[i, j]
+            new_i, new_other = code(i), code(other)
+            affected = (codes[i], codes[other], new_i, new_other)
+            before = excess(affected)
+            counts.subtract((codes[i], codes[other]))
+            counts.update((new_i, new_other))
+            if excess(affected) <= before:
+                codes[i], codes[other] = new_i, new_other
+                if counts[new_other] > 1:
+                    pending.append(other)
+                continue
+            counts.subtract((new_i, new_other))
+            counts.update((codes[i], codes[other]))
+            dna[i, j], dna[other, j] = dna[other, j], dna[i, j]
+
+def _check_unique_quotas(quotas, token_styles, sizes):
+    """
+    Une option ne peut pas servir plus de tokens que de combinaisons des
+    autres layers, dans chaque style : au-delà, l'unicité est impossible
+    """
+    per_style = np.bincount(token_styles)
+    combinations = int(np.prod(sizes))
+    for j, (layer, quota) in enumerate(zip(LAYERS, quotas)):
+        capacity = int(np.minimum(per_style, combinations // sizes[j]).sum())
+        if quota.max() > capacity:
+            raise ValueError(f"{layer} quota {quota.max()} exceeds {capacity} unique combinations, "
+                             f"relax exact_rarity or supply")
+
+def plan_collection(tokens, seed=None, unique=None, exact_rarity=None, max_rounds=10000):
+    """
+    Tire les traits de toute la collection d'un coup (un tirage NumPy par layer)
+    avant le rendu. Renvoie une liste de (token_id, style, dna).
+    - unique : les doublons (style + DNA) sont retirés jusqu'à disparaître
+    - exact_rarity : chaque option apparaît exactement selon son poids ;
+      les doublons sont alors résolus par échange de traits entre tokens,
+      ce qui conserve les quotas
+    """
+    seed = CONFIG["seed"] if seed is None else seed
+    unique = CONFIG["unique_dna"] if unique is None else unique
+    exact_rarity = CONFIG["exact_rarity"] if exact_rarity is None else exact_rarity
+    rng = np.random.default_rng(seed)
+    
+    n = len(tokens)
+    layers = list(LAYERS)
+    sizes = [len(LAYERS[layer]) for layer in layers]
+    weights = [[item["weight"] for item in LAYERS[layer]] for layer in layers]
+    style_ids = {style: i for i, style in enumerate(dict.fromkeys(style for _, style in tokens))}
+    token_styles = np.array([style_ids[style] for _, style in tokens], dtype=np.int64)
+    
+    combinations = int(np.prod(sizes))
+    if unique and n and np.bincount(token_styles).max() > combinations:
+        raise ValueError(f"Only {combinations} unique trait combinations per style for {n} tokens")
+    
+    def draw(j, count):
+        p = np.asarray(weights[j], dtype=np.float64)
+        return rng.choice(sizes[j], size=count, p=p / p.sum())
+    
+    dna = np.empty((n, len(layers)), dtype=np.int64)
+    if exact_rarity:
+        quotas = [rarity_quota(w, n) for w in weights]
+        if unique and n:
+            _check_unique_quotas(quotas, token_styles, sizes)
+        for j in range(len(layers)):
+            dna[:, j] = rng.permutation(np.repeat(np.arange(sizes[j]), quotas[j]))
+        if unique:
+            _swap_out_duplicates(dna, token_styles, sizes, rng, max_rounds)
+    elif unique and combinations <= MAX_ENUMERATED_COMBINATIONS:
+        # Tirage pondéré sans remise dans l'espace des combinaisons : unique d'office
+        p = np.ones(1)
+        for w in weights:
+            p = np.outer(p, np.asarray(w, dtype=np.float64) / np.sum(w)).ravel()
+        for style_id in range(len(style_ids)):
+            rows = np.flatnonzero(token_styles == style_id)
+            codes = rng.choice(combinations, size=len(rows), replace=False, p=p)
+            dna[rows] = np.stack(np.unravel_index(codes, sizes), axis=1)
+    else:
+        for j in range(len(layers)):
+            dna[:, j] = draw(j, n)
+        # Espace trop grand pour être énuméré : collisions rares, les doublons sont retirés
+        for _ in range(max_rounds if unique and n else 0):
+            codes = token_styles * combinations + np.ravel_multi_index(dna.T, sizes)
+            _, first = np.unique(codes, return_index=True)
+            duplicates = np.setdiff1d(np.arange(n), first)
+            if not len(duplicates):
+                break
+            for j in range(len(layers)):
+                dna[duplicates, j] = draw(j, len(duplicates))
+        else:
+            if unique and n:
+                raise RuntimeError(f"Could not reach unique DNA in {max_rounds} rounds")
+    
+    return [(token_id, style, tuple(row)) for (token_id, style), row in zip(tokens, dna.tolist())]
+
+def save_plan(path, plan):
+    """Plan complet (traits de chaque token) écrit avant le rendu"""
+    with open(path, "w") as f:
+        json.dump([
+            {"token_id": token_id, "style": style, "dna": list(dna),
+             "traits": {layer: item["name"] for layer, item in zip(LAYERS, dna_traits(dna))}}
+            for token_id, style, dna in plan
+        ], f)
+
+# ==========================================
+# 7. MANIFESTE DE BUILD (INCRÉMENTAL)
+# ==========================================
+
+# Réglages de CONFIG qui changent le contenu des fichiers produits
+RENDER_CONFIG_KEYS = ("image_size", "encoder", "thumbnail_size", "dedupe_images", "metadata_format",
+                      "collection_name", "description", "base_image_url")
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_fingerprint(code):
+    consts = [code_fingerprint(const) if isinstance(const, CodeType) else repr(const) for const in code.co_consts]
+    return hashlib.sha256(code.co_code + repr((consts, code.co_names)).encode()).hexdigest()
+
+def filter_fingerprint(style_filter):
+    """Code et paramètres (closure) d'un filtre : le modifier invalide les tokens de ce style"""
+    closure = [cell.cell_contents for cell in style_filter.__closure__ or ()]
+    return hashlib.sha256((code_fingerprint(style_filter.__code__) + repr(closure)).encode()).hexdigest()
+
+class BuildManifest:
+    """
+    Journal JSONL des tokens : DNA, empreinte des entrées (fichiers de layers,
+    CONFIG, filtre du style), empreinte de l'image produite et statut.
+    Une relance ne reconstruit que les tokens absents, en échec, ou dont une
+    entrée a changé : retoucher un asset de frame ne refait que ses tokens.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self._asset_digests = {}
+        self._config_digest = hashlib.sha256(
+            json.dumps({key: CONFIG[key] for key in RENDER_CONFIG_KEYS}, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        try:
+            with open(path) as f:
+                for line in f:
+                    # La dernière ligne d'un token fait foi ; une ligne tronquée (crash) est ignorée
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records[record["token_id"]] = record
+        except FileNotFoundError:
+            pass
+    
+    def asset_digest(self, layer, file):
+        key = (layer, file)
+        if key not in self._asset_digests:
+            try:
+                self._asset_digests[key] = file_digest(f"{CONFIG['assets_path']}/{LAYER_DIRS[layer]}/{file}")
+            except FileNotFoundError:
+                self._asset_digests[key] = None
+        return self._asset_digests[key]
+    
+    def inputs(self, token_id, style, dna):
+        """Empreinte de tout ce dont dépendent l'image et la metadata d'un token"""
+        traits = dna_traits(dna)
+        parts = {
+            "config": self._config_digest,
+            "token": [token_id, style, list(dna)],
+            "assets": [self.asset_digest(layer, trait["file"]) if trait["file"] else None
+                       for layer, trait in zip(LAYERS, traits)],
+        }
+        if style in STYLE_FILTERS and any(trait["file"] for layer, trait in zip(LAYERS, traits) if layer in STYLED_LAYERS):
+            parts["filter"] = filter_fingerprint(STYLE_FILTERS[style])
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+    
+    def is_current(self, token_id, inputs):
+        record = self.records.get(token_id)
+        if record is None or record["status"] != "done" or record["inputs"] != inputs:
+            return False
+        # Sorties supprimées à la main : on les refait
+        if not os.path.exists(f"{CONFIG['output_dir']}/images/{record['file']}"):
+            return False
+        return CONFIG["metadata_format"] != "json" or os.path.exists(f"{CONFIG['output_dir']}/metadata/{token_id}.json")
+    
+    def record(self, records):
+        with open(self.path, "a") as f:
+            for record in records:
+                self.records[record["token_id"]] = record
+                f.write(json.dumps(record) + "\n")
+    
+    def compact(self):
+        # Une ligne par token ; écriture atomique
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in self.records.values()))
+        os.replace(tmp_path, self.path)
+    
+    def clear(self):
+        self.records = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+# ==========================================
+# 8. BUILD PARALLÈLE (PROCESS POOL)
+# ==========================================
+
+_worker_generator = None
+
+def _init_worker(asset_handle=None):
+    global _worker_generator
+    assets = AssetCache.attach(asset_handle) if asset_handle else AssetCache().preload()
+    _worker_generator = NFTGenerator(assets)
+
+def _build_chunk(chunk):
+    """
+    Construit un lot de (style, dna, token_ids) dans un worker, renvoie les
+    tokens écrits (token_id, dna, file, output, metadata)
+    """
+    pending = []
+    for style, dna, token_ids in chunk:
+        try:
+            pending.append((dna, _worker_generator.build_group(style, dna, token_ids)))
+        except Exception as e:
+            print(f"❌ Error building DNA {dna_key(style, dna)}: {e}")
+    
+    done = []
+    for dna, future in pending:
+        try:
+            done.extend({**written, "dna": dna} for written in future.result())
+        except Exception as e:
+            print(f"❌ Error writing DNA {dna}: {e}")
+    return done
+
+def build_collection(tokens, workers=None, chunk_size=None, seed=None, resume=True):
+    """
+    Génère une liste de (token_id, style) en parallèle sur un pool de processus.
+    Toute la collection est planifiée avant le rendu, les tokens sont envoyés
+    par lots, chaque lot terminé est ajouté au manifeste de build, et une
+    relance ne refait que les tokens manquants ou dont les entrées ont changé.
+    """
+    workers = workers or CONFIG["workers"] or os.cpu_count()
+    chunk_size = chunk_size or CONFIG["chunk_size"]
+    
+    setup_directories() # Dossiers créés avant le démarrage des workers
+    plan = plan_collection(tokens, seed)
+    save_plan(f"{CONFIG['output_dir']}/plan.json", plan)
+    manifest = BuildManifest(f"{CONFIG['output_dir']}/build_manifest.jsonl")
+    if not resume:
+        manifest.clear()
+        if os.path.exists(f"{CONFIG['output_dir']}/metadata/manifest.jsonl"):
+            os.remove(f"{CONFIG['output_dir']}/metadata/manifest.jsonl")
+    
+    # Autre DNA, asset modifié, filtre ou CONFIG changés => le token est refait
+    inputs = {token_id: manifest.inputs(token_id, style, dna) for token_id, style, dna in plan}
+    pending = [token for token in plan if not manifest.is_current(token[0], inputs[token[0]])]
+    
+    # Tokens regroupés par DNA : chaque image unique n'est rendue qu'une fois
+    groups = {}
+    for token_id, style, dna in pending:
+        groups.setdefault((style, dna), []).append(token_id)
+    groups = [(style, dna, token_ids) for (style, dna), token_ids in groups.items()]
+    # Ordre des layers (style inséré avant le premier layer stylé) : des DNA
+    # voisins partagent leurs préfixes dans le cache de canvas d'un worker
+    first_styled = next((i for i, layer in enumerate(LAYERS) if layer in STYLED_LAYERS), len(LAYERS))
+    groups.sort(key=lambda group: (group[1][:first_styled], group[0], group[1][first_styled:]))
+    chunks = [groups[i:i + chunk_size] for i in range(0, len(groups), chunk_size)]
+    print(f"🚀 {len(pending)} tokens to build as {len(groups)} unique images ({len(plan) - len(pending)} already done) on {workers} workers")
+    
+    started = time.perf_counter()
+    built, failed = 0, 0
+    
+    def record(chunk, done):
+        nonlocal built, failed
+        written = {entry["token_id"]: entry for entry in done}
+        records = []
+        for style, dna, token_ids in chunk:
+            for token_id in token_ids:
+                entry = written.get(token_id, {})
+                records.append({
+                    "token_id": token_id, "style": style, "dna": list(dna), "inputs": inputs[token_id],
+                    "status": "done" if entry else "failed", "file": entry.get("file"), "output": entry.get("output")
+                })
+        built += len(written)
+        failed += len(records) - len(written)
+        if CONFIG["metadata_format"] == "jsonl":
+            # Un seul écrivain (ce processus) : le manifeste est écrit par lot
+            append_manifest([entry["metadata"] for entry in done])
+        manifest.record(records)
+        rate = built / max(time.perf_counter() - started, 1e-9)
+        print(f"📦 {built + failed}/{len(pending)} tokens ({rate:.1f} tokens/s, {failed} failed)")
+    
+    if workers == 1:
+        # Mode série : même chemin de code, plus simple à déboguer
+        _init_worker()
+        try:
+            for chunk in chunks:
+                record(chunk, _build_chunk(chunk))
+        finally:
+            _worker_generator.close()
+    elif chunks:
+        # Assets décodés une fois ici, puis lus par tous les workers en mémoire partagée
+        assets = AssetCache().preload()
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(assets.share(),)) as pool:
+                futures = {pool.submit(_build_chunk, chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+        finally:
+            assets.release()
+    
+    manifest.compact()
+    return manifest.records
+
+if __name__ == "__main__":
+    tokens = [(i, "street_art") for i in range(1, 11)] + [(i, "minimalist") for i in range(11, 21)]
+    build_collection(tokens)
     print("✅ Job Done. Check ./build folder.")
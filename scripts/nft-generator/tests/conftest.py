@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The generator scripts import each other as siblings
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rhymechain_generator as generator
+from benchmark_generator import synthesize_assets
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Small synthetic assets and a scratch output folder wired into CONFIG"""
+    settings = {
+        "assets_path": str(tmp_path / "assets"),
+        "output_dir": str(tmp_path / "build"),
+        "image_size": (48, 48),
+        "thumbnail_size": None,
+        "writer_threads": 2,
+        "metadata_format": "json",
+        "dedupe_images": "hardlink",
+    }
+    for key, value in settings.items():
+        monkeypatch.setitem(generator.CONFIG, key, value)
+    synthesize_assets(settings["assets_path"], (160, 160))
+    return tmp_path
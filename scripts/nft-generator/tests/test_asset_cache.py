@@ -0,0 +1,55 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+import rhymechain_generator as generator
+
+
+def as_arrays(cache):
+    return {key: np.asarray(image) for key, image in cache.images.items()}
+
+
+def test_shared_memory_round_trip(workspace):
+    cache = generator.AssetCache().preload()
+    expected = as_arrays(cache)
+    handle = cache.share()
+    try:
+        attached = generator.AssetCache.attach(handle)
+        assert attached.images.keys() == expected.keys()
+        assert all(image.size == key[2] for key, image in attached.images.items())
+        assert all(np.array_equal(array, expected[key]) for key, array in as_arrays(attached).items())
+        # The owner also reads its layers from the shared block now
+        assert all(np.array_equal(array, expected[key]) for key, array in as_arrays(cache).items())
+
+        attached.close()
+        assert attached.images == {}
+        # Closing an attached copy keeps the block alive for the others
+        SharedMemory(name=handle[0]).close()
+    finally:
+        cache.release()
+
+
+def test_release_unlinks_the_shared_block(workspace):
+    cache = generator.AssetCache().preload()
+    name, _ = cache.share()
+    cache.release()
+
+    assert cache.images == {} and cache._shm is None
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
+
+
+def test_attached_cache_composes_like_the_original(workspace):
+    traits = generator.dna_traits((1, 0, 2, 3))
+    expected = np.asarray(generator.NFTGenerator(generator.AssetCache().preload()).compose("street_art", traits))
+
+    cache = generator.AssetCache().preload()
+    handle = cache.share()
+    try:
+        gen = generator.NFTGenerator(generator.AssetCache.attach(handle))
+        assert np.array_equal(np.asarray(gen.compose("street_art", traits)), expected)
+        gen.close()
+        gen.assets.close()
+    finally:
+        cache.release()
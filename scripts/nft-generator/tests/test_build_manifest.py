@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from PIL import Image
+
+import rhymechain_generator as generator
+
+TOKENS = [(i, "street_art" if i <= 10 else "minimalist") for i in range(1, 21)]
+
+
+@pytest.fixture
+def built(workspace, monkeypatch):
+    """Runs build_collection serially and reports which tokens each run rendered"""
+    rendered = []
+    build_group = generator.NFTGenerator.build_group
+
+    def spy(self, style, dna, token_ids):
+        rendered.extend(token_ids)
+        return build_group(self, style, dna, token_ids)
+
+    monkeypatch.setattr(generator.NFTGenerator, "build_group", spy)
+
+    def build(**kwargs):
+        rendered.clear()
+        records = generator.build_collection(TOKENS, workers=1, **kwargs)
+        return records, sorted(rendered)
+
+    return build
+
+
+def manifest_path():
+    return f"{generator.CONFIG['output_dir']}/build_manifest.jsonl"
+
+
+def test_second_run_builds_nothing(built):
+    records, rendered = built()
+    assert rendered == list(range(1, 21))
+    assert all(record["status"] == "done" for record in records.values())
+
+    assert built()[1] == []
+
+
+def test_touched_asset_rebuilds_only_its_tokens(built):
+    records, _ = built()
+    frame = generator.LAYERS["Frame"][1]
+    using = sorted(token_id for token_id, record in records.items() if record["dna"][3] == 1)
+    assert 0 < len(using) < len(TOKENS)
+
+    path = f"{generator.CONFIG['assets_path']}/{generator.LAYER_DIRS['Frame']}/{frame['file']}"
+    Image.new("RGBA", (160, 160), (255, 0, 0, 128)).save(path)
+
+    assert built()[1] == using
+
+
+def test_deleted_output_is_rebuilt(built):
+    records, _ = built()
+    os.remove(f"{generator.CONFIG['output_dir']}/images/{records[5]['file']}")
+    os.remove(f"{generator.CONFIG['output_dir']}/metadata/12.json")
+
+    assert built()[1] == [5, 12]
+
+
+def test_truncated_manifest_line_is_ignored(built):
+    built()
+    with open(manifest_path()) as f:
+        lines = f.readlines()
+    # Crash while appending the last token: half a JSON line on disk
+    with open(manifest_path(), "w") as f:
+        f.writelines(lines[:-1])
+        f.write(lines[-1][: len(lines[-1]) // 2])
+
+    manifest = generator.BuildManifest(manifest_path())
+    assert len(manifest.records) == len(TOKENS) - 1
+    assert len(built()[1]) == 1
+
+
+def test_resume_false_rebuilds_everything(built):
+    built()
+    assert built(resume=False)[1] == list(range(1, 21))
+
+
+def test_render_config_change_rebuilds_everything(built, monkeypatch):
+    built()
+    monkeypatch.setitem(generator.CONFIG, "image_size", (32, 32))
+    assert built()[1] == list(range(1, 21))
@@ -0,0 +1,80 @@
+import json
+import os
+import random
+
+import pytest
+
+import rhymechain_generator as generator
+
+DNA = (0, 1, 2, 3)
+
+
+def build(token_ids, style="street_art"):
+    gen = generator.NFTGenerator(generator.AssetCache().preload())
+    return gen.build_group(style, DNA, token_ids).result()
+
+
+def test_hardlink_mode_encodes_once_and_links_every_token(workspace):
+    written = build([1, 2, 3])
+    images = f"{generator.CONFIG['output_dir']}/images"
+
+    shared = os.stat(f"{images}/dna/{generator.dna_key('street_art', DNA)}.png")
+    assert [entry["file"] for entry in written] == ["1.png", "2.png", "3.png"]
+    assert all(os.stat(f"{images}/{entry['file']}").st_ino == shared.st_ino for entry in written)
+    assert len({entry["output"] for entry in written}) == 1
+
+
+def test_shared_mode_points_metadata_at_the_dna_image(workspace, monkeypatch):
+    monkeypatch.setitem(generator.CONFIG, "dedupe_images", "shared")
+    written = build([7, 8])
+
+    key = generator.dna_key("street_art", DNA)
+    assert {entry["file"] for entry in written} == {f"dna/{key}.png"}
+    with open(f"{generator.CONFIG['output_dir']}/metadata/8.json") as f:
+        assert json.load(f)["image"].endswith(f"dna/{key}.png")
+    assert not os.path.exists(f"{generator.CONFIG['output_dir']}/images/7.png")
+
+
+def test_without_dedupe_each_token_gets_its_own_file(workspace, monkeypatch):
+    monkeypatch.setitem(generator.CONFIG, "dedupe_images", None)
+    written = build([1, 2])
+
+    images = f"{generator.CONFIG['output_dir']}/images"
+    assert os.stat(f"{images}/1.png").st_ino != os.stat(f"{images}/2.png").st_ino
+    assert written[0]["output"] == written[1]["output"]
+
+
+def test_collection_renders_one_image_per_unique_dna(workspace, monkeypatch):
+    monkeypatch.setitem(generator.CONFIG, "unique_dna", False)
+    # More tokens than trait combinations: duplicates are guaranteed
+    tokens = [(i, "minimalist") for i in range(1, 201)]
+    records = generator.build_collection(tokens, workers=1, resume=False)
+
+    unique = {tuple(record["dna"]) for record in records.values()}
+    assert all(record["status"] == "done" for record in records.values())
+    assert len(os.listdir(f"{generator.CONFIG['output_dir']}/images/dna")) == len(unique) < len(tokens)
+
+
+def test_group_progress_is_not_printed_per_dna(workspace, capsys):
+    build([1, 2])
+    assert capsys.readouterr().out == ""
+
+
+def test_build_nft_writes_one_token_through_the_writer(workspace):
+    gen = generator.NFTGenerator(generator.AssetCache().preload())
+    assert gen.build_nft(42, "minimalist", dna=DNA)
+
+    output = generator.CONFIG["output_dir"]
+    shared = os.stat(f"{output}/images/dna/{generator.dna_key('minimalist', DNA)}.png")
+    assert os.stat(f"{output}/images/42.png").st_ino == shared.st_ino
+    with open(f"{output}/metadata/42.json") as f:
+        assert json.load(f)["attributes"][-1] == {"trait_type": "Style", "value": "minimalist"}
+
+
+def test_build_nft_draws_traits_without_a_plan(workspace, monkeypatch):
+    monkeypatch.setitem(generator.CONFIG, "metadata_format", "jsonl")
+    gen = generator.NFTGenerator(generator.AssetCache().preload())
+    assert gen.build_nft(1, rng=random.Random(0))
+
+    with open(f"{generator.CONFIG['output_dir']}/metadata/manifest.jsonl") as f:
+        assert json.loads(f.read())["name"].endswith("#1")
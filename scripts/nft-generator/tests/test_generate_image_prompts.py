@@ -0,0 +1,107 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+import generate_image_prompts as prompts
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+
+
+def write_metadata(folder, token_id, **traits):
+    attributes = [{"trait_type": name, "value": value} for name, value in traits.items()]
+    with open(folder / f"{token_id}.json", "w") as f:
+        json.dump({"name": f"RhymeChain #{token_id}", "attributes": attributes}, f)
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    (tmp_path / "metadata").mkdir()
+    (tmp_path / "out").mkdir()
+    return tmp_path / "metadata", tmp_path / "out"
+
+
+def legacy_prompt(attributes):
+    # f-string of the original one-file-at-a-time script
+    prompt = f"""
+[ARTISTIC_DIRECTION]
+Hyper-realistic digital photography mixed with gritty street art textures.
+High-contrast "Neon Noir" lighting with Cyan (#00F0FF) and Magenta (#FF00FF) key lights.
+85mm Portrait Lens, f/1.8 aperture, sharp focus on eyes and accessories.
+Chromatic aberration on edges, slight film grain, glitch artifacts on holographic elements.
+
+[SUBJECT_DNA]
+Archetype: {attributes.get('Archetype', 'Unknown')}
+Outfit: {attributes.get('Outfit', 'Tech-wear fashion')}
+Cybernetics: {attributes.get('Implant', 'Neural implants')} with glowing circuit lines
+Pose: Aggressive rapping stance
+
+[ENVIRONMENT_MATRIX]
+Location: {attributes.get('Background', 'Cyber city')}
+Atmosphere: Heavy rain, steam rising from vents, floating holographic crypto advertisements
+
+[QUALITY_GATES]
+Resolution: 8K UHD
+Render Engine: Octane Render style
+Detail Level: Insane detail (visible fabric weaves, realistic skin pores, reflective metal)
+
+Generate a single portrait of a futuristic hip-hop artist with these exact characteristics.
+"""
+    return prompt.strip()
+
+
+def test_matches_the_previous_generation_prompts_json(dirs):
+    metadata_dir, output_dir = dirs
+    shutil.copytree(SCRIPT_DIR / "test_metadata", metadata_dir, dirs_exist_ok=True)
+    write_metadata(metadata_dir, 6, Archetype="Oracle")
+    prompts.generate_prompts(str(metadata_dir), str(output_dir))
+
+    expected = []
+    for path in sorted(metadata_dir.iterdir()):
+        with open(path) as f:
+            metadata = json.load(f)
+        attributes = {attr["trait_type"]: attr["value"] for attr in metadata["attributes"]}
+        expected.append({"token_id": path.stem, "name": metadata["name"],
+                         "prompt": legacy_prompt(attributes), "attributes": attributes})
+    assert list(prompts.load_generation_prompts(str(output_dir))) == expected
+
+
+def test_tokens_keep_metadata_file_order_with_parallel_reads(dirs):
+    metadata_dir, output_dir = dirs
+    for token_id in range(1, 301):
+        write_metadata(metadata_dir, token_id, Archetype=f"A{token_id % 7}")
+
+    prompts.generate_prompts(str(metadata_dir), str(output_dir))
+    tokens = read_jsonl(output_dir / "generation_prompts.jsonl")
+    assert [token["token_id"] for token in tokens] == sorted(str(i) for i in range(1, 301))
+    assert all(token["name"] == f"RhymeChain #{token['token_id']}" for token in tokens)
+
+
+def test_identical_traits_share_one_prompt(dirs):
+    metadata_dir, output_dir = dirs
+    write_metadata(metadata_dir, 1, Archetype="Oracle", Background="Rooftop")
+    write_metadata(metadata_dir, 2, Archetype="Oracle", Background="Rooftop", Rarity="Rare")
+    write_metadata(metadata_dir, 3, Archetype="Hacker")
+
+    summary = prompts.generate_prompts(str(metadata_dir), str(output_dir))
+    unique = read_jsonl(output_dir / "prompts.jsonl")
+    tokens = read_jsonl(output_dir / "generation_prompts.jsonl")
+
+    assert summary["total"] == 3
+    assert summary["unique_prompts"] == len(unique) == 2
+    assert [token["prompt_id"] for token in tokens] == [0, 0, 1]
+    # Traits outside the template do not split prompts but stay on the token
+    assert tokens[1]["attributes"]["Rarity"] == "Rare"
+    assert unique[1]["traits"] == {**prompts.PROMPT_DEFAULTS, "Archetype": "Hacker"}
+
+
+def test_render_prompt_fills_every_template_field():
+    values = {field: f"<{field}>" for field in prompts.PROMPT_FIELDS}
+    assert prompts.render_prompt(values) == prompts.PROMPT_TEMPLATE.format(**values)
+    assert set(prompts.PROMPT_FIELDS) == set(prompts.PROMPT_DEFAULTS)
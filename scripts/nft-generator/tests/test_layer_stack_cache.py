@@ -0,0 +1,73 @@
+import numpy as np
+from PIL import Image
+
+import rhymechain_generator as generator
+
+CANVAS_BYTES = 4 * 4 * 4
+
+
+def canvas(color=0):
+    return Image.new("RGBA", (4, 4), (color, 0, 0, 255))
+
+
+def test_lru_evicts_least_recently_used_over_budget():
+    cache = generator.LayerStackCache(max_bytes=2 * CANVAS_BYTES)
+    cache.put("a", canvas())
+    cache.put("b", canvas())
+    assert cache.get("a") is not None  # "a" becomes the most recent entry
+
+    cache.put("c", canvas())
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.bytes == 2 * CANVAS_BYTES
+
+
+def test_oversized_and_duplicate_entries_are_not_stored():
+    cache = generator.LayerStackCache(max_bytes=CANVAS_BYTES - 1)
+    cache.put("a", canvas())
+    assert "a" not in cache and cache.bytes == 0
+
+    cache = generator.LayerStackCache(max_bytes=4 * CANVAS_BYTES)
+    first = canvas(1)
+    cache.put("a", first)
+    cache.put("a", canvas(2))
+    assert cache.get("a") is first and cache.bytes == CANVAS_BYTES
+
+
+def test_compose_resumes_from_the_longest_cached_prefix(workspace):
+    gen = generator.NFTGenerator(generator.AssetCache().preload())
+    gen.compose("street_art", generator.dna_traits((0, 0, 1, 0)))
+    assert (gen.stacks.hits, gen.stacks.misses) == (0, 1)
+
+    # Only the frame differs: the three lower layers come from the cache
+    warm = gen.compose("street_art", generator.dna_traits((0, 0, 1, 1)))
+    assert (gen.stacks.hits, gen.stacks.misses) == (1, 1)
+
+    cold = generator.NFTGenerator(generator.AssetCache().preload())
+    cold.stacks = generator.LayerStackCache(max_bytes=0)
+    expected = cold.compose("street_art", generator.dna_traits((0, 0, 1, 1)))
+    assert np.array_equal(np.asarray(warm), np.asarray(expected))
+
+
+def test_styled_prefixes_are_not_shared_across_styles(workspace):
+    gen = generator.NFTGenerator(generator.AssetCache().preload())
+    gen.compose("street_art", generator.dna_traits((0, 0, 1, 0)))
+    minimalist = gen.compose("minimalist", generator.dna_traits((0, 0, 1, 0)))
+
+    # Only the unstyled background is reused; the artist layer is redrawn
+    assert (None, ("bg_concrete.png",)) in gen.stacks
+    assert ("minimalist", ("bg_concrete.png", "artist_mc_flow.png")) in gen.stacks
+
+    cold = generator.NFTGenerator(generator.AssetCache().preload())
+    cold.stacks = generator.LayerStackCache(max_bytes=0)
+    expected = cold.compose("minimalist", generator.dna_traits((0, 0, 1, 0)))
+    assert np.array_equal(np.asarray(minimalist), np.asarray(expected))
+
+
+def test_cached_prefix_is_not_mutated_by_compose(workspace):
+    gen = generator.NFTGenerator(generator.AssetCache().preload())
+    gen.compose("street_art", generator.dna_traits((0, 0, 1, 0)))
+    key = ("street_art", ("bg_concrete.png", "artist_mc_flow.png", "acc_mic.png"))
+    before = np.asarray(gen.stacks.get(key)).copy()
+
+    gen.compose("street_art", generator.dna_traits((0, 0, 1, 3)))
+    assert np.array_equal(np.asarray(gen.stacks.get(key)), before)
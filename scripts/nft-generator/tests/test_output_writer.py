@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+
+import pytest
+from PIL import Image, features
+
+import rhymechain_generator as generator
+
+
+@pytest.mark.parametrize("encoder, pil_format", [
+    ({"format": "png", "compress_level": 1}, "PNG"),
+    ({"format": "webp"}, "WEBP"),
+    ({"format": "avif"}, "AVIF"),
+])
+def test_encoder_selects_format_and_extension(workspace, monkeypatch, encoder, pil_format):
+    if pil_format == "AVIF" and not features.check("avif"):
+        pytest.skip("Pillow built without AVIF")
+    monkeypatch.setitem(generator.CONFIG, "encoder", encoder)
+    monkeypatch.setitem(generator.CONFIG, "thumbnail_size", (16, 16))
+    generator.setup_directories()
+
+    file_name = f"1.{generator.image_extension()}"
+    assert file_name == f"1.{generator.ENCODERS[encoder['format']][1]}"
+    generator.save_image(Image.new("RGBA", (48, 48), (255, 0, 0, 255)), file_name)
+
+    with Image.open(f"{generator.CONFIG['output_dir']}/images/{file_name}") as image:
+        assert (image.format, image.size) == (pil_format, (48, 48))
+    with Image.open(f"{generator.CONFIG['output_dir']}/images/thumbs/{file_name}") as thumbnail:
+        assert thumbnail.size == (16, 16)
+
+
+def test_lossless_encoders_round_trip_pixels(workspace, monkeypatch):
+    generator.setup_directories()
+    source = Image.effect_noise((32, 32), 64).convert("RGBA")
+    for encoder in ({"format": "png"}, {"format": "webp"}):
+        monkeypatch.setitem(generator.CONFIG, "encoder", encoder)
+        file_name = f"noise.{generator.image_extension()}"
+        generator.save_image(source, file_name)
+        with Image.open(f"{generator.CONFIG['output_dir']}/images/{file_name}") as image:
+            assert image.convert("RGBA").tobytes() == source.tobytes()
+
+
+def test_writer_completes_futures_and_close_waits():
+    writer = generator.OutputWriter(threads=2)
+    results = [writer.submit(lambda i: i * i, i) for i in range(10)]
+    assert [future.result() for future in results] == [i * i for i in range(10)]
+
+    release = threading.Event()
+    pending = writer.submit(release.wait, 5)
+    threading.Timer(0.05, release.set).start()
+    writer.close()
+    assert pending.done() and pending.result() is True
+
+
+def test_writer_bounds_queued_work():
+    writer = generator.OutputWriter(threads=1)
+    release = threading.Event()
+    for _ in range(2):  # 2 * threads slots
+        writer.submit(release.wait, 5)
+
+    submitted = threading.Event()
+    threading.Thread(target=lambda: (writer.submit(lambda: None), submitted.set()), daemon=True).start()
+    assert not submitted.wait(0.1)
+
+    release.set()
+    assert submitted.wait(5)
+    writer.close()
+
+
+def test_jsonl_metadata_writes_one_manifest_line_per_token(workspace, monkeypatch):
+    monkeypatch.setitem(generator.CONFIG, "metadata_format", "jsonl")
+    tokens = [(i, "street_art") for i in range(1, 13)]
+    generator.build_collection(tokens, workers=1)
+
+    metadata_dir = f"{generator.CONFIG['output_dir']}/metadata"
+    assert os.listdir(metadata_dir) == ["manifest.jsonl"]
+    with open(f"{metadata_dir}/manifest.jsonl") as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(line["name"] for line in lines) == sorted(f"RhymeChain Origins #{i}" for i in range(1, 13))
+
+    # A resumed build appends nothing for tokens already written
+    generator.build_collection(tokens, workers=1)
+    with open(f"{metadata_dir}/manifest.jsonl") as f:
+        assert len(f.readlines()) == len(lines)
+
+
+def test_append_manifest_keeps_every_version_in_order(workspace):
+    generator.setup_directories()
+    generator.append_manifest([{"name": "#1", "v": 1}, {"name": "#2", "v": 1}])
+    generator.append_manifest([])
+    generator.append_manifest([{"name": "#1", "v": 2}])
+
+    with open(f"{generator.CONFIG['output_dir']}/metadata/manifest.jsonl") as f:
+        assert [json.loads(line)["v"] for line in f] == [1, 1, 2]
@@ -0,0 +1,42 @@
+import filecmp
+import os
+
+import rhymechain_generator as generator
+
+TOKENS = [(i, "street_art" if i % 3 else "minimalist") for i in range(1, 41)]
+
+
+def build_into(folder, monkeypatch, workers):
+    monkeypatch.setitem(generator.CONFIG, "output_dir", str(folder))
+    return generator.build_collection(TOKENS, workers=workers, chunk_size=4)
+
+
+def tree(folder):
+    return sorted(os.path.relpath(os.path.join(root, name), folder)
+                  for root, _, names in os.walk(folder) for name in names)
+
+
+def test_process_pool_output_matches_serial_build(workspace, monkeypatch):
+    serial = build_into(workspace / "serial", monkeypatch, workers=1)
+    parallel = build_into(workspace / "parallel", monkeypatch, workers=2)
+
+    assert parallel == serial
+    files = [name for name in tree(workspace / "serial") if name.startswith(("images", "metadata"))]
+    assert files == [name for name in tree(workspace / "parallel") if name.startswith(("images", "metadata"))]
+    _, mismatch, errors = filecmp.cmpfiles(workspace / "serial", workspace / "parallel", files, shallow=False)
+    assert mismatch == errors == []
+
+
+def test_process_pool_build_resumes(workspace, monkeypatch, capsys):
+    first = build_into(workspace / "parallel", monkeypatch, workers=2)
+    os.remove(workspace / "parallel" / "images" / first[7]["file"])
+    capsys.readouterr()
+
+    second = build_into(workspace / "parallel", monkeypatch, workers=2)
+    assert "🚀 1 tokens to build" in capsys.readouterr().out
+    assert second == first
+
+
+def test_serial_build_shuts_down_its_writer(workspace, monkeypatch):
+    build_into(workspace / "serial", monkeypatch, workers=1)
+    assert generator._worker_generator.writer._pool._shutdown
@@ -0,0 +1,59 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import rhymechain_generator as generator
+
+
+def weights(layer):
+    return [item["weight"] for item in generator.LAYERS[layer]]
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 100, 333])
+def test_rarity_quota_sums_to_supply(n):
+    for layer in generator.LAYERS:
+        counts = generator.rarity_quota(weights(layer), n)
+        assert counts.sum() == n
+        exact = np.asarray(weights(layer)) / sum(weights(layer)) * n
+        assert np.all(np.abs(counts - exact) < 1)
+
+
+def test_rarity_quota_is_exact_when_weights_divide_supply():
+    assert generator.rarity_quota([40, 30, 20, 10], 100).tolist() == [40, 30, 20, 10]
+
+
+@pytest.mark.parametrize("styles", [["street_art"], ["street_art", "minimalist"]])
+@pytest.mark.parametrize("unique", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_exact_rarity_plan_matches_quotas(unique, styles, seed):
+    tokens = [(i, styles[i % len(styles)]) for i in range(1, 50 * len(styles) + 1)]
+    plan = generator.plan_collection(tokens, seed=seed, unique=unique, exact_rarity=True)
+
+    assert [token_id for token_id, _, _ in plan] == [token_id for token_id, _ in tokens]
+    for j, layer in enumerate(generator.LAYERS):
+        counts = Counter(dna[j] for _, _, dna in plan)
+        quota = generator.rarity_quota(weights(layer), len(tokens))
+        assert [counts[i] for i in range(len(quota))] == quota.tolist()
+    if unique:
+        assert len({(style, dna) for _, style, dna in plan}) == len(plan)
+
+
+def test_plan_is_reproducible_for_a_seed():
+    tokens = [(i, "street_art") for i in range(1, 51)]
+    first = generator.plan_collection(tokens, seed=11, unique=True, exact_rarity=True)
+    assert generator.plan_collection(tokens, seed=11, unique=True, exact_rarity=True) == first
+
+
+def test_unique_plan_rejects_supply_above_combinations():
+    combinations = int(np.prod([len(options) for options in generator.LAYERS.values()]))
+    tokens = [(i, "street_art") for i in range(combinations + 1)]
+    with pytest.raises(ValueError):
+        generator.plan_collection(tokens, unique=True, exact_rarity=False)
+
+
+def test_unique_plan_rejects_quotas_above_combinations():
+    # 80 tokens: 40 "Rusted Iron" for only 32 combinations of the other layers
+    tokens = [(i, "street_art") for i in range(80)]
+    with pytest.raises(ValueError, match="Frame"):
+        generator.plan_collection(tokens, unique=True, exact_rarity=True)
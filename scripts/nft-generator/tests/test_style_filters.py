@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import rhymechain_generator as generator
+
+ARTISTS = [item["file"] for item in generator.LAYERS["Artist"]]
+
+
+def pixels(image):
+    return np.asarray(image, dtype=np.int16)
+
+
+@pytest.mark.parametrize("file", ARTISTS)
+def test_duotone_filter_tracks_the_pil_street_art_chain(workspace, file):
+    artist = generator.AssetCache().get("Artist", file)
+    difference = np.abs(pixels(generator.duotone_filter()(artist)) - pixels(generator.apply_street_art_filter(artist)))
+    # Rounding between the float pipeline and PIL's 8-bit steps
+    assert difference.max() <= 10
+    assert difference.mean() < 0.5
+
+
+def test_duotone_filter_uses_the_palette_endpoints():
+    image = Image.fromarray(np.array([[[0, 0, 0, 255]] * 2 + [[255, 255, 255, 255]] * 2], dtype=np.uint8), "RGBA")
+    toned = generator.duotone_filter(black=(10, 20, 30), white=(200, 100, 0), sharpen=False)(image)
+    assert pixels(toned).tolist() == [[[10, 20, 30, 255]] * 2 + [[200, 100, 0, 255]] * 2]
+
+
+def test_styled_variant_is_filtered_masked_and_cached(workspace):
+    cache = generator.AssetCache()
+    base = cache.get("Artist", ARTISTS[0])
+    styled = cache.styled("Artist", ARTISTS[0], "street_art")
+
+    assert cache.styled("Artist", ARTISTS[0], "street_art") is styled
+    # Transparent pixels of the source stay transparent after the filter
+    assert np.array_equal(pixels(styled)[..., 3] == 0, pixels(base)[..., 3] == 0)
+    # Unstyled layers and styles without a filter return the plain asset
+    assert cache.styled("Artist", ARTISTS[0], "minimalist") is base
+    assert cache.styled("Frame", "frame_rust.png", "street_art") is cache.get("Frame", "frame_rust.png")
+
+
+def test_registered_style_filter_is_applied(workspace, monkeypatch):
+    monkeypatch.setitem(generator.STYLE_FILTERS, "inverted", lambda image: Image.new("RGBA", image.size, (255, 0, 0, 255)))
+    styled = generator.AssetCache().styled("Artist", ARTISTS[0], "inverted")
+    opaque = pixels(styled)[..., 3] == 255
+    assert opaque.any()
+    assert (pixels(styled)[opaque][:, :3] == (255, 0, 0)).all()